@@ -56,6 +56,20 @@ class DatuConfig(BaseSettings):
         schema_sample_limit (int): The maximum number of rows to sample from the schema.
         schema_categorical_threshold (int): The threshold for categorical columns in the schema.
         enable_schema_rag (bool): Enable RAG for schema extraction.
+        cpu_executor_kind (str): Pool type for stateless CPU-bound stages such as SQL parsing, "thread" or
+            "process". Schema retrieval and rendering always run on threads of the serving process.
+        cpu_executor_workers (int): Number of workers in the CPU-bound stage pool.
+        schema_context_token_budget (int): Approximate token budget of the schema RAG context in the SQL prompt;
+            0 disables the limit. The unscored full schema is never truncated.
+        schema_context_max_values (int): Maximum number of categorical values listed per column in the prompt.
+        schema_session_max_sessions (int): Maximum number of chat sessions whose schema context is kept.
+        schema_session_ttl_seconds (int): Seconds after which an idle session's schema context is discarded.
+        schema_session_min_overlap (float): Minimum fraction of a turn's top tables already in the session's
+            schema context for the turn to extend it; below it the context is rebuilt.
+        schema_session_score_decay (float): Factor applied to the retrieval scores of a session's schema context
+            on every turn, so tables the conversation moved away from are omitted first.
+        schema_session_max_tables (int): Maximum number of tables kept in a session's schema context; the lowest
+            scored are dropped first. 0 keeps all of them.
 
     Attributes:
         host (str): The host address for the application.
@@ -77,6 +91,20 @@ class DatuConfig(BaseSettings):
         mcp (MCPConfig | None): Configuration settings for MCP integration.
         enable_schema_rag (bool): Enable RAG for schema extraction.
         schema_rag (SchemaRAGConfig | None): Configuration settings for schema RAG.
+        cpu_executor_kind (str): Pool type for stateless CPU-bound stages such as SQL parsing, "thread" or
+            "process". Schema retrieval and rendering always run on threads of the serving process.
+        cpu_executor_workers (int): Number of workers in the CPU-bound stage pool.
+        schema_context_token_budget (int): Approximate token budget of the schema RAG context in the SQL prompt;
+            0 disables the limit. The unscored full schema is never truncated.
+        schema_context_max_values (int): Maximum number of categorical values listed per column in the prompt.
+        schema_session_max_sessions (int): Maximum number of chat sessions whose schema context is kept.
+        schema_session_ttl_seconds (int): Seconds after which an idle session's schema context is discarded.
+        schema_session_min_overlap (float): Minimum fraction of a turn's top tables already in the session's
+            schema context for the turn to extend it; below it the context is rebuilt.
+        schema_session_score_decay (float): Factor applied to the retrieval scores of a session's schema context
+            on every turn, so tables the conversation moved away from are omitted first.
+        schema_session_max_tables (int): Maximum number of tables kept in a session's schema context; the lowest
+            scored are dropped first. 0 keeps all of them.
 
 
     """
@@ -110,6 +138,15 @@ class DatuConfig(BaseSettings):
         description="Configuration settings for schema RAG (Retrieval-Augmented Generation).",
     )
     enable_anonymization: bool = False
+    cpu_executor_kind: Literal["thread", "process"] = "thread"
+    cpu_executor_workers: int = 4
+    schema_context_token_budget: int = 6000
+    schema_context_max_values: int = 20
+    schema_session_max_sessions: int = 1024
+    schema_session_ttl_seconds: int = 3600
+    schema_session_min_overlap: float = 0.5
+    schema_session_score_decay: float = 0.8
+    schema_session_max_tables: int = 50
 
     model_config = SettingsConfigDict(
         env_prefix="datu_",
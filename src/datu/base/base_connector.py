@@ -4,6 +4,7 @@ providing a common interface and shared functionality.
 """
 
 from abc import ABC, abstractmethod
+from typing import Iterator
 
 from pydantic import BaseModel
 
@@ -71,6 +72,14 @@ class BaseDBConnector(ABC):
     def fetch_schema(self, schema_name: str) -> list[SchemaInfo]:
         """Retrieve schema information"""
 
+    def iter_schema(self, schema_name: str) -> Iterator[SchemaInfo]:
+        """Yield schema information table by table.
+
+        Connectors that can stream their catalog override this, so large schemas are never held as one list;
+        the default yields from :meth:`fetch_schema`.
+        """
+        yield from self.fetch_schema(schema_name)
+
     @abstractmethod
     def run_transformation(self, sql_code: str, test_mode: bool = False) -> dict:
         """Execute a SQL transformation"""
@@ -21,7 +21,10 @@ class ChatRequest(BaseModel):
     Attributes:
         messages (List[ChatMessage]): A list of messages in the chat conversation.
         system_prompt (Optional[str]): An optional system prompt to provide context for the conversation.
+        session_id (Optional[str]): An optional identifier of the chat session. When given, the schema context
+            selected in earlier turns of the session is reused and extended instead of rebuilt on every turn.
     """
 
     messages: List[ChatMessage]
     system_prompt: Optional[str] = None
+    session_id: Optional[str] = None
@@ -3,7 +3,8 @@ This module provides a PostgreSQL connector for Datu, allowing
 interactions with PostgreSQL databases.
 """
 
-from typing import Tuple
+from itertools import groupby
+from typing import Iterator, Tuple
 
 import psycopg2
 from psycopg2 import sql
@@ -98,6 +99,64 @@ class PostgreSQLConnector(BaseDBConnector):
 
         return schema_info_list
 
+    def iter_schema(self, schema_name: str, batch_size: int = 500) -> Iterator[SchemaInfo]:
+        """Streams schema information from the PostgreSQL database table by table.
+
+        Tables are read in pages of ``batch_size`` table names, keyed on the last name of the previous page,
+        with the columns of a page fetched in one query. The read transaction is ended before the tables of
+        a page are yielded, so no transaction stays open while the caller processes or samples them, and
+        only one page of column metadata is held at a time.
+
+        Args:
+            schema_name (str): The name of the schema to fetch.
+            batch_size (int): Number of tables read per page.
+
+        Yields:
+            SchemaInfo: The schema information of one table, in table name order.
+
+        Raises:
+            psycopg2.Error: If there is an error connecting to the database or executing the query.
+        """
+        query_tables = """
+            SELECT DISTINCT table_name
+            FROM information_schema.columns
+            WHERE table_schema = %s AND table_name > %s
+            ORDER BY table_name
+            LIMIT %s;
+        """
+        query_columns = """
+            SELECT table_name, column_name, data_type
+            FROM information_schema.columns
+            WHERE table_schema = %s AND table_name = ANY(%s)
+            ORDER BY table_name, ordinal_position;
+        """
+
+        conn = self.connect()
+        try:
+            last_table = ""
+            while True:
+                with conn.cursor() as cur:
+                    cur.execute(query_tables, (schema_name, last_table, batch_size))
+                    table_names = [row[0] for row in cur.fetchall()]
+                    if not table_names:
+                        return
+                    cur.execute(query_columns, (schema_name, table_names))
+                    rows = cur.fetchall()
+                conn.rollback()
+                for table_name, columns in groupby(rows, key=lambda row: row[0]):
+                    yield SchemaInfo(
+                        table_name=table_name,
+                        schema_name=schema_name,
+                        columns=[
+                            TableInfo(column_name=col_name, data_type=data_type) for _, col_name, data_type in columns
+                        ],
+                    )
+                if len(table_names) < batch_size:
+                    return
+                last_table = table_names[-1]
+        finally:
+            conn.close()
+
     def run_transformation(
         self,
         sql_code: str,
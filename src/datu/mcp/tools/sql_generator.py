@@ -23,17 +23,19 @@ class GenerateSQLInput(BaseModel):
         system_prompt (Optional[str]): Optional system prompt text.
         timeout_sec (int): Timeout in seconds. Defaults to 45.
         disable_schema_rag (bool): Whether to disable schema RAG. Defaults to True.
+        session_id (Optional[str]): Optional chat session identifier for reusing the schema context across turns.
     """
 
     messages: List[ChatMessage]
     system_prompt: Optional[str] = None
     timeout_sec: int = 45
     disable_schema_rag: bool = True
+    session_id: Optional[str] = None
 
 
 def _make_chat_request(payload: GenerateSQLInput) -> ChatRequest:
     """Convert the GenerateSQLInput payload to a ChatRequest."""
-    return ChatRequest(messages=payload.messages, system_prompt=payload.system_prompt)
+    return ChatRequest(messages=payload.messages, system_prompt=payload.system_prompt, session_id=payload.session_id)
 
 
 @mcp.tool()
@@ -42,6 +44,7 @@ async def sql_generate(
     system_prompt: Optional[str] = None,
     timeout_sec: int = 45,
     disable_schema_rag: bool = True,
+    session_id: Optional[str] = None,
 ) -> Dict[str, Any]:
     """
     Generate SQL via the existing core pipeline.
@@ -51,6 +54,7 @@ async def sql_generate(
         system_prompt (Optional[str]): Optional system prompt text.
         timeout_sec (int): Timeout in seconds. Defaults to 45.
         disable_schema_rag (bool): Whether to disable schema RAG. Defaults to True.
+        session_id (Optional[str]): Optional chat session identifier for reusing the schema context across turns.
 
     Returns:
         Dict[str, Any]: A dictionary containing:
@@ -68,6 +72,7 @@ async def sql_generate(
                 "system_prompt": system_prompt,
                 "timeout_sec": timeout_sec,
                 "disable_schema_rag": disable_schema_rag,
+                "session_id": session_id,
             }
         )
     except ValidationError as ve:
@@ -9,6 +9,7 @@ from fastapi import APIRouter, HTTPException
 from datu.app_config import get_app_settings, get_logger
 from datu.base.chat_schema import ChatRequest
 from datu.integrations.dbt.config import get_active_target_config
+from datu.services.executor import get_cpu_executor
 from datu.services.llm import generate_response
 from datu.services.sql_generator.core import (
     QueryDetails,
@@ -94,7 +95,7 @@ If the user asks for something that is not SQL, you may use other MCP tools; oth
         title = (b.get("title") or f"Query {idx}").strip()
         if not sql_text:
             continue
-        complexity = estimate_query_complexity(sql_text)
+        complexity = await get_cpu_executor().run(estimate_query_complexity, sql_text)
         exec_time = get_query_execution_time_estimate(complexity)
         queries_with_complexity.append(
             QueryDetails(
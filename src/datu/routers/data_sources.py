@@ -250,12 +250,14 @@ async def upload_data_source_file(file: UploadFile):
     DATA_SOURCES.append(new_source)
     logger.info(f"Data source metadata updated: {new_source}")
 
-    # 8. Trigger schema extraction refresh
+    # 8. Trigger schema extraction refresh and a background schema RAG rebuild
     try:
         from datu.schema_extractor.schema_cache import load_schema_cache
+        from datu.services.schema_rag import schema_rag_holder
 
-        load_schema_cache(force_refresh=True)
+        schema_data = load_schema_cache(force_refresh=True)
         logger.info("Schema cache refreshed after upload.")
+        schema_rag_holder.refresh(schema_data)
     except Exception as e:
         logger.error(f"Failed to refresh schema cache: {e}")
 
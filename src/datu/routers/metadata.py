@@ -1,13 +1,16 @@
 """FastAPI router for metadata-related endpoints.
 This module defines a FastAPI router for handling metadata-related requests.
 It includes an endpoint for introspecting the specified schema in the database
-and returning table/column information.
+and returning table/column information, and an endpoint reporting the live schema RAG version and the
+load of the executor running the CPU-bound request stages.
 """
 
 from fastapi import APIRouter, HTTPException
 
 from datu.integrations.dbt.config import get_dbt_profiles_settings
 from datu.schema_extractor.schema_cache import SchemaExtractor, SchemaGlossary
+from datu.services.executor import get_cpu_executor
+from datu.services.schema_rag import schema_rag_holder
 
 dbt_profiles_settings = get_dbt_profiles_settings()
 
@@ -30,3 +33,14 @@ def get_schema() -> list[SchemaGlossary]:
     if not schema_info:
         raise HTTPException(status_code=404, detail="Schema not found")
     return schema_info
+
+
+@router.get("/schema-rag")
+def get_schema_rag_status() -> dict:
+    """Endpoint reporting the schema RAG index in use.
+
+    Returns:
+        dict: The live index version, when it was built, whether a background rebuild is running
+        and the error of the last failed rebuild, plus the executor metrics under ``executor``.
+    """
+    return {**schema_rag_holder.status(), "executor": get_cpu_executor().metrics()}
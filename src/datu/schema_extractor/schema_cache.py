@@ -8,6 +8,7 @@ It also includes a function to load the schema cache and refresh it if necessary
 import json
 import os
 import time
+from typing import Any, Iterable, Iterator
 
 from pydantic import BaseModel, Field
 
@@ -65,40 +66,51 @@ class SchemaExtractor:
             ValueError: If there is an error fetching the schema.
             KeyError: If there is an error with the profile or target configuration.
         """
-        extracted_schemas: list[SchemaGlossary] = []
+        return [
+            SchemaGlossary(**header, schema_info=list(tables)) for header, tables in SchemaExtractor.iter_all_schemas()
+        ]
 
+    @staticmethod
+    def iter_all_schemas() -> Iterator[tuple[dict, Iterator[SchemaInfo]]]:
+        """Yield the profiles and targets with a lazy stream of their tables.
+
+        Each item is the profile header (timestamp, profile and output name, database type) and an iterator
+        that extracts the tables of that target as it is consumed, so a consumer such as
+        :func:`write_schema_cache` holds one table at a time. Targets that cannot be connected to are logged
+        and skipped; a target whose extraction fails midway keeps the tables extracted before the error.
+
+        Yields:
+            tuple[dict, Iterator[SchemaInfo]]: The profile header and its tables.
+        """
         for profile_name, profile in profile_settings.profiles.items():  # pylint: disable=no-member
             for target_name, target in profile.outputs.items():
                 try:
                     connector = DBConnectorFactory.get_connector(profile_name, target_name)
-                    schema_name = target.database_schema
-                    schema = connector.fetch_schema(schema_name)
-
-                    if settings.schema_categorical_detection:
-                        # Detect categorical columns in the schema
-                        for table in schema:
-                            SchemaExtractor._detect_categorical_columns(
-                                table=table,
-                                connector=connector,
-                                sample_limit=settings.schema_sample_limit,
-                                threshold=settings.schema_categorical_threshold,
-                            )
-
-                    extracted_schemas.append(
-                        SchemaGlossary(
-                            timestamp=time.time(),
-                            profile_name=profile_name,
-                            output_name=target_name,
-                            schema_info=schema,
-                            db_type=target.type or "",
-                        )
-                    )
                 except (ConnectionError, ValueError, KeyError) as e:
                     logger.error(
                         "Error extracting schema for profile '%s', target '%s': %s", profile_name, target_name, e
                     )
+                    continue
+                header = {
+                    "timestamp": time.time(),
+                    "profile_name": profile_name,
+                    "output_name": target_name,
+                    "db_type": target.type or "",
+                }
+                tables = SchemaExtractor.iter_tables(
+                    connector, target.database_schema, detect_categorical=settings.schema_categorical_detection
+                )
+                yield header, SchemaExtractor._log_extraction_errors(tables, profile_name, target_name)
 
-        return extracted_schemas
+    @staticmethod
+    def _log_extraction_errors(
+        tables: Iterator[SchemaInfo], profile_name: str, target_name: str
+    ) -> Iterator[SchemaInfo]:
+        """Yield from ``tables``, logging an extraction error and ending the stream instead of raising it."""
+        try:
+            yield from tables
+        except (ConnectionError, ValueError, KeyError) as e:
+            logger.error("Error extracting schema for profile '%s', target '%s': %s", profile_name, target_name, e)
 
     @staticmethod
     def extract_schema(profile_name: str, target_name: str) -> SchemaGlossary:
@@ -117,7 +129,7 @@ class SchemaExtractor:
         try:
             connector = DBConnectorFactory.get_connector(profile_name, target_name)
             schema_name = connector.config.database_schema
-            schema = connector.fetch_schema(schema_name)
+            schema = list(connector.iter_schema(schema_name))
 
             return SchemaGlossary(
                 timestamp=time.time(),
@@ -130,6 +142,33 @@ class SchemaExtractor:
             logger.error("Error extracting schema for profile '%s', target '%s': %s", profile_name, target_name, e)
             raise
 
+    @staticmethod
+    def iter_tables(
+        connector: BaseDBConnector, schema_name: str, detect_categorical: bool = False
+    ) -> Iterator[SchemaInfo]:
+        """Yield the tables of a schema one by one as the connector streams them.
+
+        Categorical detection samples each table as it arrives, so only the table being processed and
+        its sample rows are held by this stage.
+
+        Args:
+            connector (BaseDBConnector): Connector of the target database.
+            schema_name (str): The name of the schema to extract.
+            detect_categorical (bool): Whether to detect categorical columns and record their values.
+
+        Yields:
+            SchemaInfo: The schema information of one table.
+        """
+        for table in connector.iter_schema(schema_name):
+            if detect_categorical:
+                SchemaExtractor._detect_categorical_columns(
+                    table=table,
+                    connector=connector,
+                    sample_limit=settings.schema_sample_limit,
+                    threshold=settings.schema_categorical_threshold,
+                )
+            yield table
+
     @staticmethod
     def _detect_categorical_columns(
         table: SchemaInfo, connector: BaseDBConnector, sample_limit: int, threshold: int
@@ -159,15 +198,58 @@ class SchemaExtractor:
             logger.warning(f"Could not sample rows for categorical detection on table {table.table_name}: {e}")
 
 
-def load_schema_cache(force_refresh: bool = False) -> list[SchemaGlossary]:
+def write_schema_cache(
+    cache_file: str, schema_profiles: Iterable[SchemaGlossary | tuple[dict, Iterable[SchemaInfo]]]
+) -> None:
+    """Write the schema cache file incrementally, one table at a time.
+
+    Each table is serialized on its own instead of dumping the whole schema as one document, so the
+    writer holds a single table's JSON at a time. Profiles are given as SchemaGlossary objects or as
+    (header, tables) pairs from :meth:`SchemaExtractor.iter_all_schemas`, whose tables are extracted
+    while they are written. The file is written to a temporary name and renamed, so readers never see
+    a partial cache.
+
+    Args:
+        cache_file (str): Path of the schema cache file.
+        schema_profiles (Iterable): The schema profiles to write.
+
+    Raises:
+        OSError: If there is an error writing the cache file.
+    """
+    tmp_file = cache_file + ".tmp"
+    try:
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            f.write(f'{{"timestamp": {json.dumps(time.time())}, "schema_info": [')
+            for profile_idx, profile in enumerate(schema_profiles):
+                if isinstance(profile, SchemaGlossary):
+                    header, tables = profile.model_dump(exclude={"schema_info"}, exclude_none=True), profile.schema_info
+                else:
+                    header, tables = profile
+                f.write(", {" if profile_idx else "{")
+                for key, value in header.items():
+                    f.write(f"{json.dumps(key)}: {json.dumps(value)}, ")
+                f.write('"schema_info": [')
+                for table_idx, table in enumerate(tables):
+                    f.write(f"{', ' if table_idx else ''}{json.dumps(table.model_dump(exclude_none=True))}")
+                f.write("]}")
+            f.write("]}")
+        os.replace(tmp_file, cache_file)
+    finally:
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+
+
+def load_schema_cache(force_refresh: bool = False) -> list[dict[str, Any]]:
     """Load the cached schema if it is fresh, or re-discover and merge with glossary.
     This function checks if the cached schema file exists and is within the refresh threshold.
     If the cache is valid, it loads the schema from the cache.
-    If the cache is invalid or does not exist, it re-discovers the schema from the databases
-    and updates the cache file.
+    If the cache is invalid or does not exist, it re-discovers the schema from the databases,
+    streaming each table into the cache file, and loads the schema from the new cache file.
+    Extraction and the cache write hold one table at a time; the returned schema is the whole
+    cache file in memory, as on a cache hit.
 
     Returns:
-        list[SchemaGlossary]: A list of SchemaGlossary objects containing schema information.
+        list[dict[str, Any]]: The schema profiles as stored in the cache file.
 
     Raises:
         OSError: If there is an error reading or writing the cache file.
@@ -198,14 +280,19 @@ def load_schema_cache(force_refresh: bool = False) -> list[SchemaGlossary]:
         except (OSError, IOError, json.JSONDecodeError) as e:
             logger.error("Error reading schema cache: %s", e)
 
-    # Discover schema from the databases using the configured schema name.
+    # Discover the schema from the databases, streaming each table into the cache file as it is extracted.
     try:
-        schema_info = SchemaExtractor.extract_all_schemas()
+        write_schema_cache(cache_file, SchemaExtractor.iter_all_schemas())
+        logger.info("Schema cache updated at %s", cache_file)
+        with open(cache_file, "r", encoding="utf-8") as f:
+            schema_info = json.load(f)["schema_info"]
         logger.info("Schema discovery completed successfully.")
-        logger.info(schema_info)
     except (ConnectionError, ValueError, KeyError) as e:
         logger.error("Error during schema discovery: %s", e)
         raise
+    except (OSError, IOError) as e:
+        logger.error("Error writing schema cache: %s", e)
+        raise
 
     # Optionally, retrieve business glossary definitions via LLM if enabled. TODO: Fix this
     if settings.retrieve_business_glossary:
@@ -219,19 +306,4 @@ def load_schema_cache(force_refresh: bool = False) -> list[SchemaGlossary]:
     else:
         glossary = {}
 
-    try:
-        with open(cache_file, "w", encoding="utf-8") as f:
-            json.dump(
-                {
-                    "timestamp": time.time(),
-                    "schema_info": [schema.model_dump(exclude_none=True) for schema in schema_info],
-                },
-                f,
-                indent=4,
-            )
-
-        logger.info("Schema cache updated at %s", cache_file)
-    except (OSError, IOError) as e:
-        logger.error("Error writing schema cache: %s", e)
-
     return schema_info
@@ -0,0 +1,136 @@
+"""Approximate nearest-neighbour index for schema embeddings.
+
+This module provides an IVF-flat (inverted file) index built with NumPy only. The normalized embedding
+matrix is partitioned with spherical k-means; a query is compared against the centroids and only the rows
+in the closest ``nprobe`` lists are scored exactly. The index is persisted next to the embedding cache as a
+``.npz`` file so it is built once per schema version.
+"""
+
+import os
+
+import numpy as np
+
+from datu.app_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class IVFFlatIndex:
+    """IVF-flat index over an L2-normalized embedding matrix.
+
+    Attributes:
+        centroids (np.ndarray): Normalized float32 centroid matrix of shape (nlist, dim).
+        ids (np.ndarray): Row ids of the indexed matrix, grouped by inverted list.
+        offsets (np.ndarray): Start offset of each inverted list in ``ids`` (length nlist + 1).
+        count (int): Number of rows in the indexed matrix.
+    """
+
+    def __init__(self, centroids: np.ndarray, ids: np.ndarray, offsets: np.ndarray, count: int):
+        self.centroids = centroids
+        self.ids = ids
+        self.offsets = offsets
+        self.count = count
+
+    @property
+    def nlist(self) -> int:
+        """Number of inverted lists in the index."""
+        return len(self.centroids)
+
+    @staticmethod
+    def default_nlist(count: int) -> int:
+        """Return the default number of inverted lists for a matrix with ``count`` rows."""
+        return max(1, int(np.sqrt(count)))
+
+    @classmethod
+    def build(
+        cls, vectors: np.ndarray, nlist: int = 0, n_iter: int = 10, train_size: int = 64, seed: int = 0
+    ) -> "IVFFlatIndex":
+        """Build an index by clustering the rows of ``vectors`` with spherical k-means.
+
+        Args:
+            vectors: L2-normalized matrix of shape (count, dim).
+            nlist: Number of inverted lists; 0 selects ``sqrt(count)``.
+            n_iter: Number of k-means iterations.
+            train_size: Number of training rows sampled per list.
+            seed: Seed for centroid initialisation and training sampling.
+
+        Returns:
+            IVFFlatIndex: The built index.
+        """
+        count = len(vectors)
+        if count == 0:
+            return cls(
+                np.empty((0, vectors.shape[1] if vectors.ndim == 2 else 0), dtype=np.float32),
+                np.empty(0, dtype=np.int64),
+                np.zeros(1, dtype=np.int64),
+                0,
+            )
+        nlist = min(nlist or cls.default_nlist(count), count)
+        rng = np.random.default_rng(seed)
+        if count > nlist * train_size:
+            train = np.asarray(vectors[np.sort(rng.choice(count, nlist * train_size, replace=False))], np.float32)
+        else:
+            train = np.asarray(vectors, dtype=np.float32)
+        centroids = train[rng.choice(len(train), nlist, replace=False)].copy()
+        for _ in range(n_iter):
+            assignment = cls._assign(train, centroids)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignment, train)
+            empty = np.bincount(assignment, minlength=nlist) == 0
+            if empty.any():
+                sums[empty] = train[rng.choice(len(train), int(empty.sum()), replace=False)]
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            centroids = (sums / norms).astype(np.float32)
+
+        assignment = cls._assign(vectors, centroids)
+        ids = np.argsort(assignment, kind="stable").astype(np.int64)
+        offsets = np.zeros(nlist + 1, dtype=np.int64)
+        np.cumsum(np.bincount(assignment, minlength=nlist), out=offsets[1:])
+        logger.info(f"Built IVF index with {nlist} lists over {count} embeddings.")
+        return cls(centroids, ids, offsets, count)
+
+    @staticmethod
+    def _assign(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+        """Assign each row to its most similar centroid, in chunks to bound temporary memory."""
+        chunk = max(1, (1 << 22) // max(1, len(centroids)))
+        assignment = np.empty(len(vectors), dtype=np.int64)
+        for start in range(0, len(vectors), chunk):
+            block = np.asarray(vectors[start : start + chunk], dtype=np.float32)
+            assignment[start : start + chunk] = np.argmax(block @ centroids.T, axis=1)
+        return assignment
+
+    def search(self, query_vec: np.ndarray, nprobe: int) -> np.ndarray:
+        """Return the sorted row ids stored in the ``nprobe`` lists closest to the query.
+
+        Args:
+            query_vec: L2-normalized query vector.
+            nprobe: Number of inverted lists to visit.
+
+        Returns:
+            np.ndarray: Candidate row ids in ascending order.
+        """
+        if self.count == 0:
+            return np.empty(0, dtype=np.int64)
+        nprobe = min(max(1, nprobe), self.nlist)
+        centroid_sims = self.centroids @ query_vec
+        if nprobe < self.nlist:
+            probes = np.argpartition(-centroid_sims, nprobe - 1)[:nprobe]
+        else:
+            probes = np.arange(self.nlist)
+        candidates = np.concatenate([self.ids[self.offsets[p] : self.offsets[p + 1]] for p in probes])
+        return np.sort(candidates)
+
+    def save(self, path: str) -> None:
+        """Persist the index to a ``.npz`` file, replacing any previous file atomically."""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(f, centroids=self.centroids, ids=self.ids, offsets=self.offsets, count=np.int64(self.count))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "IVFFlatIndex":
+        """Load an index previously written with :meth:`save`."""
+        with np.load(path) as data:
+            return cls(data["centroids"], data["ids"], data["offsets"], int(data["count"]))
@@ -4,6 +4,8 @@ The settings are structured using Pydantic's BaseSettings class, allowing for ea
 It includes settings for RAG and graph files path, embeddings similarity scoring threshold and minimum results fallback.
 """
 
+from typing import Literal
+
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -13,21 +15,88 @@ class SchemaRAGConfig(BaseSettings):
     Configuration settings for schema RAG (Retrieval-Augmented Generation).
 
     Args:
-        rag_debugging (bool): Save debug files for the schema graph RAG.
+        rag_debugging (bool): Save debug files for the schema graph RAG; disabled by default so requests do not
+            queue captures. Files are written by a background thread into one
+            ``rag_debug/<timestamp>-<sequence>-<kind>`` directory per captured request.
+        rag_debug_sample_rate (float): Fraction of requests whose debug files are saved; 1.0 saves every request.
+        rag_debug_queue_size (int): Maximum number of debug captures waiting to be written; further captures are
+            dropped rather than slowing down requests.
+        rag_debug_keep_last (int): Number of most recent debug capture directories kept; 0 keeps all.
         rag_dir (str): Directory to store RAG-related cache files.
         rag_meta_cache_file (str): File name for cached RAG metadata (e.g., timestamp).
         rag_triples_cache_file (str): File name for the extracted schema triples.
+        rag_embedding_backend (str): Embedding backend: "sentence_transformers", "onnx" (ONNX Runtime on CPU, no torch)
+            or "hashing" (dependency-free character n-gram hashing).
+        rag_embedding_model (str): SentenceTransformer model name, or the local model directory for the ONNX backend.
+        rag_onnx_model_file (str): ONNX graph file in the model directory, e.g. a quantized export.
+        rag_hashing_dim (int): Number of dimensions of the hashing backend.
+        rag_embeddings_file (str): File name for the memory-mapped schema embedding matrix.
+        rag_embedding_batch_size (int): Number of triple texts encoded per call when building embeddings.
+        rag_embedding_triples_file (str): File name for the triple table aligned with the embedding matrix.
+        rag_index_type (str): Vector search mode, "exact" brute-force scoring or an "ivf" approximate index.
+        rag_ann_index_file (str): File name for the persisted approximate nearest-neighbour index.
+        rag_ivf_nlist (int): Number of IVF lists; 0 selects the square root of the number of embeddings.
+        rag_ivf_nprobe (int): Number of IVF lists scored per query.
+        rag_query_cache_size (int): Maximum number of query embeddings kept in the LRU cache.
+        rag_conversation_window (int): Number of most recent user messages combined into the query embedding;
+            0 embeds the whole conversation as one concatenated text.
+        rag_conversation_decay (float): Weight of each message relative to the next newer one when combining
+            message embeddings.
+        rag_embedding_quantization (str): In-memory quantization of the embedding matrix used for candidate
+            scoring: "none", "float16" or "int8" with a per-vector scale.
+        rag_quantized_embeddings_file (str): File name for the persisted quantized embedding matrix.
+        rag_rescore_candidates (int): Number of top quantized candidates rescored against the float32 embeddings.
+        rag_shard_by_target (bool): Keep separate triples, embeddings and graph per (profile, target) and search
+            only the active target's shard.
+        rag_result_cache_size (int): Maximum number of retrieval payloads cached per schema RAG shard.
+        rag_retrieval_mode (str): "vector" (default) for embedding similarity only, or "hybrid" to opt in to fusing
+            it with BM25 scores over tokenized identifiers and descriptions.
+        rag_lexical_weight (float): Weight of the normalized BM25 score added to the cosine similarity in hybrid mode.
+        rag_lexical_prefilter_min_rows (int): Embedding count from which hybrid search scores only the lexical
+            candidates of a query, when it has any.
+        rag_search_granularity (str): "triple" scores every schema triple; "table" first matches the query
+            against one summary card per table and then scores only the triples of the best matching tables.
+        rag_table_cards_file (str): File name for the cached table card embeddings.
+        rag_table_cards_top_k (int): Number of best matching tables whose triples are scored when
+            ``rag_search_granularity`` is "table".
+        rag_table_card_max_columns (int): Maximum number of column names summarized on a table card.
+        rag_value_index (bool): Opt in to resolving mentions of categorical column values in the query, exactly or
+            by trigram similarity, and including the columns holding them.
+        rag_value_fuzzy_threshold (float): Minimum trigram Dice similarity of a fuzzy value match; 1.0 disables
+            fuzzy matching.
+        rag_value_max_matches (int): Maximum number of value matches added per query.
         rag_schema_query_score_threshold (float): Similarity threshold for selecting relevant triples in schema queries.
         rag_schema_query_min_results (int): Minimum number of schema triples to return if threshold is not met.
         rag_schema_query_output_dir (str): Directory path where filtered schema and subgraph files are saved.
         graph_rag_enabled (bool): Toggle to enable or disable schema graph RAG.
         graph_dir (str): Directory path for storing graph-related cache files.
+        graph_format (str): Schema graph representation, a compact "csr" graph with table-qualified node ids
+            or a "networkx" graph keyed by bare names.
+        graph_compact_cache_file (str): File name for the cached compact schema graph arrays.
+        graph_join_max_fanout (int): Key column names shared by more tables than this are too generic to infer
+            join edges from.
+        graph_expansion_hops (int): Join distance up to which retrieval adds the join partners of matched tables,
+            with their key columns, from the compact graph; 0 disables graph expansion.
+        graph_expansion_max_tables (int): Maximum number of join partner tables added per query.
+        graph_expansion_decay (float): Score of an added table relative to the table joining it, per hop.
     """
 
     rag_debugging: bool = Field(
-        default=True,
+        default=False,
         description="Save debug files for the schema graph RAG.",
     )
+    rag_debug_sample_rate: float = Field(
+        default=1.0,
+        description="Fraction of requests whose debug files are saved; 1.0 saves every request.",
+    )
+    rag_debug_queue_size: int = Field(
+        default=64,
+        description="Maximum number of debug captures waiting to be written; further captures are dropped.",
+    )
+    rag_debug_keep_last: int = Field(
+        default=100,
+        description="Number of most recent debug capture directories kept; 0 keeps all.",
+    )
     rag_dir: str = Field(
         default="graph_cache",
         description="Directory to store RAG-related cache files.",
@@ -40,6 +109,122 @@ class SchemaRAGConfig(BaseSettings):
         default="schema_triples.json",
         description="File name for the extracted schema triples.",
     )
+    rag_embedding_backend: Literal["sentence_transformers", "onnx", "hashing"] = Field(
+        default="sentence_transformers",
+        description="Embedding backend used to embed schema triples and queries.",
+    )
+    rag_embedding_model: str = Field(
+        default="all-MiniLM-L6-v2",
+        description="SentenceTransformer model name, or the local model directory for the ONNX backend.",
+    )
+    rag_onnx_model_file: str = Field(
+        default="model.onnx",
+        description="ONNX graph file in the model directory used by the ONNX backend.",
+    )
+    rag_hashing_dim: int = Field(
+        default=384,
+        description="Number of dimensions of the hashing embedding backend.",
+    )
+    rag_embeddings_file: str = Field(
+        default="schema_embeddings.npy",
+        description="File name for the memory-mapped schema embedding matrix.",
+    )
+    rag_embedding_batch_size: int = Field(
+        default=1024,
+        description="Number of triple texts encoded per call when building embeddings.",
+    )
+    rag_embedding_triples_file: str = Field(
+        default="schema_embedding_triples.json",
+        description="File name for the triple table aligned with the embedding matrix.",
+    )
+    rag_index_type: Literal["exact", "ivf"] = Field(
+        default="exact",
+        description="Vector search mode, exact brute-force scoring or an IVF approximate index.",
+    )
+    rag_ann_index_file: str = Field(
+        default="schema_ann_index.npz",
+        description="File name for the persisted approximate nearest-neighbour index.",
+    )
+    rag_ivf_nlist: int = Field(
+        default=0,
+        description="Number of IVF lists; 0 selects the square root of the number of embeddings.",
+    )
+    rag_ivf_nprobe: int = Field(
+        default=8,
+        description="Number of IVF lists scored per query.",
+    )
+    rag_query_cache_size: int = Field(
+        default=1024,
+        description="Maximum number of query embeddings kept in the LRU cache.",
+    )
+    rag_conversation_window: int = Field(
+        default=4,
+        description="Number of most recent user messages combined into the query embedding; 0 concatenates all.",
+    )
+    rag_conversation_decay: float = Field(
+        default=0.5,
+        description="Weight of each message relative to the next newer one when combining message embeddings.",
+    )
+    rag_embedding_quantization: Literal["none", "float16", "int8"] = Field(
+        default="none",
+        description="Quantization of the in-memory embedding matrix used for candidate scoring.",
+    )
+    rag_quantized_embeddings_file: str = Field(
+        default="schema_embeddings_quantized.npz",
+        description="File name for the persisted quantized embedding matrix.",
+    )
+    rag_rescore_candidates: int = Field(
+        default=200,
+        description="Number of top quantized candidates rescored against the float32 embeddings.",
+    )
+    rag_shard_by_target: bool = Field(
+        default=True,
+        description="Keep separate schema RAG shards per (profile, target) and search only the active target's shard.",
+    )
+    rag_result_cache_size: int = Field(
+        default=256,
+        description="Maximum number of retrieval payloads cached per schema RAG shard.",
+    )
+    rag_retrieval_mode: Literal["vector", "hybrid"] = Field(
+        default="vector",
+        description="Schema retrieval mode: embedding similarity only, or fused with BM25 lexical scores.",
+    )
+    rag_lexical_weight: float = Field(
+        default=0.3,
+        description="Weight of the normalized BM25 score added to the cosine similarity in hybrid mode.",
+    )
+    rag_lexical_prefilter_min_rows: int = Field(
+        default=20000,
+        description="Embedding count from which hybrid search scores only the lexical candidates of a query.",
+    )
+    rag_search_granularity: Literal["triple", "table"] = Field(
+        default="triple",
+        description="Score every triple, or only the triples of the tables whose summary cards match best.",
+    )
+    rag_table_cards_file: str = Field(
+        default="schema_table_cards.npz",
+        description="File name for the cached table card embeddings.",
+    )
+    rag_table_cards_top_k: int = Field(
+        default=10,
+        description="Number of best matching tables whose triples are scored in table granularity.",
+    )
+    rag_table_card_max_columns: int = Field(
+        default=30,
+        description="Maximum number of column names summarized on a table card.",
+    )
+    rag_value_index: bool = Field(
+        default=False,
+        description="Resolve mentions of categorical column values in the query to the columns holding them.",
+    )
+    rag_value_fuzzy_threshold: float = Field(
+        default=0.75,
+        description="Minimum trigram Dice similarity of a fuzzy value match; 1.0 disables fuzzy matching.",
+    )
+    rag_value_max_matches: int = Field(
+        default=10,
+        description="Maximum number of value matches added per query.",
+    )
     rag_schema_query_score_threshold: float = Field(
         default=0.5,
         description="Similarity threshold for selecting relevant triples in schema queries.",
@@ -60,6 +245,30 @@ class SchemaRAGConfig(BaseSettings):
         default="schema_graph.pkl",
         description="File name for the cached schema graph.",
     )
+    graph_format: Literal["csr", "networkx"] = Field(
+        default="csr",
+        description="Schema graph representation: compact CSR arrays or a NetworkX graph.",
+    )
+    graph_compact_cache_file: str = Field(
+        default="schema_graph.npz",
+        description="File name for the cached compact schema graph arrays.",
+    )
+    graph_join_max_fanout: int = Field(
+        default=20,
+        description="Key column names shared by more tables than this are too generic to infer join edges from.",
+    )
+    graph_expansion_hops: int = Field(
+        default=1,
+        description="Join distance up to which retrieval adds join partner tables; 0 disables graph expansion.",
+    )
+    graph_expansion_max_tables: int = Field(
+        default=5,
+        description="Maximum number of join partner tables added per query.",
+    )
+    graph_expansion_decay: float = Field(
+        default=0.5,
+        description="Score of an added table relative to the table joining it, per hop.",
+    )
 
     model_config = SettingsConfigDict(
         env_nested_delimiter="__",
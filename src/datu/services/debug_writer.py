@@ -0,0 +1,115 @@
+"""Background writer for schema RAG debug outputs.
+
+Debug capture used to serialize indented JSON files on the request path, with every request overwriting the
+same files. This module moves serialization and file I/O to a daemon thread fed by a bounded queue. Requests
+are sampled, each sampled request gets its own directory, and only the most recent directories are kept.
+When the queue is full, the capture is dropped instead of blocking the request.
+"""
+
+import itertools
+import json
+import os
+import queue
+import random
+import re
+import shutil
+import threading
+import time
+from typing import Any, Callable, Dict, Tuple
+
+from datu.app_config import get_logger
+
+logger = get_logger(__name__)
+
+DebugFiles = Callable[[], Dict[str, Any]]
+
+_REQUEST_DIR = re.compile(r"^\d{8}-\d{6}-\d{6}-[a-z_]+$")
+
+
+class DebugOutputWriter:
+    """Writes sampled debug captures on a background thread.
+
+    Args:
+        sample_rate (float): Fraction of submitted captures that are written, between 0 and 1.
+        queue_size (int): Maximum number of captures waiting to be written; further captures are dropped.
+        keep_last (int): Number of most recent request directories kept per output directory; 0 keeps all.
+
+    Attributes:
+        written (int): Number of captures written.
+        dropped (int): Number of sampled captures dropped because the queue was full.
+    """
+
+    def __init__(self, sample_rate: float = 1.0, queue_size: int = 64, keep_last: int = 100):
+        self.sample_rate = sample_rate
+        self.keep_last = keep_last
+        self.written = 0
+        self.dropped = 0
+        self._queue: queue.Queue[Tuple[str, str, DebugFiles]] = queue.Queue(maxsize=queue_size)
+        self._sequence = itertools.count()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def submit(self, output_dir: str, kind: str, build_files: DebugFiles) -> str | None:
+        """Queue a capture if it is sampled.
+
+        Args:
+            output_dir: Directory receiving one subdirectory per captured request.
+            kind: Short label of the capture, such as "retriever" or "subgraph", used in the directory name.
+            build_files: Callable returning a map of file name (without ".json") to JSON-serializable content.
+                It runs on the writer thread, so it must only read data that is not modified afterwards.
+
+        Returns:
+            str | None: The request directory the capture will be written to, or None if it was not queued.
+        """
+        if self.sample_rate <= 0 or (self.sample_rate < 1 and random.random() >= self.sample_rate):  # nosec B311
+            return None
+        request_dir = os.path.join(
+            output_dir, f"{time.strftime('%Y%m%d-%H%M%S')}-{next(self._sequence) % 1000000:06d}-{kind}"
+        )
+        self._ensure_thread()
+        try:
+            self._queue.put_nowait((output_dir, request_dir, build_files))
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            return None
+        return request_dir
+
+    def flush(self) -> None:
+        """Block until every queued capture has been written."""
+        self._queue.join()
+
+    def _ensure_thread(self) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="datu-rag-debug", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            output_dir, request_dir, build_files = self._queue.get()
+            try:
+                self._write(request_dir, build_files())
+                self._prune(output_dir)
+                with self._lock:
+                    self.written += 1
+            except Exception as e:
+                logger.warning(f"[Debug] Failed to write debug outputs to {request_dir}: {e}")
+            finally:
+                self._queue.task_done()
+
+    @staticmethod
+    def _write(request_dir: str, files: Dict[str, Any]) -> None:
+        os.makedirs(request_dir, exist_ok=True)
+        for name, content in files.items():
+            with open(os.path.join(request_dir, f"{name}.json"), "w", encoding="utf-8") as f:
+                json.dump(content, f, indent=2, default=str)
+        logger.debug(f"[Debug] RAG debug outputs saved in {request_dir}.")
+
+    def _prune(self, output_dir: str) -> None:
+        """Remove the oldest request directories beyond ``keep_last``."""
+        if self.keep_last <= 0:
+            return
+        request_dirs = sorted(name for name in os.listdir(output_dir) if _REQUEST_DIR.match(name))
+        for name in request_dirs[: -self.keep_last]:
+            shutil.rmtree(os.path.join(output_dir, name), ignore_errors=True)
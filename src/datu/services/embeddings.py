@@ -0,0 +1,276 @@
+"""Embedding backends, model registry and query embedding cache.
+
+This module keeps one embedding model instance per model key for the whole process. Models are
+loaded lazily on first use and shared by every schema vectorizer and retriever, so constructing a
+vectorizer is cheap and the model weights are resident only once. It also provides a bounded LRU
+cache for query embeddings, so repeated questions and retries are not re-encoded.
+
+A model key has the form ``<backend>:<model>``. Three backends are available:
+
+- ``sentence_transformers``: a SentenceTransformer model by name (requires torch).
+- ``onnx``: a transformer exported to ONNX in a local directory with its ``tokenizer.json``, run on
+  the ONNX Runtime CPU provider with mean pooling. ``<model>`` is ``<directory>#<model file>``, so a
+  quantized export is a different model.
+- ``hashing``: a dependency-free encoder that hashes character n-grams of identifiers into a fixed
+  number of dimensions; ``<model>`` is the dimension.
+"""
+
+import os
+import re
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Protocol
+
+import numpy as np
+
+from datu.app_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class EmbeddingBackend(Protocol):
+    """Interface of an embedding model: SentenceTransformer-compatible ``encode``."""
+
+    def encode(self, sentences: List[str], normalize_embeddings: bool = True) -> np.ndarray:
+        """Embed ``sentences`` into a float matrix with one row per sentence."""
+
+
+def load_sentence_transformer(model_name: str) -> Any:
+    """Load a SentenceTransformer model by name.
+
+    The import is deferred so that torch is only loaded once a model is actually needed.
+    """
+    from sentence_transformers import SentenceTransformer  # pylint: disable=import-outside-toplevel
+
+    logger.info(f"Loading embedding model '{model_name}'.")
+    return SentenceTransformer(model_name)
+
+
+def _l2_normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+class OnnxEmbeddingBackend:
+    """Transformer encoder exported to ONNX, run with ONNX Runtime on CPU.
+
+    The model directory holds the ONNX graph and the Hugging Face ``tokenizer.json``. Token embeddings
+    of the first output are mean-pooled over the attention mask.
+
+    Args:
+        model_dir (str): Directory with the ONNX model and ``tokenizer.json``.
+        model_file (str): File name of the ONNX graph, e.g. a quantized ``model_quantized.onnx``.
+        max_length (int): Maximum number of tokens per text.
+        batch_size (int): Number of texts per inference call.
+    """
+
+    def __init__(self, model_dir: str, model_file: str = "model.onnx", max_length: int = 256, batch_size: int = 32):
+        import onnxruntime  # pylint: disable=import-outside-toplevel
+        from tokenizers import Tokenizer  # pylint: disable=import-outside-toplevel
+
+        self.session = onnxruntime.InferenceSession(
+            os.path.join(model_dir, model_file), providers=["CPUExecutionProvider"]
+        )
+        self.input_names = {model_input.name for model_input in self.session.get_inputs()}
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length=max_length)
+        self.tokenizer.enable_padding()
+        self.batch_size = batch_size
+
+    def encode(self, sentences: List[str], normalize_embeddings: bool = True) -> np.ndarray:
+        """Embed ``sentences`` with mean pooling; rows are L2-normalized if requested."""
+        batches = []
+        for start in range(0, len(sentences), self.batch_size):
+            encodings = self.tokenizer.encode_batch(sentences[start : start + self.batch_size])
+            mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+            feeds = {"input_ids": np.array([e.ids for e in encodings], dtype=np.int64), "attention_mask": mask}
+            if "token_type_ids" in self.input_names:
+                feeds["token_type_ids"] = np.array([e.type_ids for e in encodings], dtype=np.int64)
+            token_embeddings = self.session.run(None, feeds)[0]
+            weights = mask[:, :, None].astype(np.float32)
+            batches.append((token_embeddings * weights).sum(axis=1) / np.maximum(weights.sum(axis=1), 1e-9))
+        if not batches:
+            return np.empty((0, 0), dtype=np.float32)
+        embeddings = np.vstack(batches).astype(np.float32)
+        return _l2_normalize(embeddings) if normalize_embeddings else embeddings
+
+
+class HashingEmbeddingBackend:
+    """Dependency-free encoder hashing words and their character n-grams into a fixed-size vector.
+
+    Words are lowercased and split on underscores and camelCase boundaries, so identifiers and their
+    natural-language spellings share features. Each feature is hashed with CRC32 to a dimension and a sign.
+
+    Args:
+        dim (int): Number of dimensions.
+        ngram_range (tuple[int, int]): Minimum and maximum character n-gram length.
+    """
+
+    _WORD = re.compile(r"[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|\d+")
+
+    def __init__(self, dim: int = 384, ngram_range: tuple[int, int] = (3, 5)):
+        self.dim = dim
+        self.ngram_range = ngram_range
+
+    def features(self, text: str) -> List[str]:
+        """Return the words of ``text`` and the character n-grams of each word padded with spaces."""
+        words = [word.lower() for word in self._WORD.findall(text)]
+        features = list(words)
+        low, high = self.ngram_range
+        for word in words:
+            padded = f" {word} "
+            for n in range(low, min(high, len(padded)) + 1):
+                features.extend(padded[i : i + n] for i in range(len(padded) - n + 1))
+        return features
+
+    def encode(self, sentences: List[str], normalize_embeddings: bool = True) -> np.ndarray:
+        """Embed ``sentences`` by signed feature hashing; rows are L2-normalized if requested."""
+        embeddings = np.zeros((len(sentences), self.dim), dtype=np.float32)
+        for row, text in enumerate(sentences):
+            hashes = np.array([zlib.crc32(f.encode("utf-8")) for f in self.features(text)], dtype=np.uint64)
+            if len(hashes):
+                signs = np.where(hashes & (1 << 31), -1.0, 1.0).astype(np.float32)
+                np.add.at(embeddings[row], (hashes % self.dim).astype(np.int64), signs)
+        return _l2_normalize(embeddings) if normalize_embeddings else embeddings
+
+
+def embedding_model_key(backend: str, model: str) -> str:
+    """Return the registry and store key of a model: ``<backend>:<model>``."""
+    return f"{backend}:{model}"
+
+
+def load_embedding_backend(model_key: str) -> EmbeddingBackend:
+    """Load the embedding backend for a ``<backend>:<model>`` key.
+
+    Keys without a backend prefix are SentenceTransformer model names.
+
+    Raises:
+        ValueError: If the backend is unknown.
+    """
+    backend, _, model = model_key.partition(":")
+    if not model:
+        return load_sentence_transformer(model_key)
+    if backend == "sentence_transformers":
+        return load_sentence_transformer(model)
+    if backend == "onnx":
+        model_dir, _, model_file = model.partition("#")
+        logger.info(f"Loading ONNX embedding model from '{model_dir}'.")
+        return OnnxEmbeddingBackend(model_dir, model_file or "model.onnx")
+    if backend == "hashing":
+        return HashingEmbeddingBackend(dim=int(model))
+    raise ValueError(f"Unknown embedding backend '{backend}'.")
+
+
+class EmbeddingModelRegistry:
+    """Thread-safe, lazily populated registry of embedding models keyed by model key.
+
+    Args:
+        loader (Callable[[str], Any]): Function that loads a model for a given key.
+    """
+
+    def __init__(self, loader: Callable[[str], Any] = load_embedding_backend):
+        self._loader = loader
+        self._models: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def get(self, model_name: str) -> Any:
+        """Return the model for ``model_name``, loading it on first access.
+
+        Args:
+            model_name (str): Name of the embedding model.
+
+        Returns:
+            Any: The shared model instance.
+        """
+        model = self._models.get(model_name)
+        if model is not None:
+            return model
+        with self._lock:
+            model = self._models.get(model_name)
+            if model is None:
+                model = self._loader(model_name)
+                self._models[model_name] = model
+        return model
+
+    def is_loaded(self, model_name: str) -> bool:
+        """Return whether the model for ``model_name`` has already been loaded."""
+        return model_name in self._models
+
+    def clear(self) -> None:
+        """Drop all loaded models."""
+        with self._lock:
+            self._models.clear()
+
+
+embedding_models = EmbeddingModelRegistry()
+
+
+def get_embedding_model(model_name: str) -> Any:
+    """Return the process-wide embedding model for ``model_name``.
+
+    Args:
+        model_name (str): Name of the embedding model.
+
+    Returns:
+        Any: The shared, lazily loaded model instance.
+    """
+    return embedding_models.get(model_name)
+
+
+def normalize_query_text(text: str) -> str:
+    """Normalize a query for embedding cache lookups by collapsing whitespace."""
+    return " ".join(text.split())
+
+
+class QueryEmbeddingCache:
+    """Thread-safe bounded LRU cache of query embeddings keyed by normalized query text.
+
+    Args:
+        maxsize (int): Maximum number of cached embeddings; 0 disables caching.
+
+    Attributes:
+        hits (int): Number of lookups served from the cache.
+        misses (int): Number of lookups that had to be encoded.
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, np.ndarray] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> np.ndarray | None:
+        """Return the cached embedding for ``key`` and mark it as recently used."""
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return vector
+
+    def put(self, key: str, vector: np.ndarray) -> None:
+        """Store an embedding, evicting the least recently used entries beyond ``maxsize``."""
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = vector
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop all cached embeddings and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Return the cache size, capacity and hit/miss counters."""
+        with self._lock:
+            return {"size": len(self._entries), "maxsize": self.maxsize, "hits": self.hits, "misses": self.misses}
@@ -0,0 +1,143 @@
+"""Executor for CPU-bound request stages.
+
+Schema retrieval (model inference and vector scoring) and SQL parsing are synchronous and CPU-bound.
+Running them directly inside ``async`` request handlers stalls every other coroutine on the worker, so
+they are dispatched to a dedicated, size-configurable thread or process pool. The executor tracks how
+many tasks are running and waiting, so saturation is visible before it turns into latency.
+
+A process pool only runs stateless stages such as SQL parsing. Stages that use process state, like schema
+retrieval with its embedding model, RAG indexes and caches, always run on threads of the serving process:
+in worker processes every worker would load its own copy, miss the caches and never see RAG refreshes.
+"""
+
+import asyncio
+import functools
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, Callable, Dict, Literal, Tuple, TypeVar
+
+from datu.app_config import get_app_settings, get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+
+class CPUBoundExecutor:
+    """Runs blocking callables off the event loop on a dedicated pool and records queue-depth metrics.
+
+    Args:
+        max_workers (int): Number of worker threads or processes.
+        kind (str): "thread" for a thread pool or "process" for a process pool for stateless stages.
+            Callables and their arguments must be picklable when a process pool is used.
+
+    Attributes:
+        max_workers (int): Number of worker threads or processes.
+        kind (str): Type of the underlying pool.
+    """
+
+    def __init__(self, max_workers: int = 4, kind: Literal["thread", "process"] = "thread"):
+        self.max_workers = max(1, max_workers)
+        self.kind = kind
+        self._executor: Executor | None = None
+        self._thread_executor: Executor | None = None
+        self._lock = threading.Lock()
+        self._in_flight: Dict[str, int] = {}
+        self._max_queue_depth: Dict[str, int] = {}
+        self._submitted = 0
+        self._completed = 0
+        self._failed = 0
+
+    def _get_executor(self, stateful: bool = False) -> Tuple[str, Executor]:
+        """Return the name and pool that run a task; callers hold ``_lock``."""
+        if self.kind == "process" and not stateful:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+                logger.info(f"Started process executor with {self.max_workers} workers for stateless stages.")
+            return "process", self._executor
+        if self._thread_executor is None:
+            self._thread_executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="datu-cpu")
+            logger.info(f"Started thread executor with {self.max_workers} workers for CPU-bound stages.")
+        return "thread", self._thread_executor
+
+    async def run(self, func: Callable[..., T], *args: Any, stateful: bool = False, **kwargs: Any) -> T:
+        """Run ``func(*args, **kwargs)`` on the pool and await its result without blocking the event loop.
+
+        Args:
+            func (Callable): The blocking callable to run.
+            *args: Positional arguments for ``func``.
+            stateful (bool): Whether ``func`` uses state of the serving process, such as the schema RAG or
+                its caches. Stateful callables run on threads even when ``kind`` is "process".
+            **kwargs: Keyword arguments for ``func``.
+
+        Returns:
+            The return value of ``func``.
+        """
+        with self._lock:
+            pool, executor = self._get_executor(stateful)
+            self._submitted += 1
+            in_flight = self._in_flight[pool] = self._in_flight.get(pool, 0) + 1
+            self._max_queue_depth[pool] = max(self._max_queue_depth.get(pool, 0), in_flight - self.max_workers)
+        try:
+            return await asyncio.get_running_loop().run_in_executor(executor, functools.partial(func, *args, **kwargs))
+        except Exception:
+            with self._lock:
+                self._failed += 1
+            raise
+        finally:
+            with self._lock:
+                self._in_flight[pool] -= 1
+                self._completed += 1
+
+    def metrics(self) -> Dict[str, Any]:
+        """Return a snapshot of the executor load.
+
+        In process mode, stateful stages run on a separate thread pool of the same size, so the load is also
+        reported per pool under ``pools``; the top-level counts are summed over the pools.
+
+        Returns:
+            dict: Pool kind and size, running and queued task counts, the highest queue depth seen,
+            the number of submitted, completed and failed tasks, and the load of each started pool.
+        """
+        with self._lock:
+            pools = {
+                pool: {
+                    "max_workers": self.max_workers,
+                    "running": min(in_flight, self.max_workers),
+                    "queue_depth": max(0, in_flight - self.max_workers),
+                    "max_queue_depth": self._max_queue_depth[pool],
+                }
+                for pool, in_flight in self._in_flight.items()
+            }
+            return {
+                "kind": self.kind,
+                "max_workers": self.max_workers,
+                "running": sum(stats["running"] for stats in pools.values()),
+                "queue_depth": sum(stats["queue_depth"] for stats in pools.values()),
+                "max_queue_depth": max((stats["max_queue_depth"] for stats in pools.values()), default=0),
+                "pools": pools,
+                "submitted": self._submitted,
+                "completed": self._completed,
+                "failed": self._failed,
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Shut down the underlying pools; they are recreated on the next :meth:`run`."""
+        with self._lock:
+            executors = [self._executor, self._thread_executor]
+            self._executor = self._thread_executor = None
+        for executor in executors:
+            if executor is not None:
+                executor.shutdown(wait=wait)
+
+
+@lru_cache(maxsize=1)
+def get_cpu_executor() -> CPUBoundExecutor:
+    """Return the process-wide executor for CPU-bound request stages.
+
+    Returns:
+        CPUBoundExecutor: Executor sized from ``cpu_executor_workers`` and ``cpu_executor_kind``.
+    """
+    settings = get_app_settings()
+    return CPUBoundExecutor(max_workers=settings.cpu_executor_workers, kind=settings.cpu_executor_kind)
@@ -0,0 +1,99 @@
+"""Lexical inverted index for schema retrieval.
+
+Embedding search misses exact identifier mentions such as ``SALESORDERID``. This module provides an
+in-memory BM25 index over tokenized schema identifiers and descriptions. Identifiers are indexed both whole
+and split on underscores and camelCase boundaries, so ``SalesOrderID`` matches ``salesorderid`` as well as
+``sales order id``. Term weights are precomputed at build time; a query only touches the postings of its
+own tokens.
+"""
+
+import math
+import re
+from collections import Counter, defaultdict
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+_WORD = re.compile(r"\w+")
+_IDENTIFIER_PART = re.compile(r"[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|\d+")
+
+
+def tokenize_identifier(text: str) -> List[str]:
+    """Split text into lowercase tokens, keeping whole identifiers and their underscore/camelCase parts.
+
+    Args:
+        text: Identifier, description or query text.
+
+    Returns:
+        list[str]: Tokens in order of appearance; whole identifiers precede their parts.
+    """
+    tokens = []
+    for word in _WORD.findall(text):
+        tokens.append(word.lower())
+        parts = [part.lower() for piece in word.split("_") for part in _IDENTIFIER_PART.findall(piece)]
+        if len(parts) > 1:
+            tokens.extend(parts)
+    return tokens
+
+
+class BM25Index:
+    """BM25 inverted index with precomputed per-posting term weights.
+
+    Tokens that occur in more than ``max_df_ratio`` of the documents carry almost no signal, so they are
+    left out of the index.
+
+    Args:
+        documents (list[str]): Document texts; document ids are their positions.
+        k1 (float): Term frequency saturation parameter.
+        b (float): Document length normalization parameter.
+        max_df_ratio (float): Maximum fraction of documents a token may occur in to be indexed.
+
+    Attributes:
+        count (int): Number of indexed documents.
+        postings (dict): Map of token to (document ids, BM25 term weights) arrays, ordered by document id.
+    """
+
+    def __init__(self, documents: List[str], k1: float = 1.2, b: float = 0.75, max_df_ratio: float = 0.5):
+        self.count = len(documents)
+        self.postings: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        if not documents:
+            return
+        term_docs: Dict[str, List[int]] = defaultdict(list)
+        term_freqs: Dict[str, List[int]] = defaultdict(list)
+        lengths = np.empty(self.count, dtype=np.float32)
+        for doc_id, document in enumerate(documents):
+            counts = Counter(tokenize_identifier(document))
+            lengths[doc_id] = sum(counts.values())
+            for token, freq in counts.items():
+                term_docs[token].append(doc_id)
+                term_freqs[token].append(freq)
+        avg_length = float(lengths.mean()) or 1.0
+        norms = k1 * (1.0 - b + b * lengths / avg_length)
+        max_df = max(1, int(max_df_ratio * self.count))
+        for token, doc_ids in term_docs.items():
+            df = len(doc_ids)
+            if df > max_df:
+                continue
+            ids = np.array(doc_ids, dtype=np.int64)
+            tf = np.array(term_freqs[token], dtype=np.float32)
+            idf = math.log(1.0 + (self.count - df + 0.5) / (df + 0.5))
+            self.postings[token] = (ids, (idf * tf * (k1 + 1.0) / (tf + norms[ids])).astype(np.float32))
+
+    def search(self, query: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Score the documents that share at least one indexed token with the query.
+
+        Args:
+            query: Query text.
+
+        Returns:
+            Document ids in ascending order and their BM25 scores divided by the best score, so the
+            strongest lexical match scores 1.0.
+        """
+        matched = [
+            self.postings[token] for token in dict.fromkeys(tokenize_identifier(query)) if token in self.postings
+        ]
+        if not matched:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        doc_ids, inverse = np.unique(np.concatenate([ids for ids, _ in matched]), return_inverse=True)
+        scores = np.bincount(inverse, weights=np.concatenate([weights for _, weights in matched])).astype(np.float32)
+        return doc_ids, scores / scores.max()
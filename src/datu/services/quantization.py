@@ -0,0 +1,106 @@
+"""Quantized storage for schema embeddings.
+
+The float32 embedding matrix stays on disk, memory-mapped. Candidate scoring runs on a quantized copy held
+in memory: float16 halves the footprint, and int8 codes with one float32 scale per row cut it to about a
+quarter. Scores on the quantized matrix are approximate, so callers rescore their top candidates against
+the float32 rows.
+"""
+
+import os
+from typing import Literal
+
+import numpy as np
+
+QuantizationKind = Literal["float16", "int8"]
+
+
+class QuantizedMatrix:
+    """Quantized copy of an L2-normalized embedding matrix.
+
+    Attributes:
+        kind (str): "float16" or "int8".
+        codes (np.ndarray): Quantized rows, float16 or int8.
+        scales (np.ndarray | None): Per-row float32 dequantization scale for int8 codes, None for float16.
+    """
+
+    # Rows converted to float32 at a time, to bound temporary memory.
+    chunk_rows = 65536
+
+    def __init__(self, kind: QuantizationKind, codes: np.ndarray, scales: np.ndarray | None = None):
+        self.kind = kind
+        self.codes = codes
+        self.scales = scales
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    @property
+    def nbytes(self) -> int:
+        """Memory used by the codes and scales."""
+        return self.codes.nbytes + (0 if self.scales is None else self.scales.nbytes)
+
+    @classmethod
+    def quantize(cls, matrix: np.ndarray, kind: QuantizationKind) -> "QuantizedMatrix":
+        """Quantize a float matrix, in chunks so a memory-mapped matrix is never fully loaded.
+
+        Args:
+            matrix: Matrix of shape (count, dim).
+            kind: "float16", or "int8" with a symmetric per-row scale of ``max(|row|) / 127``.
+
+        Returns:
+            QuantizedMatrix: The quantized matrix.
+        """
+        if kind == "float16":
+            codes = np.empty(matrix.shape, dtype=np.float16)
+            for start in range(0, len(matrix), cls.chunk_rows):
+                codes[start : start + cls.chunk_rows] = matrix[start : start + cls.chunk_rows]
+            return cls(kind, codes)
+        codes = np.empty(matrix.shape, dtype=np.int8)
+        scales = np.empty(len(matrix), dtype=np.float32)
+        for start in range(0, len(matrix), cls.chunk_rows):
+            block = np.asarray(matrix[start : start + cls.chunk_rows], dtype=np.float32)
+            block_scales = np.abs(block).max(axis=1, initial=0.0) / 127.0
+            block_scales[block_scales == 0] = 1.0
+            codes[start : start + cls.chunk_rows] = np.rint(block / block_scales[:, None])
+            scales[start : start + cls.chunk_rows] = block_scales
+        return cls(kind, codes, scales)
+
+    def dot(self, query_vec: np.ndarray, rows: np.ndarray | None = None) -> np.ndarray:
+        """Return the approximate dot products of the query with all rows or with ``rows``.
+
+        Args:
+            query_vec: Float32 query vector.
+            rows: Row ids to score; None scores every row.
+
+        Returns:
+            np.ndarray: Float32 scores aligned with ``rows`` (or with the matrix rows).
+        """
+        count = len(self.codes) if rows is None else len(rows)
+        sims = np.empty(count, dtype=np.float32)
+        for start in range(0, count, self.chunk_rows):
+            end = start + self.chunk_rows
+            block = self.codes[start:end] if rows is None else self.codes[rows[start:end]]
+            sims[start:end] = block.astype(np.float32) @ query_vec
+        if self.scales is not None:
+            sims *= self.scales if rows is None else self.scales[rows]
+        return sims
+
+    def save(self, path: str) -> None:
+        """Persist the quantized matrix to a ``.npz`` file, replacing any previous file atomically."""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(
+                f,
+                kind=np.array(self.kind),
+                codes=self.codes,
+                scales=np.empty(0, dtype=np.float32) if self.scales is None else self.scales,
+            )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "QuantizedMatrix":
+        """Load a quantized matrix previously written with :meth:`save`."""
+        with np.load(path) as data:
+            kind = str(data["kind"])
+            return cls(kind, data["codes"], data["scales"] if kind == "int8" else None)  # type: ignore[arg-type]
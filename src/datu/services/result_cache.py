@@ -0,0 +1,99 @@
+"""Result cache for schema retrieval.
+
+Follow-up questions in a chat session often repeat the previous query almost verbatim. This module
+provides a bounded LRU cache of finished ``{"schema_info": ...}`` payloads. Keys include the schema
+content version and the retrieval settings, so a cached payload is never served for another schema
+or configuration.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Tuple
+
+
+def estimate_payload_size(payload: Any) -> int:
+    """Estimate the serialized size of a payload from its content without serializing it.
+
+    Strings count their length, including table and column descriptions and categorical values, dict keys
+    count their length, and numbers, booleans and None count 8 bytes each.
+    """
+    if isinstance(payload, str):
+        return len(payload)
+    if isinstance(payload, dict):
+        return sum(len(str(key)) + estimate_payload_size(value) for key, value in payload.items())
+    if isinstance(payload, (list, tuple, set)):
+        return sum(estimate_payload_size(item) for item in payload)
+    return 8
+
+
+class SchemaResultCache:
+    """Thread-safe bounded LRU cache of schema retrieval payloads.
+
+    Args:
+        maxsize (int): Maximum number of cached payloads; 0 disables caching.
+
+    Attributes:
+        hits (int): Number of lookups served from the cache.
+        misses (int): Number of lookups that had to run retrieval.
+    """
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[Hashable, Tuple[Dict[str, Any], int]] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Dict[str, Any] | None:
+        """Return the cached payload for ``key`` and mark it as recently used."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, payload: Dict[str, Any]) -> None:
+        """Store a payload, evicting the least recently used entries beyond ``maxsize``.
+
+        The payload is shared with later hits and must not be modified afterwards.
+        """
+        if self.maxsize <= 0:
+            return
+        size = estimate_payload_size(payload)
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+            self._entries[key] = (payload, size)
+            self._bytes += size
+            while len(self._entries) > self.maxsize:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+
+    def clear(self) -> None:
+        """Drop all cached payloads and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the cache size, capacity, hit/miss counters, hit rate and approximate memory use.
+
+        Memory is estimated with :func:`estimate_payload_size`.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "approx_bytes": self._bytes,
+            }
@@ -0,0 +1,361 @@
+"""Compact schema graph module.
+
+This module provides an integer-ID representation of the schema graph. Node names are interned once,
+tables and columns are qualified as ``schema.table`` and ``schema.table.column`` so that columns with the
+same name in different tables stay distinct, and edges are stored as CSR adjacency arrays with integer
+predicate codes. The graph is persisted as a single ``.npz`` file of NumPy arrays and can be exported to
+NetworkX for debugging.
+
+Besides the edges mirroring the schema triples, the graph holds inferred ``joins_with`` edges between key
+columns, so retrieval can walk from a matched table to its join partners.
+"""
+
+import os
+import re
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Set, Tuple
+
+import networkx as nx
+import numpy as np
+
+from datu.app_config import get_logger
+from datu.schema_extractor.schema_cache import SchemaGlossary
+
+logger = get_logger(__name__)
+
+TABLE_NODE = 0
+COLUMN_NODE = 1
+VALUE_NODE = 2
+
+JOIN_PREDICATE = "joins_with"
+
+# Key column names: a prefix followed by "_id"/"_key" or a camelCase "Id"/"ID"/"Key" suffix. The prefix
+# names the referenced entity, so "CustomerID" and "customer_id" both point to a "customer(s)" table.
+_KEY_COLUMN = re.compile(r"^(?P<prefix>.+?)(?:_(?:id|ID|Id|key|KEY|Key)|(?<=[a-z0-9])(?:Id|ID|Key))$")
+
+
+def is_key_column(column_name: str) -> bool:
+    """Whether a column name looks like a key: ``customer_id``, ``CustomerID``, ``customerKey`` or ``id``."""
+    return bool(_KEY_COLUMN.match(column_name)) or _normalize_identifier(column_name) == "id"
+
+
+def _normalize_identifier(name: str) -> str:
+    return name.replace("_", "").lower()
+
+
+def _entity_names(prefix: str) -> Set[str]:
+    """Return the normalized table names an entity prefix may refer to, singular or plural."""
+    names = {prefix, f"{prefix}s", f"{prefix}es"}
+    if prefix.endswith("y"):
+        names.add(f"{prefix[:-1]}ies")
+    return names
+
+
+def _pack_strings(strings: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """Pack strings into one UTF-8 byte buffer and an offsets array."""
+    encoded = [s.encode("utf-8") for s in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(b) for b in encoded], out=offsets[1:])
+    return np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets
+
+
+def _unpack_strings(blob: np.ndarray, offsets: np.ndarray) -> List[str]:
+    """Inverse of :func:`_pack_strings`."""
+    data = blob.tobytes()
+    return [data[offsets[i] : offsets[i + 1]].decode("utf-8") for i in range(len(offsets) - 1)]
+
+
+def _value_name(value: Any) -> str:
+    if isinstance(value, list):
+        value = tuple(value)
+    return str(value)
+
+
+class CompactSchemaGraph:
+    """Directed schema graph with interned node ids and CSR adjacency in both directions.
+
+    Attributes:
+        node_names (list[str]): Node name for each node id.
+        node_kinds (np.ndarray): Node kind code (table, column or value) for each node id.
+        predicate_names (list[str]): Predicate name for each predicate code.
+        indptr (np.ndarray): CSR row pointer of outgoing edges.
+        indices (np.ndarray): Target node id of each outgoing edge.
+        predicates (np.ndarray): Predicate code of each outgoing edge.
+        rev_indptr (np.ndarray): CSR row pointer of incoming edges.
+        rev_indices (np.ndarray): Source node id of each incoming edge.
+        rev_predicates (np.ndarray): Predicate code of each incoming edge.
+    """
+
+    def __init__(
+        self,
+        node_names: List[str],
+        node_kinds: np.ndarray,
+        predicate_names: List[str],
+        sources: np.ndarray,
+        targets: np.ndarray,
+        predicates: np.ndarray,
+    ):
+        self.node_names = node_names
+        self.node_kinds = node_kinds
+        self.predicate_names = predicate_names
+        self.node_index: Dict[str, int] = {name: i for i, name in enumerate(node_names)}
+        self.indptr, self.indices, self.predicates = self._to_csr(len(node_names), sources, targets, predicates)
+        self.rev_indptr, self.rev_indices, self.rev_predicates = self._to_csr(
+            len(node_names), targets, sources, predicates
+        )
+        self._column_tables: np.ndarray | None = None
+        self._tables_by_name: Dict[str, List[int]] | None = None
+
+    @staticmethod
+    def _to_csr(
+        num_nodes: int, sources: np.ndarray, targets: np.ndarray, predicates: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        order = np.lexsort((targets, sources))
+        indptr = np.zeros(num_nodes + 1, dtype=np.int64)
+        np.cumsum(np.bincount(sources, minlength=num_nodes), out=indptr[1:])
+        return indptr, targets[order].astype(np.int32), predicates[order].astype(np.int16)
+
+    @classmethod
+    def from_profiles(
+        cls, schema_profiles: Iterable[SchemaGlossary], max_join_fanout: int = 20
+    ) -> "CompactSchemaGraph":
+        """Build the graph from schema profiles, qualifying tables and columns by schema name.
+
+        The edges mirror the schema triples: tables link to their attributes and columns with
+        ``has_<field>`` predicates, and columns link to their attributes with ``has_<field>`` or
+        ``is_categorical``. Key columns are linked in both directions with ``joins_with`` edges when
+        two tables share a key column name (``customer_id`` in ``orders`` and ``invoices``), or when a
+        key column names a table with an ``id`` column (``customer_id`` and ``customers.id``).
+
+        Args:
+            schema_profiles: Parsed schema profiles.
+            max_join_fanout: Key column names shared by more tables than this are too generic to infer
+                joins from.
+
+        Returns:
+            CompactSchemaGraph: The built graph.
+        """
+        node_ids: Dict[str, int] = {}
+        node_kinds: List[int] = []
+        predicate_ids: Dict[str, int] = {}
+        edges = set()
+        key_columns: Dict[str, List[int]] = defaultdict(list)
+        foreign_keys: List[Tuple[int, str]] = []
+        id_columns: Dict[str, List[int]] = defaultdict(list)
+
+        def intern(name: str, kind: int) -> int:
+            node_id = node_ids.get(name)
+            if node_id is None:
+                node_id = node_ids[name] = len(node_kinds)
+                node_kinds.append(kind)
+            return node_id
+
+        def add_edge(source: int, predicate: str, target: int) -> None:
+            code = predicate_ids.setdefault(predicate, len(predicate_ids))
+            edges.add((source, target, code))
+
+        for profile in schema_profiles:
+            for table in profile.schema_info:
+                if not table.table_name:
+                    continue
+                table_name = f"{table.schema_name}.{table.table_name}"
+                table_id = intern(table_name, TABLE_NODE)
+                for key, value in table.model_dump(exclude={"table_name", "columns"}).items():
+                    if value is not None:
+                        add_edge(table_id, f"has_{key}", intern(_value_name(value), VALUE_NODE))
+                for column in table.columns or []:
+                    if not column.column_name:
+                        continue
+                    column_id = intern(f"{table_name}.{column.column_name}", COLUMN_NODE)
+                    add_edge(table_id, "has_column", column_id)
+                    key = _KEY_COLUMN.match(column.column_name)
+                    if key:
+                        key_columns[_normalize_identifier(column.column_name)].append(column_id)
+                        foreign_keys.append((column_id, _normalize_identifier(key.group("prefix"))))
+                    elif _normalize_identifier(column.column_name) == "id":
+                        id_columns[_normalize_identifier(table.table_name)].append(column_id)
+                    for key, value in column.model_dump(exclude={"column_name"}).items():
+                        if value is None:
+                            continue
+                        predicate = f"is_{key}" if key == "categorical" else f"has_{key}"
+                        add_edge(column_id, predicate, intern(_value_name(value), VALUE_NODE))
+
+        for column_ids in key_columns.values():
+            if 1 < len(column_ids) <= max_join_fanout:
+                for source in column_ids:
+                    for target in column_ids:
+                        if source != target:
+                            add_edge(source, JOIN_PREDICATE, target)
+        for column_id, prefix in foreign_keys:
+            for table_name in _entity_names(prefix):
+                for target in id_columns.get(table_name, [])[:max_join_fanout]:
+                    add_edge(column_id, JOIN_PREDICATE, target)
+                    add_edge(target, JOIN_PREDICATE, column_id)
+
+        edge_array = np.array(sorted(edges), dtype=np.int64).reshape(-1, 3)
+        graph = cls(
+            node_names=list(node_ids),
+            node_kinds=np.array(node_kinds, dtype=np.uint8),
+            predicate_names=list(predicate_ids),
+            sources=edge_array[:, 0],
+            targets=edge_array[:, 1],
+            predicates=edge_array[:, 2],
+        )
+        logger.info(f"Built compact schema graph with {graph.number_of_nodes()} nodes.")
+        return graph
+
+    def number_of_nodes(self) -> int:
+        """Return the number of nodes."""
+        return len(self.node_names)
+
+    def number_of_edges(self) -> int:
+        """Return the number of edges."""
+        return len(self.indices)
+
+    def node_id(self, name: str) -> int | None:
+        """Return the id of the node called ``name``, or None if it does not exist."""
+        return self.node_index.get(name)
+
+    def successors(self, node_id: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Return the target node ids and predicate codes of the outgoing edges of ``node_id``."""
+        start, end = self.indptr[node_id], self.indptr[node_id + 1]
+        return self.indices[start:end], self.predicates[start:end]
+
+    def predecessors(self, node_id: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Return the source node ids and predicate codes of the incoming edges of ``node_id``."""
+        start, end = self.rev_indptr[node_id], self.rev_indptr[node_id + 1]
+        return self.rev_indices[start:end], self.rev_predicates[start:end]
+
+    def predicate_code(self, name: str) -> int:
+        """Return the code of predicate ``name``, or -1 if no edge uses it."""
+        return self.predicate_names.index(name) if name in self.predicate_names else -1
+
+    def column_tables(self) -> np.ndarray:
+        """Return the owning table node id of every node, -1 for nodes that are not columns."""
+        if self._column_tables is None:
+            owners = np.full(self.number_of_nodes(), -1, dtype=np.int64)
+            sources, targets, predicates = self.edge_arrays()
+            has_column = predicates == self.predicate_code("has_column")
+            owners[targets[has_column]] = sources[has_column]
+            self._column_tables = owners
+        return self._column_tables
+
+    def table_ids(self, table_name: str) -> List[int]:
+        """Return the node ids of the tables called ``table_name``, unqualified, in any schema."""
+        if self._tables_by_name is None:
+            tables_by_name: Dict[str, List[int]] = defaultdict(list)
+            for node_id in np.flatnonzero(self.node_kinds == TABLE_NODE).tolist():
+                tables_by_name[self.node_names[node_id].split(".", 1)[-1]].append(node_id)
+            self._tables_by_name = dict(tables_by_name)
+        return self._tables_by_name.get(table_name, [])
+
+    def join_partners(self, table_id: int) -> List[Tuple[int, int, int]]:
+        """Return (partner table id, own key column id, partner key column id) for each join of a table."""
+        joins = self.predicate_code(JOIN_PREDICATE)
+        if joins < 0:
+            return []
+        owners = self.column_tables()
+        columns, predicates = self.successors(table_id)
+        partners = []
+        for column_id in columns[predicates == self.predicate_code("has_column")].tolist():
+            targets, target_predicates = self.successors(column_id)
+            partners.extend(
+                (int(owners[target]), column_id, target) for target in targets[target_predicates == joins].tolist()
+            )
+        return partners
+
+    def expand_joins(
+        self, seeds: Dict[int, float], hops: int = 1, max_tables: int = 5, decay: float = 0.5
+    ) -> Dict[int, Tuple[float, Set[int]]]:
+        """Walk join edges breadth first from scored seed tables.
+
+        Each hop scores the unvisited join partners of the frontier at ``decay`` times the best score of a
+        table joining them and keeps the best ones, until ``max_tables`` tables were added. The key columns
+        of every join between kept tables are collected on both sides. The cost depends on the degree of
+        the visited tables only, not on the size of the graph.
+
+        Args:
+            seeds: Score of each seed table node id.
+            hops: Maximum join distance from a seed.
+            max_tables: Maximum number of tables added to the seeds.
+            decay: Score multiplier per hop.
+
+        Returns:
+            dict: (score, key column node ids) of every seed and added table.
+        """
+        result: Dict[int, Tuple[float, Set[int]]] = {table_id: (score, set()) for table_id, score in seeds.items()}
+        frontier = dict(seeds)
+        added = 0
+        for _ in range(hops):
+            if not frontier or added >= max_tables:
+                break
+            candidates: Dict[int, Tuple[float, List[Tuple[int, int, int]]]] = {}
+            for table_id, score in frontier.items():
+                for partner, column_id, partner_column_id in self.join_partners(table_id):
+                    if partner in result:
+                        if partner != table_id:
+                            result[table_id][1].add(column_id)
+                            result[partner][1].add(partner_column_id)
+                        continue
+                    best, joins = candidates.get(partner, (score * decay, []))
+                    joins.append((table_id, column_id, partner_column_id))
+                    candidates[partner] = (max(best, score * decay), joins)
+            ranked = sorted(candidates.items(), key=lambda item: (-item[1][0], item[0]))[: max_tables - added]
+            frontier = {}
+            for partner, (score, joins) in ranked:
+                result[partner] = (score, set())
+                for table_id, column_id, partner_column_id in joins:
+                    result[table_id][1].add(column_id)
+                    result[partner][1].add(partner_column_id)
+                frontier[partner] = score
+            added += len(ranked)
+        return result
+
+    def edge_arrays(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Return (sources, targets, predicate codes) arrays of all edges."""
+        sources = np.repeat(np.arange(self.number_of_nodes(), dtype=np.int32), np.diff(self.indptr))
+        return sources, self.indices, self.predicates
+
+    def to_networkx(self) -> nx.DiGraph:
+        """Export the graph to NetworkX for debugging, keeping node kinds and edge labels."""
+        graph: nx.DiGraph = nx.DiGraph()
+        kind_names = {TABLE_NODE: "table", COLUMN_NODE: "column", VALUE_NODE: "value"}
+        for name, kind in zip(self.node_names, self.node_kinds.tolist(), strict=True):
+            graph.add_node(name, kind=kind_names[kind])
+        for source, target, predicate in zip(*(a.tolist() for a in self.edge_arrays()), strict=True):
+            graph.add_edge(self.node_names[source], self.node_names[target], label=self.predicate_names[predicate])
+        return graph
+
+    def save(self, path: str) -> None:
+        """Persist the graph as NumPy arrays in a ``.npz`` file, replacing any previous file atomically."""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        names_blob, names_offsets = _pack_strings(self.node_names)
+        predicates_blob, predicates_offsets = _pack_strings(self.predicate_names)
+        sources, targets, predicates = self.edge_arrays()
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(
+                f,
+                names_blob=names_blob,
+                names_offsets=names_offsets,
+                node_kinds=self.node_kinds,
+                predicates_blob=predicates_blob,
+                predicates_offsets=predicates_offsets,
+                sources=sources,
+                targets=targets,
+                predicates=predicates,
+            )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "CompactSchemaGraph":
+        """Load a graph previously written with :meth:`save`."""
+        with np.load(path) as data:
+            return cls(
+                node_names=_unpack_strings(data["names_blob"], data["names_offsets"]),
+                node_kinds=data["node_kinds"],
+                predicate_names=_unpack_strings(data["predicates_blob"], data["predicates_offsets"]),
+                sources=data["sources"].astype(np.int64),
+                targets=data["targets"].astype(np.int64),
+                predicates=data["predicates"].astype(np.int64),
+            )
@@ -4,29 +4,72 @@ This module provides a class for building, caching, and loading a semantic graph
 of a database schema. It extracts semantic triples, and constructs a directed graph using NetworkX.
 The graph, along with metadata and extracted triples, is cached to disk for reuse and performance optimization.
 
-The module checks if a cached version of the graph is valid based on the loaded schema timestamp and rebuilds the
-graph if necessary.
+The module checks if a cached version of the graph is valid based on a content hash of the loaded schema and
+rebuilds the graph if necessary. Embeddings are cached per triple text hash, so a rebuild only re-encodes new or
+changed triples.
 """
 
+import hashlib
+import itertools
 import json
 import os
 import pickle  # nosec B403
+import re
+import shutil
+import threading
+import time
 from collections import defaultdict
-from copy import deepcopy
-from functools import lru_cache
-from typing import Any, Dict, List, Set, Tuple
+from functools import partial
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Set, Tuple
 
 import networkx as nx
 import numpy as np
 from pydantic import TypeAdapter
-from sentence_transformers import SentenceTransformer
 
 from datu.app_config import SchemaRAGConfig, get_logger
 from datu.base.base_connector import TableInfo
+from datu.integrations.dbt.config import get_dbt_profiles_settings
 from datu.schema_extractor.schema_cache import SchemaGlossary, SchemaInfo, load_schema_cache
+from datu.services.ann_index import IVFFlatIndex
+from datu.services.debug_writer import DebugOutputWriter
+from datu.services.embeddings import (
+    QueryEmbeddingCache,
+    embedding_model_key,
+    get_embedding_model,
+    normalize_query_text,
+)
+from datu.services.lexical_index import BM25Index
+from datu.services.quantization import QuantizedMatrix
+from datu.services.result_cache import SchemaResultCache
+from datu.services.schema_graph import CompactSchemaGraph
+from datu.services.table_cards import TableCardIndex, assign_triple_tables, card_text
+from datu.services.value_index import CategoricalValueIndex
 
 logger = get_logger(__name__)
 config = SchemaRAGConfig()
+debug_writer = DebugOutputWriter(
+    sample_rate=config.rag_debug_sample_rate,
+    queue_size=config.rag_debug_queue_size,
+    keep_last=config.rag_debug_keep_last,
+)
+
+
+def as_triple(triple: Any) -> Tuple[str, str, Any]:
+    """Restore a triple decoded from JSON, turning list objects back into tuples."""
+    subject, predicate, obj = triple
+    if isinstance(obj, list):
+        obj = tuple(obj)
+    return (subject, predicate, obj)
+
+
+def configured_embedding_model_key() -> str:
+    """Return the ``<backend>:<model>`` key of the embedding model selected in the config."""
+    backend = config.rag_embedding_backend
+    if backend == "hashing":
+        return embedding_model_key(backend, str(config.rag_hashing_dim))
+    if backend == "onnx":
+        return embedding_model_key(backend, f"{config.rag_embedding_model}#{config.rag_onnx_model_file}")
+    return embedding_model_key(backend, config.rag_embedding_model)
 
 
 class SchemaTripleExtractor:
@@ -34,18 +77,22 @@ class SchemaTripleExtractor:
 
     Attributes:
         schema_profiles (list): List of SchemaGlossary objects.
+        content_hash (str): Hash of the schema content, excluding extraction timestamps.
     """
 
-    def __init__(self, raw_schema) -> None:
+    def __init__(self, raw_schema, rag_dir: str | None = None) -> None:
         """Initialize the triple extractor with a parsed schema dictionary.
 
         Args:
-            schema (dict): Parsed schema data."""
+            schema (dict): Parsed schema data.
+            rag_dir (str | None): Directory for the cache files; defaults to ``rag_dir`` from the config."""
         self.raw_schema = raw_schema
         self.schema_profiles, self.timestamp = self.normalize_schema(self.raw_schema)
+        self.content_hash = self.compute_content_hash(self.schema_profiles)
+        rag_dir = rag_dir or config.rag_dir
         self.paths = {
-            "meta": os.path.join(config.rag_dir, config.rag_meta_cache_file),
-            "triples": os.path.join(config.rag_dir, config.rag_triples_cache_file),
+            "meta": os.path.join(rag_dir, config.rag_meta_cache_file),
+            "triples": os.path.join(rag_dir, config.rag_triples_cache_file),
         }
         self.triples: list = []
 
@@ -53,16 +100,36 @@ class SchemaTripleExtractor:
         """Ensure the directory for the graph-rag files exists."""
         os.makedirs(os.path.dirname(path), exist_ok=True)
 
+    @staticmethod
+    def compute_content_hash(schema_profiles: List[SchemaGlossary]) -> str:
+        """Hash the schema content so that a refresh without changes keeps the cached RAG.
+
+        The extraction timestamp is excluded because every schema refresh writes a new one.
+        """
+        content = [profile.model_dump(exclude={"timestamp"}, exclude_none=True) for profile in schema_profiles]
+        encoded = json.dumps(content, sort_keys=True, default=str).encode("utf-8")
+        return hashlib.sha256(encoded).hexdigest()
+
     def is_rag_outdated(self) -> bool:
-        """Check for outdated schema timestamp or missing RAG cache and rebuild RAG."""
+        """Check for changed schema content or missing RAG cache and rebuild RAG.
+
+        Metadata written before content hashing was introduced falls back to the timestamp check.
+        """
         if not os.path.exists(self.paths["triples"]) or not os.path.exists(self.paths["meta"]):
             return True
-        if self.timestamp is None:
-            logger.warning("Current schema timestamp is missing. Rebuilding RAG engine.")
-            return True
         try:
             with open(self.paths["meta"], "r", encoding="utf-8") as f:
                 saved = json.load(f)
+                saved_hash = saved.get("rag_content_hash")
+                if saved_hash is not None:
+                    if saved_hash != self.content_hash:
+                        logger.info("Schema content has changed since last RAG engine update.")
+                        logger.info("Rebuilding RAG system with new schema cache.")
+                        return True
+                    return False
+                if self.timestamp is None:
+                    logger.warning("Current schema timestamp is missing. Rebuilding RAG engine.")
+                    return True
                 saved_ts = saved.get("rag_timestamp")
                 if saved_ts is None:
                     logger.warning("Cached RAG metadata has no timestamp. Rebuilding RAG engine.")
@@ -83,11 +150,13 @@ class SchemaTripleExtractor:
         """
         if self.is_rag_outdated():
             self.schema_profiles, self.timestamp = self.normalize_schema(self.raw_schema)
+            self.content_hash = self.compute_content_hash(self.schema_profiles)
             self.triples = self.extract_triples()
             self.save_triples()
             self.save_timestamp()
             return True
         logger.info(f"Using cached RAG egnine from {self.paths['triples']}.")
+        self.load_triples()
         return False
 
     def _get_attr(self, obj: Any, key: str) -> Any:
@@ -138,37 +207,54 @@ class SchemaTripleExtractor:
                 column_triples.append((col_name, predicate, value))
         return column_triples
 
+    def iter_triples(self, tables: Iterable[SchemaInfo]) -> Iterator[Tuple[str, str, Any]]:
+        """Yield the triples of tables one table at a time, so tables can be consumed as they are extracted.
+
+        Args:
+            tables: Tables in extraction order, e.g. streamed by ``BaseDBConnector.iter_schema``.
+
+        Yields:
+            (subject, predicate, object) triples in table order.
+        """
+        for table in tables:
+            table_name = self._get_attr(table, "table_name")
+            if not table_name:
+                continue
+            yield from self._extract_table_triples(table)
+            yield from self._extract_column_triples(table.table_name, table.columns or [])
+
     def extract_triples(self) -> list:
         """Extract schema information into triples.
 
         Returns:
             list: List of (subject, predicate, object) triples.
         """
-        triples = []
-        for profile in self.schema_profiles:
-            for table in profile.schema_info:
-                table_name = self._get_attr(table, "table_name")
-                if not table_name:
-                    continue
-                triples += self._extract_table_triples(table)
-                triples += self._extract_column_triples(table.table_name, table.columns or [])
-        return triples
+        return list(self.iter_triples(table for profile in self.schema_profiles for table in profile.schema_info))
 
     def save_triples(self):
-        """Save triples to a JSON file.
+        """Save triples to a JSON file, replacing any previous file atomically.
 
         Args:
             path (str): Output path for triples.
         """
         self.ensure_directory(self.paths["triples"])
-        with open(self.paths["triples"], "w", encoding="utf-8") as f:
+        tmp_path = self.paths["triples"] + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
             json.dump(self.triples, f, indent=2)
+        os.replace(tmp_path, self.paths["triples"])
+
+    def load_triples(self):
+        """Load previously extracted triples from the JSON cache file."""
+        with open(self.paths["triples"], "r", encoding="utf-8") as f:
+            self.triples = [as_triple(triple) for triple in json.load(f)]
 
     def save_timestamp(self):
-        """Save the schema timestamp to metadata file."""
+        """Save the schema timestamp and content hash to metadata file."""
         self.ensure_directory(self.paths["meta"])
-        with open(self.paths["meta"], "w", encoding="utf-8") as f:
-            json.dump({"rag_timestamp": self.timestamp}, f)
+        tmp_path = self.paths["meta"] + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"rag_timestamp": self.timestamp, "rag_content_hash": self.content_hash}, f)
+        os.replace(tmp_path, self.paths["meta"])
 
 
 class SchemaGraphBuilder:
@@ -179,16 +265,28 @@ class SchemaGraphBuilder:
         timestamp (float): Timestamp of the current schema snapshot.
         triples (list): Extracted triples representing schema relations.
         graph (nx.DiGraph): Graph representation of the schema.
+        compact_graph (CompactSchemaGraph | None): Integer-id CSR graph with table-qualified node names.
     """
 
-    def __init__(self, triples, is_rag_outdated) -> None:
+    def __init__(
+        self,
+        triples,
+        is_rag_outdated,
+        schema_profiles: List[SchemaGlossary] | None = None,
+        rag_dir: str | None = None,
+    ) -> None:
         """Initialize the graph builder with a parsed schema dictionary.
 
         Args:
-            schema (dict): Parsed schema data."""
+            schema (dict): Parsed schema data.
+            rag_dir (str | None): Directory for the cache files; defaults to ``rag_dir`` from the config."""
+        rag_dir = rag_dir or config.rag_dir
         self.graph: nx.DiGraph = nx.DiGraph()
-        self.graph_path = os.path.join(config.rag_dir, config.graph_cache_file)
+        self.graph_path = os.path.join(rag_dir, config.graph_cache_file)
+        self.compact_graph: CompactSchemaGraph | None = None
+        self.compact_graph_path = os.path.join(rag_dir, config.graph_compact_cache_file)
         self.triples = triples
+        self.schema_profiles = schema_profiles or []
         self.graph_rebuild_required = is_rag_outdated
 
     def ensure_directory(self, path: str):
@@ -197,19 +295,27 @@ class SchemaGraphBuilder:
 
     def initialize_graph(self) -> bool:
         """Initialize the schema graph, extracting triples and building the graph.
-        If the graph is outdated or missing, it will rebuild the graph from the schema.
+        If the graph is outdated, missing or unreadable, it will rebuild the graph from the schema, e.g.
+        after switching ``graph_format`` on a cache built in the other format.
         If the graph is up-to-date, it will load the cached graph from disk.
+
+        Returns:
+            bool: True if the graph was rebuilt, False if it was loaded from disk.
         """
-        if self.graph_rebuild_required:
-            logger.info("Graph is outdated or missing. Rebuilding from schema...")
-            self.graph = self.build_graph()
-            self.save_graph()
-            logger.info(f"Schema graph rebuilt with {self.graph.number_of_nodes()} nodes.")
-            return True
-        logger.info(f"Using cached graph from {self.graph_path}.")
-        with open(self.graph_path, "rb") as f:
-            self.graph = pickle.load(f)  # nosec B301
-        return False
+        if not self.graph_rebuild_required and os.path.exists(self.graph_path):
+            try:
+                with open(self.graph_path, "rb") as f:
+                    self.graph = pickle.load(f)  # nosec B301
+            except (OSError, pickle.UnpicklingError, EOFError) as e:
+                logger.info(f"Graph cache unusable ({e}). Rebuilding from schema...")
+            else:
+                logger.info(f"Using cached graph from {self.graph_path}.")
+                return False
+        logger.info("Graph is outdated or missing. Rebuilding from schema...")
+        self.graph = self.build_graph()
+        self.save_graph()
+        logger.info(f"Schema graph rebuilt with {self.graph.number_of_nodes()} nodes.")
+        return True
 
     def build_graph(self) -> nx.DiGraph:
         """Construct a directed graph from triples.
@@ -226,46 +332,78 @@ class SchemaGraphBuilder:
         return schema_graph
 
     def save_graph(self):
-        """Save graph to a pickle file.
+        """Save graph to a pickle file, replacing any previous file atomically.
 
         Args:
             path (str): Output path for graph.
         """
         self.ensure_directory(self.graph_path)
-        with open(self.graph_path, "wb") as f:
+        tmp_path = self.graph_path + ".tmp"
+        with open(tmp_path, "wb") as f:
             pickle.dump(self.graph, f)  # nosec B301
+        os.replace(tmp_path, self.graph_path)
+
+    def initialize_compact_graph(self) -> bool:
+        """Initialize the compact schema graph from the schema profiles.
+
+        The cached arrays are loaded unless the schema changed or the cache file is missing or unreadable.
+
+        Returns:
+            bool: True if the graph was rebuilt, False if it was loaded from disk.
+        """
+        if not self.graph_rebuild_required and os.path.exists(self.compact_graph_path):
+            try:
+                self.compact_graph = CompactSchemaGraph.load(self.compact_graph_path)
+            except (OSError, KeyError, ValueError) as e:
+                logger.info(f"Compact graph cache unusable ({e}). Rebuilding from schema...")
+            else:
+                logger.info(f"Using cached compact graph from {self.compact_graph_path}.")
+                return False
+        self.compact_graph = CompactSchemaGraph.from_profiles(
+            self.schema_profiles, max_join_fanout=config.graph_join_max_fanout
+        )
+        self.compact_graph.save(self.compact_graph_path)
+        return True
+
+    def to_networkx(self) -> nx.DiGraph:
+        """Return the schema graph as NetworkX for debugging exports, whichever representation is in use."""
+        if self.compact_graph is not None:
+            return self.compact_graph.to_networkx()
+        return self.graph
 
 
 class SubGraphRetriever:
     """Retrieves subgraph based on relevant tables and columns."""
 
-    def __init__(self, graph: nx.DiGraph):
+    def __init__(self, graph: nx.DiGraph, vectorizer: "SchemaVectorizer | None" = None):
         self.graph = graph
-        self.vectorizer = SchemaVectorizer([])
+        self.vectorizer = vectorizer or SchemaVectorizer([])
 
     def extract_subgraph(self, relevant_tables: Set[str], relevant_columns: Dict[str, Set[str]]) -> nx.DiGraph:
         """
         Extract a focused subgraph of only relevant nodes and edges.
 
+        Edges are collected from the successor and predecessor adjacency of the relevant nodes, so
+        the cost scales with the size of the answer rather than the size of the schema graph.
+
         Args:
             relevant_tables (Set[str]): Set of relevant table names.
             relevant_columns (Dict[str, Set[str]]): Dict mapping table names to sets of relevant column names.
 
         Returns:
-            nx.DiGraph: A subgraph containing only the relevant elements.
+            nx.DiGraph: A read-only view of the schema graph containing only the relevant elements.
         """
         nodes_to_include = set(relevant_tables)
         for cols in relevant_columns.values():
             nodes_to_include.update(cols)
 
-        subgraph_edges = []
-        for u, v, data in self.graph.edges(data=True):
-            if u in nodes_to_include or v in nodes_to_include:
-                subgraph_edges.append((u, v, data))
-
-        subgraph: nx.DiGraph = nx.DiGraph()
-        subgraph.add_edges_from(subgraph_edges)
-        return subgraph
+        subgraph_edges = set()
+        for node in nodes_to_include:
+            if node not in self.graph:
+                continue
+            subgraph_edges.update((node, successor) for successor in self.graph.successors(node))
+            subgraph_edges.update((predecessor, node) for predecessor in self.graph.predecessors(node))
+        return self.graph.edge_subgraph(subgraph_edges)
 
     def get_subgraph_from_query(
         self,
@@ -277,7 +415,6 @@ class SubGraphRetriever:
         subgraph_data = self.extract_subgraph(relevant_tables, relevant_columns)
 
         if config.rag_debugging:
-            logger.info("[Retriever] Saving debug outputs.")
             self.save_debug_graph_outputs(
                 subgraph_data=subgraph_data,
             )
@@ -287,13 +424,13 @@ class SubGraphRetriever:
     def save_debug_graph_outputs(
         subgraph_data: nx.DiGraph,
     ) -> None:
-        """Save debug files related to the subgraph and schema extraction."""
-        output_dir: str = os.path.join(config.rag_dir + "/rag_debug")
-        os.makedirs(output_dir, exist_ok=True)
-        with open(os.path.join(output_dir, "subgraph.json"), "w", encoding="utf-8") as f:
-            json.dump(nx.readwrite.json_graph.node_link_data(subgraph_data, edges="links"), f, indent=2)
-            logger.info(f"[Retriever] Extracted subgraph with {len(subgraph_data.nodes)} nodes.")
-        logger.debug(f"[Retriever] Graph saved in {output_dir}.")
+        """Queue the extracted subgraph for the background debug writer."""
+        logger.info(f"[Retriever] Extracted subgraph with {len(subgraph_data.nodes)} nodes.")
+        debug_writer.submit(
+            os.path.join(config.rag_dir, "rag_debug"),
+            "subgraph",
+            lambda: {"subgraph": nx.readwrite.json_graph.node_link_data(subgraph_data, edges="links")},
+        )
 
 
 class SchemaVectorizer:
@@ -302,59 +439,374 @@ class SchemaVectorizer:
     Attributes:
         triples (list): List of (subject, predicate, object) triples.
         timestamp (int): Schema timestamp to track cache validity.
-        embeddings (list): List of embedding vectors for triples.
+        embeddings (np.ndarray): Normalized float32 matrix with one embedding row per triple.
         texts (list): Textual representations of triples.
+        text_hashes (list): Content hashes of the triple texts, used to reuse cached embeddings.
+        ann_index (IVFFlatIndex | None): Approximate index used when ``rag_index_type`` is "ivf".
+        quantized (QuantizedMatrix | None): In-memory quantized embeddings used for candidate scoring when
+            ``rag_embedding_quantization`` is not "none".
+        lexical_index (BM25Index | None): Inverted index over triple identifiers used when ``rag_retrieval_mode``
+            is "hybrid".
+        table_cards (TableCardIndex | None): One summary embedding per table, searched before the triples when
+            ``rag_search_granularity`` is "table".
+        model_name (str): Backend-qualified key of the embedding model, shared process-wide and loaded on first
+            encode. It is stored with the embeddings, so changing the backend or model triggers a rebuild.
+        query_cache (QueryEmbeddingCache): LRU cache of query embeddings keyed by normalized text.
     """
 
-    def __init__(self, triples: List[Tuple[str, str, str]]):
+    def __init__(self, triples: List[Tuple[str, str, str]], rag_dir: str | None = None):
+        rag_dir = rag_dir or config.rag_dir
         self.triples = triples
-        self.embeddings: list[list[float]] = []
+        self.embeddings: np.ndarray = np.empty((0, 0), dtype=np.float32)
         self.texts: list[str] = []
-        self.model = SentenceTransformer("all-MiniLM-L6-v2")
+        self.text_hashes: list[str] = []
+        self.ann_index: IVFFlatIndex | None = None
+        self.quantized: QuantizedMatrix | None = None
+        self.lexical_index: BM25Index | None = None
+        self.table_cards: TableCardIndex | None = None
+        self.model_name = configured_embedding_model_key()
+        self.query_cache = QueryEmbeddingCache(maxsize=config.rag_query_cache_size)
         self.paths = {
-            "vecs": os.path.join(config.rag_dir, "schema_embedding_cache.pkl"),
-            "meta": os.path.join(config.rag_dir, config.rag_meta_cache_file),
+            "vecs": os.path.join(rag_dir, config.rag_embeddings_file),
+            "triples": os.path.join(rag_dir, config.rag_embedding_triples_file),
+            "ann": os.path.join(rag_dir, config.rag_ann_index_file),
+            "quantized": os.path.join(rag_dir, config.rag_quantized_embeddings_file),
+            "meta": os.path.join(rag_dir, config.rag_meta_cache_file),
+            "cards": os.path.join(rag_dir, config.rag_table_cards_file),
         }
 
+    @property
+    def model(self) -> Any:
+        """The shared embedding model, loaded on first access."""
+        return get_embedding_model(self.model_name)
+
     def initialize_embeddings(self, force_rebuild: bool = False) -> None:
         """Load or generate and save embeddings."""
-        if not force_rebuild and os.path.exists(self.paths["vecs"]):
-            self.load_embeddings()
-            logger.info(f"Loaded cached embeddings from {self.paths['vecs']}")
-            return
-        self.texts = [self.format_triple(t) for t in self.triples]
-        self.embeddings = self.model.encode(self.texts, normalize_embeddings=True).tolist()
+        if not force_rebuild and os.path.exists(self.paths["vecs"]) and os.path.exists(self.paths["triples"]):
+            try:
+                self.load_embeddings()
+            except (OSError, ValueError, KeyError, json.JSONDecodeError) as e:
+                logger.warning("Error loading cached embeddings, rebuilding: %s", e)
+            else:
+                logger.info(f"Loaded cached embeddings from {self.paths['vecs']}")
+                self.initialize_ann_index()
+                self.initialize_quantized_embeddings()
+                self.initialize_lexical_index()
+                self.initialize_table_cards()
+                return
+        self.build_embeddings()
         self.save_embeddings()
         logger.info(f"Built {len(self.embeddings)} embeddings from schema.")
+        self.initialize_ann_index(force_rebuild=True)
+        self.initialize_quantized_embeddings(force_rebuild=True)
+        self.initialize_lexical_index()
+        self.initialize_table_cards()
+
+    @staticmethod
+    def hash_text(text: str) -> str:
+        """Return the content hash under which the embedding of a triple text is cached."""
+        return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+    def build_embeddings(self) -> None:
+        """Embed the current triples, re-encoding only texts missing from the cached store.
+
+        Rows of the previous embedding matrix are reused by text hash; triples that no longer exist
+        are dropped because only the current triples are written back.
+        """
+        self.texts = [self.format_triple(t) for t in self.triples]
+        self.text_hashes = [self.hash_text(text) for text in self.texts]
+        cached_rows, cached_matrix = self._cached_embedding_rows()
+        missing = [i for i, text_hash in enumerate(self.text_hashes) if text_hash not in cached_rows]
+        batches = self._encode_batches(missing)
+        first = next(batches, None)
+        if first is not None and cached_matrix is not None and first.shape[1] != cached_matrix.shape[1]:
+            logger.info("Cached embeddings have a different dimension. Re-encoding all triples.")
+            cached_rows, cached_matrix = {}, None
+            missing = list(range(len(self.texts)))
+            batches = self._encode_batches(missing)
+            first = next(batches, None)
+        if first is None and cached_matrix is None:
+            self.embeddings = np.empty((0, 0), dtype=np.float32)
+            return
+
+        dim = first.shape[1] if first is not None else cached_matrix.shape[1]  # type: ignore[union-attr]
+        matrix = np.empty((len(self.texts), dim), dtype=np.float32)
+        reused = [i for i, text_hash in enumerate(self.text_hashes) if text_hash in cached_rows]
+        if reused:
+            matrix[reused] = cached_matrix[[cached_rows[self.text_hashes[i]] for i in reused]]  # type: ignore[index]
+        start = 0
+        for encoded in itertools.chain([first] if first is not None else [], batches):
+            matrix[missing[start : start + len(encoded)]] = encoded
+            start += len(encoded)
+        self.embeddings = matrix
+        logger.info(f"Encoded {len(missing)} new or changed triples, reused {len(reused)} cached embeddings.")
+
+    def _encode_batches(self, rows: List[int]) -> Iterator[np.ndarray]:
+        """Encode the texts of ``rows`` in batches of ``rag_embedding_batch_size``, yielding normalized matrices.
+
+        Encoding in batches bounds the memory of the backend's intermediate activations and of the
+        encoded vectors not yet copied into the embedding matrix, whatever the number of triples.
+        """
+        batch_size = max(1, config.rag_embedding_batch_size)
+        for start in range(0, len(rows), batch_size):
+            texts = [self.texts[i] for i in rows[start : start + batch_size]]
+            yield self._as_matrix(self.model.encode(texts, normalize_embeddings=True))
+
+    def _cached_embedding_rows(self) -> Tuple[Dict[str, int], np.ndarray | None]:
+        """Map text hashes of the previously saved store to their rows in its embedding matrix."""
+        if not os.path.exists(self.paths["vecs"]) or not os.path.exists(self.paths["triples"]):
+            return {}, None
+        try:
+            with open(self.paths["triples"], "r", encoding="utf-8") as f:
+                table = json.load(f)
+            matrix = np.load(self.paths["vecs"], mmap_mode="r")
+        except (OSError, ValueError, json.JSONDecodeError) as e:
+            logger.warning("Error reading cached embeddings for reuse: %s", e)
+            return {}, None
+        if table.get("model") != self.model_name:
+            return {}, None
+        hashes = table.get("hashes") or []
+        if matrix.ndim != 2 or len(hashes) != matrix.shape[0]:
+            return {}, None
+        return {text_hash: row for row, text_hash in enumerate(hashes)}, matrix
+
+    def initialize_ann_index(self, force_rebuild: bool = False) -> None:
+        """Load or build the approximate index when ``rag_index_type`` is "ivf".
+
+        The index is persisted next to the embedding cache and rebuilt whenever the embeddings are
+        rebuilt or the cached index does not cover the current matrix.
+        """
+        if config.rag_index_type != "ivf":
+            self.ann_index = None
+            return
+        if not force_rebuild and os.path.exists(self.paths["ann"]):
+            try:
+                index = IVFFlatIndex.load(self.paths["ann"])
+                if index.count == len(self.embeddings):
+                    self.ann_index = index
+                    logger.info(f"Loaded cached IVF index from {self.paths['ann']}")
+                    return
+                logger.info("Cached IVF index does not match the embeddings. Rebuilding.")
+            except (OSError, ValueError, KeyError) as e:
+                logger.warning("Error loading cached IVF index, rebuilding: %s", e)
+        self.ann_index = IVFFlatIndex.build(self.embeddings, nlist=config.rag_ivf_nlist)
+        self.ensure_directory(self.paths["ann"])
+        self.ann_index.save(self.paths["ann"])
+
+    def initialize_quantized_embeddings(self, force_rebuild: bool = False) -> None:
+        """Load or build the quantized embedding matrix when ``rag_embedding_quantization`` is enabled.
+
+        The quantized matrix is persisted next to the embedding cache and rebuilt whenever the embeddings
+        are rebuilt or the cached file does not match the current matrix or quantization mode.
+        """
+        kind = config.rag_embedding_quantization
+        if kind == "none" or self.embeddings.size == 0:
+            self.quantized = None
+            return
+        if not force_rebuild and os.path.exists(self.paths["quantized"]):
+            try:
+                quantized = QuantizedMatrix.load(self.paths["quantized"])
+                if quantized.kind == kind and quantized.codes.shape == self.embeddings.shape:
+                    self.quantized = quantized
+                    logger.info(f"Loaded cached {kind} embeddings from {self.paths['quantized']}")
+                    return
+                logger.info("Cached quantized embeddings do not match the embeddings. Rebuilding.")
+            except (OSError, ValueError, KeyError) as e:
+                logger.warning("Error loading cached quantized embeddings, rebuilding: %s", e)
+        self.quantized = QuantizedMatrix.quantize(self.embeddings, kind)
+        self.ensure_directory(self.paths["quantized"])
+        self.quantized.save(self.paths["quantized"])
+        logger.info(
+            f"Quantized {len(self.quantized)} embeddings to {kind}: "
+            f"{self.quantized.nbytes} bytes instead of {self.embeddings.nbytes}."
+        )
+
+    def initialize_lexical_index(self) -> None:
+        """Build the in-memory BM25 index over triple identifiers when ``rag_retrieval_mode`` is "hybrid"."""
+        if config.rag_retrieval_mode != "hybrid":
+            self.lexical_index = None
+            return
+        self.lexical_index = BM25Index([self.lexical_document(triple) for triple in self.triples])
+        logger.info(f"Built lexical index with {len(self.lexical_index.postings)} tokens.")
+
+    def initialize_table_cards(self) -> None:
+        """Build the table card index when ``rag_search_granularity`` is "table".
+
+        Card embeddings are cached by card text hash, so only the cards of new or changed tables are
+        encoded after a schema change.
+        """
+        if config.rag_search_granularity != "table" or self.embeddings.size == 0:
+            self.table_cards = None
+            return
+        table_names, owners = assign_triple_tables(self.triples)
+        order = np.argsort(owners, kind="stable")
+        bounds = np.searchsorted(owners[order], np.arange(len(table_names) + 1))
+        texts = [
+            card_text(
+                name,
+                [self.triples[row] for row in order[bounds[t] : bounds[t + 1]].tolist()],
+                max_columns=config.rag_table_card_max_columns,
+            )
+            for t, name in enumerate(table_names)
+        ]
+        hashes = [self.hash_text(text) for text in texts]
+        try:
+            cached = TableCardIndex.load_embeddings(self.paths["cards"], self.model_name)
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning("Error loading cached table card embeddings, rebuilding: %s", e)
+            cached = {}
+        dim = self.embeddings.shape[1]
+        vectors = [cached.get(text_hash) for text_hash in hashes]
+        missing = [i for i, vector in enumerate(vectors) if vector is None or len(vector) != dim]
+        if missing:
+            encoded = self._as_matrix(self.model.encode([texts[i] for i in missing], normalize_embeddings=True))
+            for i, vector in zip(missing, encoded, strict=True):
+                vectors[i] = vector
+        matrix = np.vstack(vectors).astype(np.float32) if vectors else np.empty((0, dim), dtype=np.float32)
+        if missing or len(cached) != len(hashes):
+            TableCardIndex.save_embeddings(self.paths["cards"], self.model_name, hashes, matrix)
+        self.table_cards = TableCardIndex(
+            table_names, owners, texts, matrix, lexical=config.rag_retrieval_mode == "hybrid"
+        )
+        logger.info(f"Built {len(table_names)} table cards, encoded {len(missing)} new or changed cards.")
+
+    @staticmethod
+    def lexical_document(triple: Tuple[str, str, Any]) -> str:
+        """Return the text indexed lexically for a triple: its subject and object, without the predicate."""
+        subj, _, obj = triple
+        return f"{subj} {obj}"
 
     def ensure_directory(self, path: str):
         """Ensure the directory for the graph-rag files exists."""
         os.makedirs(os.path.dirname(path), exist_ok=True)
 
     def save_embeddings(self) -> None:
-        """Persist triple text and their embeddings."""
+        """Persist the embedding matrix as ``.npy`` and the aligned triples as a JSON table.
+
+        Both files are written to a temporary name and atomically renamed, so workers that
+        have the previous matrix memory-mapped keep reading a consistent snapshot.
+        """
         self.ensure_directory(self.paths["vecs"])
-        with open(self.paths["vecs"], "wb") as f:
-            pickle.dump((self.triples, self.texts, self.embeddings), f)  # nosec B301
+        tmp_vecs = self.paths["vecs"] + ".tmp"
+        with open(tmp_vecs, "wb") as f:
+            np.save(f, np.ascontiguousarray(self.embeddings, dtype=np.float32))
+        tmp_triples = self.paths["triples"] + ".tmp"
+        with open(tmp_triples, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "model": self.model_name,
+                    "count": len(self.triples),
+                    "triples": self.triples,
+                    "hashes": self.text_hashes,
+                },
+                f,
+                separators=(",", ":"),
+            )
+        os.replace(tmp_triples, self.paths["triples"])
+        os.replace(tmp_vecs, self.paths["vecs"])
 
     def load_embeddings(self) -> None:
-        """Load cached triples, their text representations, and embeddings."""
-        with open(self.paths["vecs"], "rb") as f:
-            self.triples, self.texts, self.embeddings = pickle.load(f)  # nosec B301
+        """Load cached triples and memory-map their embedding matrix.
+
+        The matrix is opened read-only with ``np.memmap`` semantics, so startup does not read the
+        vectors into memory and forked workers share the same pages.
+
+        Raises:
+            ValueError: If the cache was built with another model or does not match the triple table.
+        """
+        with open(self.paths["triples"], "r", encoding="utf-8") as f:
+            table = json.load(f)
+        if table.get("model") != self.model_name:
+            raise ValueError(f"Cached embeddings were built with model '{table.get('model')}'.")
+        triples = [as_triple(triple) for triple in table["triples"]]
+        embeddings = np.load(self.paths["vecs"], mmap_mode="r")
+        if embeddings.dtype != np.float32 or embeddings.ndim != 2 or embeddings.shape[0] != len(triples):
+            raise ValueError(
+                f"Embedding matrix {embeddings.shape} ({embeddings.dtype}) does not match {len(triples)} triples."
+            )
+        self.triples = triples
+        self.texts = [self.format_triple(t) for t in self.triples]
+        self.text_hashes = table.get("hashes") or [self.hash_text(text) for text in self.texts]
+        self.embeddings = embeddings
+
+    @staticmethod
+    def _as_matrix(embeddings: Any) -> np.ndarray:
+        """Return embeddings as one contiguous float32 matrix with L2-normalized rows."""
+        matrix = np.ascontiguousarray(embeddings, dtype=np.float32)
+        if matrix.size == 0:
+            return np.empty((0, 0), dtype=np.float32)
+        if matrix.ndim == 1:
+            matrix = matrix.reshape(1, -1)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return np.ascontiguousarray(matrix / norms, dtype=np.float32)
 
     def format_triple(self, triple: Tuple[str, str, str]) -> str:
         """Convert a triple into a natural-language-like string for embedding."""
         subj, pred, obj = triple
         return f"{subj} {pred.replace('_', ' ')} {obj}"
 
-    def _cosine_similarity(self, vec1, vec2):
-        return float(np.dot(vec1, vec2) / (np.linalg.norm(vec1) * np.linalg.norm(vec2)))
+    def encode_queries(self, queries: List[str]) -> np.ndarray:
+        """Embed queries, serving repeats from the query cache and encoding misses in one batch.
+
+        Args:
+            queries: Natural language queries.
+
+        Returns:
+            Normalized float32 matrix with one row per query.
+        """
+        keys = [normalize_query_text(query) for query in queries]
+        vectors: Dict[str, np.ndarray] = {}
+        for key in keys:
+            if key not in vectors:
+                cached = self.query_cache.get(key)
+                if cached is not None:
+                    vectors[key] = cached
+        missing = [key for key in dict.fromkeys(keys) if key not in vectors]
+        if missing:
+            encoded = self._as_matrix(self.model.encode(missing, normalize_embeddings=True))
+            for key, vector in zip(missing, encoded, strict=True):
+                vectors[key] = vector
+                self.query_cache.put(key, vector)
+        if not keys:
+            return np.empty((0, self.embeddings.shape[1]), dtype=np.float32)
+        return np.vstack([vectors[key] for key in keys])
+
+    def encode_conversations(self, message_lists: List[List[str]]) -> np.ndarray:
+        """Embed conversations as recency-weighted sums of their message embeddings.
+
+        Every message is embedded on its own through :meth:`encode_queries`, so a message is encoded once
+        and served from the query cache on every later turn of its conversation. The newest message has
+        weight 1 and each older one ``rag_conversation_decay`` times the weight of the next newer one.
+
+        Args:
+            message_lists: One list of messages per conversation, oldest first and already windowed.
+
+        Returns:
+            Normalized float32 matrix with one row per conversation.
+        """
+        messages = [message for user_messages in message_lists for message in user_messages]
+        if not messages:
+            return np.empty((0, self.embeddings.shape[1]), dtype=np.float32)
+        encoded = self.encode_queries(messages)
+        rows = []
+        start = 0
+        for user_messages in message_lists:
+            weights = config.rag_conversation_decay ** np.arange(len(user_messages) - 1, -1, -1, dtype=np.float32)
+            rows.append(weights @ encoded[start : start + len(user_messages)])
+            start += len(user_messages)
+        return self._as_matrix(np.vstack(rows))
 
     def search(
         self, query: str, score_threshold: float = 0.5, min_results: int = 100
     ) -> List[Tuple[Tuple[str, str, str], float]]:
         """Search for schema embeddings most relevant to a query using cosine similarity.
 
+        Triples are scored with a single matrix-vector product against the normalized embedding
+        matrix, restricted to the IVF candidate lists when an approximate index is loaded. In hybrid
+        mode the normalized BM25 score of lexical matches is added to their similarity. The
+        fallback top-k is selected with ``argpartition`` instead of a full sort.
+
         Args:
             query: Natural language query.
             score_threshold: Minimum similarity score to include an embedding.
@@ -363,17 +815,161 @@ class SchemaVectorizer:
         Returns:
             List of ((subj, pred, obj), score) tuples.
         """
-        query_vec = self.model.encode([query], normalize_embeddings=True)[0]
-        sims = [self._cosine_similarity(query_vec, vec) for vec in self.embeddings]
-        scored = sorted(zip(self.triples, sims, strict=True), key=lambda x: x[1], reverse=True)
-        filtered = [(triple, score) for triple, score in scored if score >= score_threshold]
-        if len(filtered) < min_results:
-            fallback = scored[:min_results]
-            logger.info(f"Triples above threshold ({score_threshold}): {len(filtered)}")
+        if len(self.triples) == 0 or self.embeddings.size == 0:
+            return []
+        rows, sims = self._score(self.encode_queries([query])[0], self._lexical_search(query), query)
+        return self._select(rows, sims, score_threshold, min_results)
+
+    def search_many(
+        self,
+        queries: List[str],
+        score_threshold: float = 0.5,
+        min_results: int = 100,
+        batch_size: int = 32,
+        query_vecs: np.ndarray | None = None,
+    ) -> List[List[Tuple[Tuple[str, str, str], float]]]:
+        """Search several queries at once.
+
+        All queries are encoded in one batched call and, for exact search, scored with one
+        matrix-matrix product per batch of ``batch_size`` queries.
+
+        Args:
+            queries: Natural language queries.
+            score_threshold: Minimum similarity score to include an embedding.
+            min_results: Minimum number of results to return if threshold filters out too many.
+            batch_size: Number of queries scored per matrix-matrix product.
+            query_vecs: Precomputed normalized query embeddings, one row per query; the queries are
+                then only used for lexical matching.
+
+        Returns:
+            One list of ((subj, pred, obj), score) tuples per query, in input order.
+        """
+        if len(self.triples) == 0 or self.embeddings.size == 0:
+            return [[] for _ in queries]
+        if query_vecs is None:
+            query_vecs = self.encode_queries(queries)
+        lexical = [self._lexical_search(query) for query in queries]
+        if (
+            self.ann_index is not None
+            or self.quantized is not None
+            or self.table_cards is not None
+            or self._lexical_prefilter_enabled()
+        ):
+            return [
+                self._select(*self._score(vec, matches, query), score_threshold, min_results)
+                for vec, matches, query in zip(query_vecs, lexical, queries, strict=True)
+            ]
+        results = []
+        for start in range(0, len(query_vecs), batch_size):
+            sims = self.embeddings @ query_vecs[start : start + batch_size].T
+            results.extend(
+                self._select(
+                    None,
+                    self._fuse(None, np.ascontiguousarray(sims[:, j]), lexical[start + j]),
+                    score_threshold,
+                    min_results,
+                )
+                for j in range(sims.shape[1])
+            )
+        return results
+
+    def _select(
+        self, rows: np.ndarray | None, sims: np.ndarray, score_threshold: float, min_results: int
+    ) -> List[Tuple[Tuple[str, str, str], float]]:
+        """Select triples above the threshold, or the top ``min_results`` if too few pass it."""
+        above = np.flatnonzero(sims >= score_threshold)
+        if len(above) < min_results:
+            top = self._top_k_indices(sims, min_results)
+            fallback = [(self.triples[i], float(s)) for i, s in zip(self._rows(rows, top), sims[top], strict=True)]
+            logger.info(f"Triples above threshold ({score_threshold}): {len(above)}")
             logger.info(f"Returning fallback top {min_results} triples.")
             logger.info(f"Fallback triples: {fallback}")
             return fallback
-        return filtered
+        order = above[np.argsort(-sims[above], kind="stable")]
+        return [(self.triples[i], float(s)) for i, s in zip(self._rows(rows, order), sims[order], strict=True)]
+
+    def _score(
+        self, query_vec: np.ndarray, lexical: Tuple[np.ndarray, np.ndarray] | None = None, query: str = ""
+    ) -> Tuple[np.ndarray | None, np.ndarray]:
+        """Score candidate triples against a normalized query vector, fused with lexical matches if given.
+
+        With table cards, the candidates are the triples of the ``rag_table_cards_top_k`` best matching
+        tables. Otherwise lexical matches are always scored, in addition to the IVF candidates; on matrices
+        of at least ``rag_lexical_prefilter_min_rows`` rows they are the only rows scored.
+
+        Returns:
+            The candidate row ids (None when every row was scored) and their similarity scores.
+        """
+        rows = None
+        if self.table_cards is not None:
+            weight = config.rag_lexical_weight if lexical is not None else 0.0
+            tables = self.table_cards.top_tables(query_vec, query, config.rag_table_cards_top_k, weight)
+            rows = self.table_cards.table_rows(tables)
+            return rows, self._fuse(rows, self._similarities(query_vec, rows), lexical)
+        if self.ann_index is not None:
+            rows = self.ann_index.search(query_vec, nprobe=config.rag_ivf_nprobe)
+        if lexical is not None and len(lexical[0]):
+            if rows is not None:
+                rows = np.union1d(rows, lexical[0])
+            elif self._lexical_prefilter_enabled():
+                rows = lexical[0]
+        return rows, self._fuse(rows, self._similarities(query_vec, rows), lexical)
+
+    def _similarities(self, query_vec: np.ndarray, rows: np.ndarray | None) -> np.ndarray:
+        """Return cosine similarities of the query with all rows or with ``rows``.
+
+        With quantized embeddings, every candidate is scored on the quantized matrix and the top
+        ``rag_rescore_candidates`` are rescored against the float32 rows, read in row order from the
+        memory-mapped store.
+        """
+        if self.quantized is None:
+            return self.embeddings @ query_vec if rows is None else self.embeddings[rows] @ query_vec
+        sims = self.quantized.dot(query_vec, rows)
+        top = self._top_k_indices(sims, config.rag_rescore_candidates)
+        top = top[np.argsort(top if rows is None else rows[top])]
+        exact_rows = top if rows is None else rows[top]
+        sims[top] = self.embeddings[exact_rows] @ query_vec
+        return sims
+
+    def _lexical_search(self, query: str) -> Tuple[np.ndarray, np.ndarray] | None:
+        """Return the lexical matches of a query, or None when the lexical index is disabled."""
+        return None if self.lexical_index is None else self.lexical_index.search(query)
+
+    def _lexical_prefilter_enabled(self) -> bool:
+        """Whether hybrid search scores only lexical candidates on this matrix."""
+        return self.lexical_index is not None and len(self.embeddings) >= config.rag_lexical_prefilter_min_rows
+
+    @staticmethod
+    def _fuse(rows: np.ndarray | None, sims: np.ndarray, lexical: Tuple[np.ndarray, np.ndarray] | None) -> np.ndarray:
+        """Add the weighted lexical scores to the similarities of the scored rows that matched lexically."""
+        if lexical is None or not len(lexical[0]):
+            return sims
+        doc_ids, scores = lexical
+        if rows is None:
+            positions = doc_ids
+        else:
+            positions = np.minimum(np.searchsorted(rows, doc_ids), len(rows) - 1)
+            scored = rows[positions] == doc_ids
+            positions, scores = positions[scored], scores[scored]
+        sims[positions] += config.rag_lexical_weight * scores
+        return sims
+
+    @staticmethod
+    def _rows(rows: np.ndarray | None, positions: np.ndarray) -> list[int]:
+        """Map positions in a score array back to embedding row ids."""
+        return (positions if rows is None else rows[positions]).tolist()
+
+    @staticmethod
+    def _top_k_indices(sims: np.ndarray, k: int) -> np.ndarray:
+        """Return the indices of the ``k`` highest scores, ordered by descending score."""
+        k = min(k, len(sims))
+        if k <= 0:
+            return np.empty(0, dtype=np.int64)
+        if k < len(sims):
+            candidates = np.argpartition(-sims, k - 1)[:k]
+        else:
+            candidates = np.arange(len(sims))
+        return candidates[np.argsort(-sims[candidates], kind="stable")]
 
     @staticmethod
     def get_relevant_tables_columns(
@@ -412,108 +1008,320 @@ class SchemaVectorizer:
     def map_query_to_schema(
         self,
         query: str,
+        query_vec: np.ndarray | None = None,
     ) -> Tuple[List[Tuple[Tuple[str, str, str], float]], Set[str], Dict[str, Set[str]]]:
         """End-to-end workflow: search schema triples and save relevant elements.
 
         Args:
             query: Natural language query string.
-            score_threshold: Minimum similarity score to keep a triple.
-            min_results: Fallback number of top triples if filtering is too strict.
+            query_vec: Precomputed normalized embedding of the query, e.g. a conversation embedding.
+        """
+        query_vecs = None if query_vec is None else query_vec.reshape(1, -1)
+        return self.map_queries_to_schema([query], query_vecs)[0]
+
+    def map_queries_to_schema(
+        self,
+        queries: List[str],
+        query_vecs: np.ndarray | None = None,
+    ) -> List[Tuple[List[Tuple[Tuple[str, str, str], float]], Set[str], Dict[str, Set[str]]]]:
+        """Batched variant of :meth:`map_query_to_schema` that encodes and scores all queries together.
+
+        Args:
+            queries: Natural language query strings.
+            query_vecs: Precomputed normalized query embeddings, one row per query.
+
+        Returns:
+            One (top_triples, relevant_tables, relevant_columns) tuple per query, in input order.
         """
-        if not self.embeddings:
+        if self.embeddings.size == 0:
             logger.warning("[SchemaVectorizer] Embeddings not initialized — attempting to load...")
             self.load_embeddings()
-        top_triples = self.search(
-            query,
+        mapped = []
+        for top_triples in self.search_many(
+            queries,
             score_threshold=config.rag_schema_query_score_threshold,
             min_results=config.rag_schema_query_min_results,
+            query_vecs=query_vecs,
+        ):
+            relevant_tables, relevant_columns = self.get_relevant_tables_columns(top_triples)
+            mapped.append((top_triples, relevant_tables, relevant_columns))
+        return mapped
+
+
+class SchemaFragmentIndex:
+    """Pre-serialized schema fragments indexed by (profile, table name).
+
+    Every profile, table and column is dumped to a plain dict once when the index is built, so a filtered
+    schema is assembled from shared fragments with shallow dict construction instead of deep copies and a
+    per-query ``model_dump``. The fragments are shared between results and must be treated as read-only.
+
+    Attributes:
+        profiles (list[dict]): Serialized profile headers, in profile order.
+        tables (dict): Map of (profile index, table name) to a list of (table position, serialized table,
+            list of (column name, serialized column)) entries.
+        table_names (dict): Map of table name to the profile indices that contain a table with that name.
+    """
+
+    def __init__(self, schema_profiles: List[SchemaGlossary]):
+        self.profiles: List[Dict[str, Any]] = []
+        self.tables: Dict[Tuple[int, str], List[Tuple[int, Dict[str, Any], List[Tuple[str, Dict[str, Any]]]]]] = (
+            defaultdict(list)
         )
-        relevant_tables, relevant_columns = self.get_relevant_tables_columns(top_triples)
-        return top_triples, relevant_tables, relevant_columns
+        self.table_names: Dict[str, List[int]] = defaultdict(list)
+        for profile_idx, profile in enumerate(schema_profiles):
+            self.profiles.append(profile.model_dump(exclude={"schema_info"}, exclude_none=True))
+            for position, table in enumerate(profile.schema_info):
+                table_dict = table.model_dump(exclude_none=True)
+                columns = [
+                    (column.column_name, column_dict)
+                    for column, column_dict in zip(table.columns or [], table_dict.pop("columns", []), strict=True)
+                ]
+                key = (profile_idx, table.table_name)
+                if not self.tables[key]:
+                    self.table_names[table.table_name].append(profile_idx)
+                self.tables[key].append((position, table_dict, columns))
+
+    def filtered_schema(self, relevant_tables: Set[str], relevant_columns: Dict[str, Set[str]]) -> List[Dict[str, Any]]:
+        """Assemble the serialized schema restricted to the relevant tables and columns.
+
+        Profiles and tables keep their original order; tables without any relevant column and profiles
+        without any relevant table are left out.
+
+        Args:
+            relevant_tables: Set of table names to include.
+            relevant_columns: Dict of table name -> set of column names to include.
+
+        Returns:
+            list[dict]: One serialized profile per profile with matching tables.
+        """
+        selected: Dict[int, List[Tuple[int, Dict[str, Any]]]] = defaultdict(list)
+        for table_name in relevant_tables:
+            keep_columns = relevant_columns.get(table_name, set())
+            if not keep_columns:
+                continue
+            for profile_idx in self.table_names.get(table_name, []):
+                for position, table_dict, columns in self.tables[(profile_idx, table_name)]:
+                    kept = [column_dict for name, column_dict in columns if name in keep_columns]
+                    if kept:
+                        selected[profile_idx].append((position, {**table_dict, "columns": kept}))
+        return [
+            {**self.profiles[profile_idx], "schema_info": [table for _, table in sorted(tables, key=lambda t: t[0])]}
+            for profile_idx, tables in sorted(selected.items())
+        ]
 
 
 class SchemaRetriever:
-    """Retrieves subgraph based on relevant tables and columns."""
+    """Retrieves subgraph based on relevant tables and columns.
+
+    Args:
+        rag_dir (str | None): Directory for debug outputs; defaults to ``rag_dir`` from the config.
+        graph (CompactSchemaGraph | None): Schema graph whose join edges expand the vector hits with join
+            partner tables and key columns; None disables graph expansion.
+        value_index (CategoricalValueIndex | None): Index resolving categorical value mentions in the query to
+            the columns holding them; None disables value matching.
+    """
 
-    def __init__(self):
-        pass
+    def __init__(
+        self,
+        rag_dir: str | None = None,
+        graph: CompactSchemaGraph | None = None,
+        value_index: CategoricalValueIndex | None = None,
+    ):
+        self.rag_dir = rag_dir or config.rag_dir
+        self.graph = graph
+        self.value_index = value_index
 
     def get_relevant_schema_from_query(
         self,
         query: str,
         vectorizer: SchemaVectorizer,
-        schema_profiles: List[SchemaGlossary],
-    ) -> List[SchemaGlossary]:
+        schema_index: SchemaFragmentIndex,
+        query_vec: np.ndarray | None = None,
+    ) -> Dict[str, Any]:
         """Run vector search and save relevant schema elements and subgraph."""
-        top_triples, relevant_tables, relevant_columns = vectorizer.map_query_to_schema(query=query)
-        filtered_schema = self.reconstruct_filtered_schema(
-            schema_profiles=schema_profiles, relevant_tables=relevant_tables, relevant_columns=relevant_columns
-        )
+        top_triples, relevant_tables, relevant_columns = vectorizer.map_query_to_schema(query, query_vec)
+        return self.filter_schema(top_triples, relevant_tables, relevant_columns, schema_index, query=query)
+
+    def get_relevant_schemas_from_queries(
+        self,
+        queries: List[str],
+        vectorizer: SchemaVectorizer,
+        schema_index: SchemaFragmentIndex,
+        query_vecs: np.ndarray | None = None,
+    ) -> List[Dict[str, Any]]:
+        """Run one batched vector search for several queries and filter the schema for each."""
+        return [
+            self.filter_schema(top_triples, relevant_tables, relevant_columns, schema_index, query=query)
+            for query, (top_triples, relevant_tables, relevant_columns) in zip(
+                queries, vectorizer.map_queries_to_schema(queries, query_vecs), strict=True
+            )
+        ]
+
+    def filter_schema(
+        self,
+        top_triples: List[Tuple[Tuple[str, str, str], float]],
+        relevant_tables: Set[str],
+        relevant_columns: Dict[str, Set[str]],
+        schema_index: SchemaFragmentIndex,
+        query: str = "",
+    ) -> Dict[str, Any]:
+        """Assemble the retrieval payload for a search result and save debug outputs if enabled.
+
+        Columns holding categorical values mentioned in ``query`` are added before the graph expansion,
+        so their tables' join partners are pulled in as well.
+
+        Returns:
+            dict: ``schema_info`` with the filtered schema profiles, plus ``table_scores`` and ``column_scores``
+            with the best triple score per table and per column, used to rank schema elements when the
+            rendered context has to be cut down to a token budget.
+        """
+        table_scores, column_scores = self.score_schema_elements(top_triples)
+        if self.value_index is not None and query:
+            relevant_tables, relevant_columns = self.add_value_matches(
+                query, relevant_tables, relevant_columns, table_scores, column_scores
+            )
+        if self.graph is not None and config.graph_expansion_hops > 0:
+            relevant_tables, relevant_columns = self.expand_with_graph(
+                relevant_tables, relevant_columns, table_scores, column_scores
+            )
+        filtered_schema = schema_index.filtered_schema(relevant_tables, relevant_columns)
         if config.rag_debugging:
-            logger.info("[Retriever] Saving debug outputs.")
             self.save_debug_rag_outputs(
                 relevant_tables=relevant_tables,
                 relevant_columns=relevant_columns,
                 top_triples=top_triples,
                 filtered_schema=filtered_schema,
+                rag_dir=self.rag_dir,
             )
-        return filtered_schema
+        return {"schema_info": filtered_schema, "table_scores": table_scores, "column_scores": column_scores}
 
-    def reconstruct_filtered_schema(
-        self, schema_profiles: List[SchemaGlossary], relevant_tables: Set[str], relevant_columns: Dict[str, Set[str]]
-    ) -> List[SchemaGlossary]:
+    def add_value_matches(
+        self,
+        query: str,
+        relevant_tables: Set[str],
+        relevant_columns: Dict[str, Set[str]],
+        table_scores: Dict[str, float],
+        column_scores: Dict[str, Dict[str, float]],
+    ) -> Tuple[Set[str], Dict[str, Set[str]]]:
+        """Add the tables and columns holding categorical values mentioned in the query.
+
+        Matched columns are scored with their match score: 1.0 for an exact match, the trigram similarity
+        for a fuzzy one. ``table_scores`` and ``column_scores`` are updated in place.
+
+        Returns:
+            The extended relevant tables and relevant columns; the inputs are not modified.
         """
-        Reconstruct a filtered schema, preserving all available metadata fields.
+        if self.value_index is None:
+            return relevant_tables, relevant_columns
+        matches = self.value_index.match(
+            query, fuzzy_threshold=config.rag_value_fuzzy_threshold, limit=config.rag_value_max_matches
+        )
+        if not matches:
+            return relevant_tables, relevant_columns
+        tables = set(relevant_tables)
+        columns = defaultdict(set, {table: set(names) for table, names in relevant_columns.items()})
+        for table, column, _value, score in matches:
+            tables.add(table)
+            columns[table].add(column)
+            table_scores[table] = max(score, table_scores.get(table, score))
+            scores = column_scores.setdefault(table, {})
+            scores[column] = max(score, scores.get(column, score))
+        if config.rag_debugging:
+            logger.info(f"[Retriever] Value matches: {matches}")
+        return tables, dict(columns)
 
-        Args:
-            schema_profiles: Original parsed schema from cache.
-            relevant_tables: Set of table names to include.
-            relevant_columns: Dict of table name -> set of column names to include.
+    def expand_with_graph(
+        self,
+        relevant_tables: Set[str],
+        relevant_columns: Dict[str, Set[str]],
+        table_scores: Dict[str, float],
+        column_scores: Dict[str, Dict[str, float]],
+    ) -> Tuple[Set[str], Dict[str, Set[str]]]:
+        """Add the join partners of the relevant tables and the key columns joining them.
+
+        Partners are found with a bounded breadth-first walk over the join edges of the compact graph,
+        seeded with the table scores. Added tables and key columns get the decayed score of the table
+        that joins them; ``table_scores`` and ``column_scores`` are updated in place.
 
         Returns:
-            Filtered schema_profiles preserving full metadata.
+            The expanded relevant tables and relevant columns; the inputs are not modified.
         """
-        filtered_profiles = []
+        graph = self.graph
+        if graph is None:
+            return relevant_tables, relevant_columns
+        seeds = {
+            table_id: table_scores.get(table_name, 0.0)
+            for table_name in relevant_tables
+            for table_id in graph.table_ids(table_name)
+        }
+        expanded = graph.expand_joins(
+            seeds,
+            hops=config.graph_expansion_hops,
+            max_tables=config.graph_expansion_max_tables,
+            decay=config.graph_expansion_decay,
+        )
+        tables = set(relevant_tables)
+        columns = defaultdict(set, {table: set(names) for table, names in relevant_columns.items()})
+        for table_id, (score, key_column_ids) in expanded.items():
+            table_node = graph.node_names[table_id]
+            table_name = table_node.split(".", 1)[-1]
+            if table_name not in tables:
+                tables.add(table_name)
+                table_scores[table_name] = score
+            for column_id in key_column_ids:
+                column_name = graph.node_names[column_id][len(table_node) + 1 :]
+                columns[table_name].add(column_name)
+                scores = column_scores.setdefault(table_name, {})
+                scores.setdefault(column_name, score)
+        if config.rag_debugging and len(tables) > len(relevant_tables):
+            logger.info(f"[Retriever] Graph expansion added tables: {sorted(tables - relevant_tables)}")
+        return tables, dict(columns)
 
-        for profile in schema_profiles:
-            filtered_tables = []
-            for table in profile.schema_info:
-                if table.table_name not in relevant_tables:
-                    continue
-                keep_columns = relevant_columns.get(table.table_name, set())
-                filtered_columns = [col for col in table.columns if col.column_name in keep_columns]
-                if not filtered_columns:
-                    continue
-                table_copy = deepcopy(table)
-                table_copy.columns = filtered_columns
-                filtered_tables.append(table_copy)
-            if filtered_tables:
-                profile_copy = deepcopy(profile)
-                profile_copy.schema_info = filtered_tables
-                filtered_profiles.append(profile_copy)
-        return filtered_profiles
+    @staticmethod
+    def score_schema_elements(
+        top_triples: List[Tuple[Tuple[str, str, str], float]],
+    ) -> Tuple[Dict[str, float], Dict[str, Dict[str, float]]]:
+        """Return the best score of the triples mentioning each table and each column of a table."""
+        column_to_table = {obj: subj for (subj, pred, obj), _ in top_triples if pred == "has_column"}
+        table_scores: Dict[str, float] = {}
+        column_scores: Dict[str, Dict[str, float]] = defaultdict(dict)
+        for (subj, pred, obj), score in top_triples:
+            if pred == "has_column":
+                table, column = subj, obj
+            elif subj in column_to_table:
+                table, column = column_to_table[subj], subj
+            else:
+                continue
+            score = float(score)
+            table_scores[table] = max(score, table_scores.get(table, score))
+            columns = column_scores[table]
+            columns[column] = max(score, columns.get(column, score))
+        return table_scores, dict(column_scores)
 
     @staticmethod
     def save_debug_rag_outputs(
         relevant_tables: Set[str],
         relevant_columns: Dict[str, Set[str]],
         top_triples: List[Tuple[Tuple[str, str, str], float]],
-        filtered_schema: List[SchemaGlossary],
+        filtered_schema: List[Dict[str, Any]],
+        rag_dir: str | None = None,
     ) -> None:
-        """Save debug files related to the subgraph and schema extraction."""
-        output_dir: str = os.path.join(config.rag_dir + "/rag_debug")
-        os.makedirs(output_dir, exist_ok=True)
-        with open(os.path.join(output_dir, "relevant_tables.json"), "w", encoding="utf-8") as f:
-            json.dump(sorted(relevant_tables), f, indent=2)
-        with open(os.path.join(output_dir, "relevant_columns.json"), "w", encoding="utf-8") as f:
-            json.dump({k: sorted(v) for k, v in relevant_columns.items()}, f, indent=2)
-        with open(os.path.join(output_dir, "scored_triples.json"), "w", encoding="utf-8") as f:
-            json.dump(
-                [{"triple": list(triple), "score": round(score, 3)} for triple, score in top_triples], f, indent=2
-            )
-        with open(os.path.join(output_dir, "partial_schema.json"), "w", encoding="utf-8") as f:
-            json.dump([schema.model_dump(exclude_none=True) for schema in filtered_schema], f, indent=2)
-        logger.info(f"[Retriever] RAG outputs saved in {output_dir}.")
+        """Queue the retrieval results for the background debug writer.
+
+        Serialization happens on the writer thread; the arguments are only read, never modified.
+        """
+        debug_writer.submit(
+            os.path.join(rag_dir or config.rag_dir, "rag_debug"),
+            "retriever",
+            lambda: {
+                "relevant_tables": sorted(relevant_tables),
+                "relevant_columns": {k: sorted(v) for k, v in relevant_columns.items()},
+                "scored_triples": [
+                    {"triple": list(triple), "score": round(float(score), 3)} for triple, score in top_triples
+                ],
+                "partial_schema": filtered_schema,
+            },
+        )
 
 
 class SchemaRAG:
@@ -523,61 +1331,539 @@ class SchemaRAG:
 
     Attributes:
         graph_builder (SchemaGraphBuilder): Builder and cache manager for the schema graph.
+        schema_index (SchemaFragmentIndex): Pre-serialized schema fragments used to assemble filtered schemas.
+        value_index (CategoricalValueIndex | None): Categorical values of the schema, matched against queries.
         vectorizer (SchemaVectorizer): Embedding manager for schema triples.
+        result_cache (SchemaResultCache): Finished payloads keyed by query, schema content and retrieval settings.
     """
 
-    def __init__(self, schema_data):
+    def __init__(self, schema_data, rag_dir: str | None = None):
         """
         Initialize the SchemaGraphRAG pipeline with raw or cached schema data.
 
         Args:
             schema_data (Union[list, dict]): Schema information, either as a list of SchemaGlossary
             objects or a dict containing a 'schema_info' key.
+            rag_dir (str | None): Directory for the cache files; defaults to ``rag_dir`` from the config.
         """
         if isinstance(schema_data, dict) and "schema_info" in schema_data:
             schema_data = schema_data["schema_info"]
 
-        self.triple_extractor = SchemaTripleExtractor(schema_data)
+        self.rag_dir = rag_dir or config.rag_dir
+        self.result_cache = SchemaResultCache(maxsize=config.rag_result_cache_size)
+        self.triple_extractor = SchemaTripleExtractor(schema_data, rag_dir=self.rag_dir)
         triples_rebuilt = self.triple_extractor.create_schema_triples()
-        self.vectorizer = SchemaVectorizer(self.triple_extractor.triples)
+        self.schema_index = SchemaFragmentIndex(self.triple_extractor.schema_profiles)
+        self.value_index = (
+            CategoricalValueIndex.from_profiles(self.triple_extractor.schema_profiles)
+            if config.rag_value_index
+            else None
+        )
+        self.vectorizer = SchemaVectorizer(self.triple_extractor.triples, rag_dir=self.rag_dir)
         self.vectorizer.initialize_embeddings(force_rebuild=triples_rebuilt)
         if config.graph_enabled:
             logger.info("Initializing schema graph builder.")
             self.graph_builder = SchemaGraphBuilder(
-                triples=self.triple_extractor.triples, is_rag_outdated=triples_rebuilt
+                triples=self.triple_extractor.triples,
+                is_rag_outdated=triples_rebuilt,
+                schema_profiles=self.triple_extractor.schema_profiles,
+                rag_dir=self.rag_dir,
             )
-            self.graph_builder.initialize_graph()
-
-    def run_query(self, user_messages: List[str]) -> dict[str, List[dict[str, Any]]]:
+            if config.graph_format == "csr":
+                self.graph_builder.initialize_compact_graph()
+            else:
+                self.graph_builder.initialize_graph()
+
+    @property
+    def join_graph(self) -> CompactSchemaGraph | None:
+        """The compact schema graph used for graph expansion, if the graph is enabled in CSR format."""
+        graph_builder = getattr(self, "graph_builder", None)
+        return graph_builder.compact_graph if graph_builder is not None else None
+
+    def run_query(self, user_messages: List[str]) -> dict[str, Any]:
         """
         Run a semantic search over the schema graph using the provided user messages,
         and return a filtered schema relevant to the query.
 
+        The query embedding combines the embeddings of the last ``rag_conversation_window`` messages with
+        recency weights (see :meth:`SchemaVectorizer.encode_conversations`); lexical and value matching use
+        their concatenated text.
+
         Args:
             user_messages (List[str]): List of user message strings representing the query context.
 
         Returns:
-            str: A JSON-formatted string of the filtered schema relevant to the user's query.
+            dict: The filtered schema under ``schema_info``, with per-table and per-column retrieval
+            scores under ``table_scores`` and ``column_scores``.
         """
-        query = " ".join(user_messages)
-
-        retriever = SchemaRetriever()
-        filtered_schema = retriever.get_relevant_schema_from_query(
-            query=query,
+        messages = self.conversation_window(user_messages)
+        cache_key = self.result_cache_key(messages)
+        cached = self.result_cache.get(cache_key)
+        if cached is not None:
+            return self._copy_payload(cached)
+
+        retriever = SchemaRetriever(rag_dir=self.rag_dir, graph=self.join_graph, value_index=self.value_index)
+        payload = retriever.get_relevant_schema_from_query(
+            query=" ".join(messages),
             vectorizer=self.vectorizer,
-            schema_profiles=self.triple_extractor.schema_profiles,
+            schema_index=self.schema_index,
+            query_vec=self.vectorizer.encode_conversations([messages])[0],
+        )
+        self.result_cache.put(cache_key, payload)
+        return self._copy_payload(payload)
+
+    @staticmethod
+    def _copy_payload(payload: Dict[str, Any]) -> dict[str, Any]:
+        """Copy the top-level containers of a cached payload so callers can extend them safely."""
+        return {
+            "schema_info": list(payload["schema_info"]),
+            "table_scores": dict(payload["table_scores"]),
+            "column_scores": dict(payload["column_scores"]),
+        }
+
+    def run_queries(self, message_lists: List[List[str]]) -> List[dict[str, Any]]:
+        """
+        Run :meth:`run_query` for many conversations at once, for bulk report generation and evaluation.
+
+        All queries are encoded in one batched call and scored together.
+
+        Args:
+            message_lists (List[List[str]]): One list of user message strings per query.
+
+        Returns:
+            List[dict]: One filtered schema payload per query, in input order.
+        """
+        windows = [self.conversation_window(user_messages) for user_messages in message_lists]
+        cache_keys = [self.result_cache_key(messages) for messages in windows]
+        payloads = [self.result_cache.get(cache_key) for cache_key in cache_keys]
+        missing = [i for i, payload in enumerate(payloads) if payload is None]
+        if missing:
+            retriever = SchemaRetriever(rag_dir=self.rag_dir, graph=self.join_graph, value_index=self.value_index)
+            retrieved = retriever.get_relevant_schemas_from_queries(
+                queries=[" ".join(windows[i]) for i in missing],
+                vectorizer=self.vectorizer,
+                schema_index=self.schema_index,
+                query_vecs=self.vectorizer.encode_conversations([windows[i] for i in missing]),
+            )
+            for i, payload in zip(missing, retrieved, strict=True):
+                payloads[i] = payload
+                self.result_cache.put(cache_keys[i], payload)
+        return [self._copy_payload(payload) for payload in payloads]  # type: ignore[arg-type]
+
+    @staticmethod
+    def conversation_window(user_messages: List[str]) -> List[str]:
+        """Return the messages that form the query: the last ``rag_conversation_window`` non-empty messages.
+
+        With a window of 0 the whole conversation is returned as one concatenated message.
+        """
+        if config.rag_conversation_window <= 0:
+            return [" ".join(user_messages)]
+        messages = [message for message in user_messages if message.strip()]
+        return messages[-config.rag_conversation_window :] or [""]
+
+    def result_cache_key(self, messages: List[str]) -> Tuple[Any, ...]:
+        """Return the result cache key of the windowed messages of a query.
+
+        The key combines the normalized messages, the schema content hash and every setting that changes
+        retrieval results, so cached payloads are never served across schema versions or configurations.
+        """
+        return (
+            tuple(normalize_query_text(message) for message in messages),
+            config.rag_conversation_decay,
+            self.triple_extractor.content_hash,
+            self.vectorizer.model_name,
+            config.rag_retrieval_mode,
+            config.rag_lexical_weight,
+            config.rag_lexical_prefilter_min_rows,
+            config.rag_index_type,
+            config.rag_ivf_nprobe,
+            config.rag_embedding_quantization,
+            config.rag_rescore_candidates,
+            config.rag_search_granularity,
+            config.rag_table_cards_top_k,
+            config.rag_table_card_max_columns,
+            config.rag_schema_query_score_threshold,
+            config.rag_schema_query_min_results,
+            self.join_graph is not None,
+            self.value_index is not None,
+            config.rag_value_fuzzy_threshold,
+            config.rag_value_max_matches,
+            config.graph_expansion_hops,
+            config.graph_expansion_max_tables,
+            config.graph_expansion_decay,
+        )
+
+
+ShardKey = Tuple[str, str] | None
+
+
+def get_active_shard_key() -> ShardKey:
+    """Return the (profile_name, output_name) of the active dbt target, or None if it cannot be resolved."""
+    try:
+        profiles = get_dbt_profiles_settings()
+        return profiles.get_active_profile(), profiles.get_active_target()
+    except (FileNotFoundError, ValueError) as e:
+        logger.warning("Could not resolve the active dbt target for schema RAG: %s", e)
+        return None
+
+
+class ShardedSchemaRAG:
+    """Registry of SchemaRAG shards, one per (profile_name, output_name) schema profile.
+
+    Each shard keeps its own triples, embeddings and graph under ``<rag_dir>/shards/<profile>__<output>`` and
+    is built on first use, so only the targets that are actually queried are loaded. Queries search the shard
+    of the active dbt target. When ``rag_shard_by_target`` is disabled, all profiles share a single shard in
+    ``rag_dir`` itself.
+
+    Attributes:
+        rag_dir (str): Base directory for the shard cache directories.
+        active_key (tuple | None): Shard key of the active dbt target.
+        shards (dict): Shards built so far, keyed by shard key.
+    """
+
+    def __init__(self, schema_data, rag_dir: str | None = None, active_key: ShardKey = None):
+        if isinstance(schema_data, dict) and "schema_info" in schema_data:
+            schema_data = schema_data["schema_info"]
+        if isinstance(schema_data, dict):
+            schema_data = [schema_data]
+        self.rag_dir = rag_dir or config.rag_dir
+        self.active_key = active_key
+        self.shards: Dict[ShardKey, SchemaRAG] = {}
+        self._shard_data: Dict[ShardKey, list] = defaultdict(list)
+        for entry in schema_data or []:
+            self._shard_data[self.shard_key(entry)].append(entry)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def shard_key(entry: Any) -> ShardKey:
+        """Return the shard key of a schema profile, given as a SchemaGlossary or a dict."""
+        if not config.rag_shard_by_target:
+            return None
+        get = entry.get if isinstance(entry, dict) else partial(getattr, entry)
+        return get("profile_name"), get("output_name")
+
+    @property
+    def keys(self) -> List[ShardKey]:
+        """Keys of all shards, built or not."""
+        return list(self._shard_data)
+
+    def shard_dir(self, key: ShardKey) -> str:
+        """Return the cache directory of a shard."""
+        if key is None:
+            return self.rag_dir
+        name = "__".join(re.sub(r"[^A-Za-z0-9_.-]", "_", str(part)) for part in key)
+        return os.path.join(self.rag_dir, "shards", name)
+
+    def get_shard(self, key: ShardKey) -> SchemaRAG | None:
+        """Return the shard for ``key``, building it on first access, or None if no profile has that key."""
+        shard = self.shards.get(key)
+        if shard is not None or key not in self._shard_data:
+            return shard
+        with self._lock:
+            shard = self.shards.get(key)
+            if shard is None:
+                logger.info(f"Initializing schema RAG shard {key}.")
+                shard = SchemaRAG(self._shard_data[key], rag_dir=self.shard_dir(key))
+                self.shards[key] = shard
+        return shard
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """Return the result cache statistics summed over the built shards."""
+        totals = {"size": 0, "maxsize": 0, "hits": 0, "misses": 0, "approx_bytes": 0}
+        for shard in list(self.shards.values()):
+            for name, value in shard.result_cache.stats().items():
+                if name in totals:
+                    totals[name] += value
+        lookups = totals["hits"] + totals["misses"]
+        return {**totals, "hit_rate": totals["hits"] / lookups if lookups else 0.0}
+
+    def warm(self, keys: List[ShardKey]) -> None:
+        """Build the shards for ``keys`` now rather than on their first query."""
+        for key in keys:
+            self.get_shard(key)
+
+    def resolve_shards(self, key: ShardKey = None) -> List[SchemaRAG]:
+        """Return the shards to search for ``key``, defaulting to the active target.
+
+        Falls back to every shard when the target has no schema profile, so retrieval still works with an
+        unresolved or renamed target.
+        """
+        if not config.rag_shard_by_target:
+            key = None
+        elif key is None:
+            key = self.active_key
+        shard = self.get_shard(key)
+        if shard is not None:
+            return [shard]
+        if config.rag_shard_by_target:
+            logger.warning(f"No schema RAG shard for target {key}. Searching all {len(self._shard_data)} shards.")
+        return [s for s in (self.get_shard(k) for k in self.keys) if s is not None]
+
+    def run_query(self, user_messages: List[str], key: ShardKey = None) -> dict[str, Any]:
+        """Run :meth:`SchemaRAG.run_query` on the shard of ``key`` or of the active target.
+
+        Args:
+            user_messages (List[str]): List of user message strings representing the query context.
+            key (tuple | None): (profile_name, output_name) of the shard to search; None uses the active target.
+
+        Returns:
+            dict: The filtered schema relevant to the query, with the retrieval scores of all searched shards.
+        """
+        result = self._empty_payload()
+        for shard in self.resolve_shards(key):
+            self._merge_payload(result, shard.run_query(user_messages))
+        return result
+
+    def run_queries(self, message_lists: List[List[str]], key: ShardKey = None) -> List[dict[str, Any]]:
+        """Run :meth:`SchemaRAG.run_queries` on the shard of ``key`` or of the active target."""
+        results = [self._empty_payload() for _ in message_lists]
+        for shard in self.resolve_shards(key):
+            for result, payload in zip(results, shard.run_queries(message_lists), strict=True):
+                self._merge_payload(result, payload)
+        return results
+
+    @staticmethod
+    def _empty_payload() -> dict[str, Any]:
+        return {"schema_info": [], "table_scores": {}, "column_scores": {}}
+
+    @staticmethod
+    def _merge_payload(result: dict[str, Any], payload: dict[str, Any]) -> None:
+        """Append a shard payload to ``result``, keeping the best score of tables found in several shards."""
+        result["schema_info"].extend(payload["schema_info"])
+        for table, score in payload["table_scores"].items():
+            result["table_scores"][table] = max(score, result["table_scores"].get(table, score))
+        for table, scores in payload["column_scores"].items():
+            merged = result["column_scores"].setdefault(table, {})
+            for column, score in scores.items():
+                merged[column] = max(score, merged.get(column, score))
+
+
+RAG_VERSIONS_DIR = "versions"
+RAG_CURRENT_FILE = "CURRENT"
+
+
+def live_rag_dir(rag_dir: str | None = None) -> str:
+    """Return the directory of the live schema RAG version.
+
+    Background rebuilds publish their version directory by writing its name to ``<rag_dir>/CURRENT``; until
+    the first rebuild, or if the pointer is unreadable, the cache files live in ``rag_dir`` itself.
+    """
+    rag_dir = rag_dir or config.rag_dir
+    try:
+        with open(os.path.join(rag_dir, RAG_CURRENT_FILE), "r", encoding="utf-8") as f:
+            name = f.read().strip()
+    except OSError:
+        return rag_dir
+    version_dir = os.path.join(rag_dir, RAG_VERSIONS_DIR, name)
+    return version_dir if name and os.path.isdir(version_dir) else rag_dir
+
+
+def _link_or_copy(src: str, dst: str) -> None:
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+def stage_rag_dir(version: int, rag_dir: str | None = None) -> str:
+    """Create a new version directory for a background rebuild, seeded with the live version's files.
+
+    The files are hard-linked where the filesystem allows it, so unchanged embeddings are reused without a
+    copy. Every cache file is written to a temporary name and renamed into place, so the rebuild replaces
+    the links in the new directory and never modifies a file the live version has memory-mapped.
+
+    Args:
+        version: Holder version the directory is built for, used in its name.
+        rag_dir: Base directory of the schema RAG cache; defaults to ``rag_dir`` from the config.
+
+    Returns:
+        str: Path of the new version directory.
+    """
+    rag_dir = rag_dir or config.rag_dir
+    staging = os.path.join(rag_dir, RAG_VERSIONS_DIR, f"v{version}-{os.getpid()}-{time.time_ns()}")
+    live = live_rag_dir(rag_dir)
+    if os.path.isdir(live):
+        shutil.copytree(
+            live,
+            staging,
+            ignore=shutil.ignore_patterns(RAG_VERSIONS_DIR, RAG_CURRENT_FILE, "rag_debug", "*.tmp"),
+            copy_function=_link_or_copy,
         )
-        return {"schema_info": [entry.model_dump(exclude_none=True) for entry in filtered_schema]}
+    else:
+        os.makedirs(staging)
+    return staging
+
 
+def publish_rag_dir(version_dir: str, rag_dir: str | None = None) -> None:
+    """Make a staged version directory the live one and remove the versions before the previous one.
 
-@lru_cache()
-def get_schema_rag() -> SchemaRAG:
+    The ``CURRENT`` pointer is written to a temporary file and renamed into place, so readers see either
+    the previous or the new version. The previous version is kept for requests still reading it.
     """
-    Load the schema from cache and initialize a cached instance of SchemaGraphRAG.
-    This function uses LRU caching to avoid repeated initialization.
+    rag_dir = rag_dir or config.rag_dir
+    previous = live_rag_dir(rag_dir)
+    tmp_path = os.path.join(rag_dir, RAG_CURRENT_FILE + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(os.path.basename(version_dir))
+    os.replace(tmp_path, os.path.join(rag_dir, RAG_CURRENT_FILE))
+    keep = {os.path.abspath(version_dir), os.path.abspath(previous)}
+    versions_dir = os.path.join(rag_dir, RAG_VERSIONS_DIR)
+    for name in os.listdir(versions_dir):
+        path = os.path.join(versions_dir, name)
+        if os.path.abspath(path) not in keep:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def build_schema_rag(
+    schema_data, warm_keys: List[ShardKey] | None = None, rag_dir: str | None = None
+) -> ShardedSchemaRAG:
+    """Build a schema RAG registry for a schema snapshot and warm the shards that will be queried.
+
+    Args:
+        schema_data: Schema snapshot, as returned by ``load_schema_cache``.
+        warm_keys: Shard keys to build eagerly; defaults to the active target's shard.
+        rag_dir: Directory for the cache files; defaults to the live version directory.
+
+    Returns:
+        ShardedSchemaRAG: The new registry.
+    """
+    rag = ShardedSchemaRAG(schema_data, rag_dir=rag_dir or live_rag_dir(), active_key=get_active_shard_key())
+    rag.warm(warm_keys if warm_keys is not None else [rag.active_key if config.rag_shard_by_target else None])
+    return rag
+
+
+class SchemaRAGHolder:
+    """Double-buffered holder of the schema RAG that rebuilds in the background and swaps atomically.
+
+    Requests take a reference to :attr:`current` and keep using it until they finish, so a swap never
+    affects in-flight retrieval. Rebuilds run on a single background thread; refreshes requested while a
+    rebuild is running are coalesced into one more rebuild from the latest snapshot. Each rebuild writes
+    into a new version directory (see :func:`stage_rag_dir`) that is published with :func:`publish_rag_dir`
+    before the swap, so the files of the live version are never rewritten while they are memory-mapped.
+    The holder lives in the API process only; retrieval always runs there, also with the process executor.
+
+    Args:
+        loader (Callable): Returns the current schema snapshot.
+        builder (Callable): Builds a registry from a snapshot, the shard keys to warm and its cache directory.
+        rag_dir (str | None): Base directory of the versioned cache; defaults to ``rag_dir`` from the config.
+
+    Attributes:
+        version (int): Incremented on every swap; 0 until the first build.
+        built_at (float | None): Unix time of the last swap.
+        last_error (str | None): Error of the last failed background rebuild, cleared on success.
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[], Any] | None = None,
+        builder: Callable[[Any, List[ShardKey] | None, str], ShardedSchemaRAG] = build_schema_rag,
+        rag_dir: str | None = None,
+    ):
+        self._loader = loader or (lambda: load_schema_cache())  # pylint: disable=unnecessary-lambda
+        self._builder = builder
+        self._rag_dir = rag_dir
+        self._current: ShardedSchemaRAG | None = None
+        self._lock = threading.Lock()
+        self._worker: threading.Thread | None = None
+        self._refresh_requested = False
+        self._pending_schema: Any = None
+        self.version = 0
+        self.built_at: float | None = None
+        self.last_error: str | None = None
+
+    @property
+    def current(self) -> ShardedSchemaRAG:
+        """The live registry, built synchronously on first access."""
+        current = self._current
+        if current is not None:
+            return current
+        with self._lock:
+            if self._current is None:
+                self._swap(self._builder(self._loader(), None, live_rag_dir(self._rag_dir)))
+            return self._current  # type: ignore[return-value]
+
+    @property
+    def active_key(self) -> ShardKey:
+        """Shard key of the active target of the live registry, or None before the first build."""
+        current = self._current
+        return current.active_key if current is not None else None
+
+    def _swap(self, rag: ShardedSchemaRAG) -> None:
+        """Publish a new registry; callers hold ``_lock``."""
+        self._current = rag
+        self.version += 1
+        self.built_at = time.time()
+        logger.info(f"Schema RAG version {self.version} is live.")
+
+    def refresh(self, schema_data: Any = None, wait: bool = False) -> None:
+        """Rebuild the RAG from a new schema snapshot in the background and swap it in when ready.
+
+        Nothing is rebuilt before the RAG has been used; its first access already loads the latest schema.
+
+        Args:
+            schema_data: New schema snapshot; None reloads it with the loader in the background.
+            wait: Block until the background rebuild has finished, for scripts and tests.
+        """
+        with self._lock:
+            if self._current is None:
+                return
+            self._refresh_requested = True
+            self._pending_schema = schema_data
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._rebuild_loop, name="datu-rag-rebuild", daemon=True)
+                self._worker.start()
+            worker = self._worker
+        if wait:
+            worker.join()
+
+    def _rebuild_loop(self) -> None:
+        while True:
+            with self._lock:
+                if not self._refresh_requested:
+                    self._worker = None
+                    return
+                self._refresh_requested = False
+                schema_data, self._pending_schema = self._pending_schema, None
+                warm_keys = list(self._current.shards) if self._current is not None else None
+            version_dir = None
+            try:
+                if schema_data is None:
+                    schema_data = self._loader()
+                version_dir = stage_rag_dir(self.version + 1, self._rag_dir)
+                rag = self._builder(schema_data, warm_keys, version_dir)
+                publish_rag_dir(version_dir, self._rag_dir)
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                logger.error(f"Background schema RAG rebuild failed, keeping version {self.version}: {e}")
+                self.last_error = str(e)
+                if version_dir is not None:
+                    shutil.rmtree(version_dir, ignore_errors=True)
+                continue
+            with self._lock:
+                self._swap(rag)
+                self.last_error = None
+
+    def status(self) -> Dict[str, Any]:
+        """Return the live version and build time, rebuild state, last error and result cache statistics."""
+        with self._lock:
+            return {
+                "version": self.version,
+                "built_at": self.built_at,
+                "rebuilding": self._worker is not None,
+                "last_error": self.last_error,
+                "result_cache": self._current.cache_stats() if self._current is not None else None,
+            }
+
+
+schema_rag_holder = SchemaRAGHolder()
+
+
+def get_schema_rag() -> ShardedSchemaRAG:
+    """
+    Return the live registry of schema RAG shards, loading the schema cache on first use.
+
+    The registry is replaced in the background by :meth:`SchemaRAGHolder.refresh` when the schema changes.
 
     Returns:
-        SchemaGraphRAG: Cached instance of the graph-based RAG service.
+        ShardedSchemaRAG: The current registry of per-target schema RAG shards.
     """
-    schema_data = load_schema_cache()
-    return SchemaRAG(schema_data)
+    return schema_rag_holder.current
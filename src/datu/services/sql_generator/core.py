@@ -2,7 +2,7 @@
 
 import re
 from enum import Enum
-from typing import Union
+from typing import Any, Union
 
 from pydantic import BaseModel
 from sql_metadata import Parser
@@ -12,12 +12,23 @@ from datu.base.chat_schema import ChatRequest
 from datu.factory.db_connector import DBConnectorFactory
 from datu.integrations.dbt.config import get_active_target_config
 from datu.schema_extractor.schema_cache import SchemaGlossary, load_schema_cache
+from datu.services.executor import get_cpu_executor
 from datu.services.llm import fix_sql_error, generate_response
-from datu.services.schema_rag import get_schema_rag
+from datu.services.schema_rag import get_schema_rag, schema_rag_holder
+from datu.services.sql_generator.schema_renderer import SchemaContextRenderer
+from datu.services.sql_generator.session_context import SessionContextStore
 
 dbt_active_profile = get_active_target_config()
 settings = get_app_settings()
 logger = get_logger(__name__)
+schema_renderer = SchemaContextRenderer(max_values=settings.schema_context_max_values)
+session_contexts = SessionContextStore(
+    max_sessions=settings.schema_session_max_sessions,
+    ttl_seconds=settings.schema_session_ttl_seconds,
+    min_overlap=settings.schema_session_min_overlap,
+    score_decay=settings.schema_session_score_decay,
+    max_tables=settings.schema_session_max_tables,
+)
 
 
 class ExecutionTimeCategory(Enum):
@@ -144,6 +155,42 @@ def extract_sql_blocks(text: str) -> list:
     return blocks
 
 
+def retrieve_schema_context(user_messages: list[str]) -> dict[str, Any]:
+    """Run schema RAG retrieval for the user messages.
+
+    This is a module-level function so it can be dispatched to a thread or process pool.
+
+    Args:
+        user_messages (list[str]): The user messages of the conversation.
+
+    Returns:
+        dict[str, Any]: The filtered schema relevant to the conversation, with retrieval scores.
+    """
+    return get_schema_rag().run_query(user_messages)
+
+
+def render_schema_context(schema_context: Union[dict[str, Any], list[SchemaGlossary]]) -> str:
+    """Render the schema context as compact DDL-like text.
+
+    A schema RAG payload with retrieval scores is fitted to the configured token budget. The full schema
+    cache has no scores and is rendered whole.
+
+    Args:
+        schema_context: A schema RAG payload, or the full schema cache.
+
+    Returns:
+        str: The schema context for the system prompt.
+    """
+    if isinstance(schema_context, dict):
+        return schema_renderer.render(
+            schema_context.get("schema_info", []),
+            token_budget=settings.schema_context_token_budget,
+            table_scores=schema_context.get("table_scores"),
+            column_scores=schema_context.get("column_scores"),
+        )
+    return schema_renderer.render(schema_context)
+
+
 def validate_and_fix_sql(response_text: str) -> str:
     pattern = r"```(?:sql)?\s*([\s\S]*?)```"
     dml_ddl_ops = ["INSERT", "DROP", "DELETE", "UPDATE", "MERGE", "TRUNCATE", "ALTER"]
@@ -216,20 +263,34 @@ async def generate_sql_core(request: ChatRequest, *, use_schema_rag: bool | None
         HTTPException: If an error occurs during processing.
     """
 
-    schema_context: Union[dict[str, list[dict]], list[SchemaGlossary]]
+    schema_context: Union[dict[str, Any], list[SchemaGlossary]]
+    cpu_executor = get_cpu_executor()
 
     if not request.system_prompt:
         user_message = [msg.content for msg in request.messages if msg.role == "user"]
         use_rag = settings.enable_schema_rag if use_schema_rag is None else use_schema_rag
         if use_rag:
             try:
-                schema_context = get_schema_rag().run_query(user_message)
+                schema_context = await cpu_executor.run(retrieve_schema_context, user_message, stateful=True)
             except Exception as e:
                 logger.error("Error running graph RAG: %s", e, exc_info=True)
                 logger.warning("Falling back to schema cache due to graph RAG error.")
                 schema_context = load_schema_cache()
         else:
             schema_context = load_schema_cache()
+        if request.session_id and isinstance(schema_context, dict):
+            session_context = session_contexts.update(
+                request.session_id,
+                schema_context,
+                rag_version=schema_rag_holder.version,
+                target=schema_rag_holder.active_key,
+            )
+            rendered_schema = session_context.rendered
+            if rendered_schema is None:
+                rendered_schema = await cpu_executor.run(render_schema_context, session_context.payload, stateful=True)
+                session_contexts.set_rendered(request.session_id, session_context, rendered_schema)
+        else:
+            rendered_schema = await cpu_executor.run(render_schema_context, schema_context, stateful=True)
 
         system_prompt = f"""You are a helpful assistant that generates SQL queries based on business requirements 
             and answers in business language. 
@@ -261,7 +322,7 @@ async def generate_sql_core(request: ChatRequest, *, use_schema_rag: bool | None
             9. If relevant, offer suggestions for additional queries.
 
             Relevant Schema Information:
-              {schema_context}
+              {rendered_schema}
 
             Please generate SQL queries that require no further modifications."""
     else:
@@ -285,7 +346,7 @@ async def generate_sql_core(request: ChatRequest, *, use_schema_rag: bool | None
             complexity = 0
             execution_time_estimate = "N/A"
         else:
-            complexity = estimate_query_complexity(sql_text)
+            complexity = await cpu_executor.run(estimate_query_complexity, sql_text)
             execution_time_estimate = get_query_execution_time_estimate(complexity)
         queries_with_complexity.append(
             QueryDetails(
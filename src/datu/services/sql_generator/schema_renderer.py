@@ -0,0 +1,188 @@
+"""Compact schema context renderer for SQL generation prompts.
+
+The schema context used to be interpolated into the system prompt as the ``repr`` of nested dicts, which
+repeats keys such as ``column_name`` for every column and includes every categorical value. This module
+renders it as compact DDL-like text instead::
+
+    -- postgres demo/dev
+    TABLE sales.orders
+      order_id int
+      status text -- Order status [values: new, paid, +3 more]
+
+Rendered table headers and column lines are cached per schema version, i.e. per profile, target and
+extraction timestamp. Scored schema context is fitted to a token budget; when it does not fit, tables and
+columns with the highest retrieval scores are kept. Unscored schemas, such as the full schema cache, are
+rendered whole, since there is no relevance to decide what to omit.
+"""
+
+import math
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Mapping, Tuple
+
+from pydantic import BaseModel
+
+# Rough average for identifiers and English text in GPT-style tokenizers.
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the number of LLM tokens in ``text``."""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def _line_tokens(line: str) -> int:
+    """Estimate the tokens of an output line including its line break."""
+    return estimate_tokens(line + "\n")
+
+
+class SchemaContextRenderer:
+    """Renders schema profiles as compact DDL-like text within a token budget.
+
+    Args:
+        max_values (int): Maximum number of categorical values listed per column.
+        cache_size (int): Maximum number of tables whose rendered fragments are cached.
+    """
+
+    def __init__(self, max_values: int = 10, cache_size: int = 4096):
+        self.max_values = max_values
+        self.cache_size = cache_size
+        self._fragments: OrderedDict[Hashable, Tuple[str, Dict[str, str]]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _as_dict(profile: Any) -> Mapping[str, Any]:
+        return profile.model_dump(exclude_none=True) if isinstance(profile, BaseModel) else profile
+
+    def render_column(self, column: Mapping[str, Any]) -> str:
+        """Render one column line: name, type, description and a truncated list of categorical values."""
+        line = f"  {column.get('column_name')} {column.get('data_type') or ''}".rstrip()
+        notes = []
+        if column.get("description"):
+            notes.append(str(column["description"]))
+        values = column.get("values")
+        if values:
+            shown = ", ".join(str(value) for value in values[: self.max_values])
+            more = len(values) - self.max_values
+            notes.append(f"[values: {shown}{f', +{more} more' if more > 0 else ''}]")
+        return f"{line} -- {'; '.join(notes)}" if notes else line
+
+    @staticmethod
+    def render_table_header(table: Mapping[str, Any]) -> str:
+        """Render the table header line with the schema-qualified table name."""
+        schema_name = table.get("schema_name")
+        return f"TABLE {schema_name}.{table.get('table_name')}" if schema_name else f"TABLE {table.get('table_name')}"
+
+    def _table_fragments(
+        self, version: Hashable, table: Mapping[str, Any]
+    ) -> Tuple[str, Dict[str, str], List[Tuple[str, str]]]:
+        """Return the cached header and column lines of a table, rendering only what is not cached yet."""
+        key = (version, table.get("schema_name"), table.get("table_name"))
+        with self._lock:
+            cached = self._fragments.get(key)
+            if cached is not None:
+                self._fragments.move_to_end(key)
+        if cached is None:
+            cached = (self.render_table_header(table), {})
+        header, lines = cached
+        columns = []
+        for column in table.get("columns") or []:
+            name = column.get("column_name")
+            line = lines.get(name)
+            if line is None:
+                line = lines[name] = self.render_column(column)
+            columns.append((name, line))
+        with self._lock:
+            self._fragments[key] = cached
+            self._fragments.move_to_end(key)
+            while len(self._fragments) > self.cache_size:
+                self._fragments.popitem(last=False)
+        return header, lines, columns
+
+    def render(
+        self,
+        schema_info: List[Any],
+        token_budget: int = 0,
+        table_scores: Mapping[str, float] | None = None,
+        column_scores: Mapping[str, Mapping[str, float]] | None = None,
+    ) -> str:
+        """Render schema profiles, keeping the best scored tables and columns when over the token budget.
+
+        Args:
+            schema_info: Schema profiles as SchemaGlossary objects or their dict dumps.
+            token_budget: Maximum estimated tokens of the output; 0 renders everything. Only applied
+                when ``table_scores`` are given.
+            table_scores: Retrieval score per table name; unscored tables rank last.
+            column_scores: Retrieval score per column name, per table name.
+
+        Returns:
+            str: The rendered schema context.
+        """
+        table_scores = table_scores or {}
+        column_scores = column_scores or {}
+        profiles = []
+        entries = []
+        for profile_idx, profile in enumerate(self._as_dict(p) for p in schema_info):
+            version = (profile.get("profile_name"), profile.get("output_name"), profile.get("timestamp"))
+            db_type = f"{profile['db_type']} " if profile.get("db_type") else ""
+            profiles.append(f"-- {db_type}{profile.get('profile_name')}/{profile.get('output_name')}")
+            for position, table in enumerate(profile.get("schema_info") or []):
+                header, _, columns = self._table_fragments(version, table)
+                entries.append((profile_idx, position, table.get("table_name"), header, columns))
+
+        total = sum(
+            _line_tokens(header) + sum(_line_tokens(line) for _, line in columns) for *_, header, columns in entries
+        )
+        if not table_scores or token_budget <= 0 or total + sum(_line_tokens(p) for p in profiles) <= token_budget:
+            selected = {(e[0], e[1]): e[4] for e in entries}
+        else:
+            selected = self._fit(entries, profiles, token_budget, table_scores, column_scores)
+
+        lines: List[str] = []
+        current_profile = None
+        for profile_idx, position, _, header, _columns in entries:
+            kept = selected.get((profile_idx, position))
+            if kept is None:
+                continue
+            if profile_idx != current_profile:
+                lines.append(profiles[profile_idx])
+                current_profile = profile_idx
+            lines.append(header)
+            lines.extend(line for _, line in kept)
+        omitted = len(entries) - len(selected)
+        if omitted:
+            lines.append(f"-- {omitted} less relevant tables omitted")
+        return "\n".join(lines)
+
+    @staticmethod
+    def _fit(
+        entries: List[Tuple[int, int, str, str, List[Tuple[str, str]]]],
+        profiles: List[str],
+        token_budget: int,
+        table_scores: Mapping[str, float],
+        column_scores: Mapping[str, Mapping[str, float]],
+    ) -> Dict[Tuple[int, int], List[Tuple[str, str]]]:
+        """Select tables by descending score and, for the last table that does not fit whole, its best columns."""
+        remaining = token_budget - _line_tokens("-- 0000 less relevant tables omitted")
+        used_profiles = set()
+        selected: Dict[Tuple[int, int], List[Tuple[str, str]]] = {}
+        ranked = sorted(entries, key=lambda e: -table_scores.get(e[2], float("-inf")))
+        for profile_idx, position, table_name, header, columns in ranked:
+            cost = _line_tokens(header) + (0 if profile_idx in used_profiles else _line_tokens(profiles[profile_idx]))
+            if cost > remaining:
+                continue
+            scores = column_scores.get(table_name, {})
+            order = sorted(range(len(columns)), key=lambda i: -scores.get(columns[i][0], float("-inf")))
+            kept = []
+            budget = remaining - cost
+            for i in order:
+                line_cost = _line_tokens(columns[i][1])
+                if line_cost <= budget:
+                    kept.append(i)
+                    budget -= line_cost
+            if columns and not kept:
+                continue
+            selected[(profile_idx, position)] = [columns[i] for i in sorted(kept)]
+            used_profiles.add(profile_idx)
+            remaining = budget
+        return selected
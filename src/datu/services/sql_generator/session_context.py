@@ -0,0 +1,276 @@
+"""Session-scoped schema context for multi-turn chats.
+
+Most follow-up turns of a conversation need the tables the previous turn already selected. This module keeps
+the schema context selected for each chat session: a new turn's retrieval result only contributes the tables
+and columns that are not in the context yet, appended after the existing ones so the rendered schema, and
+with it the system prompt prefix, stays stable across turns. When a turn is about different tables, the
+context is rebuilt from that turn's result alone.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Tuple
+
+
+def _table_key(profile: Dict[str, Any], table: Dict[str, Any]) -> Tuple[Any, ...]:
+    return (profile.get("profile_name"), profile.get("output_name"), table.get("table_name"))
+
+
+def merge_schema_payloads(
+    previous: Dict[str, Any], delta: Dict[str, Any], score_decay: float = 1.0
+) -> Tuple[Dict[str, Any], bool]:
+    """Append the tables and columns of ``delta`` that are not in ``previous``.
+
+    Tables and columns keep their order in ``previous``; new tables are appended to their profile and new
+    columns to their table. Scores of the previous context are multiplied by ``score_decay`` and replaced by
+    the new score where that is higher, so tables the conversation moved away from are the first to be
+    omitted when the rendered context exceeds the token budget.
+
+    Args:
+        previous: Schema RAG payload of the session so far.
+        delta: Schema RAG payload of the new turn.
+        score_decay: Factor applied to the scores of the previous context.
+
+    Returns:
+        The merged payload, and whether it contains tables or columns that were not in ``previous``.
+    """
+    profiles: Dict[Tuple[Any, ...], Dict[str, Any]] = {}
+    positions: Dict[Tuple[Any, ...], int] = {}
+    columns: Dict[Tuple[Any, ...], set] = {}
+    for profile in previous["schema_info"]:
+        merged = profiles[(profile.get("profile_name"), profile.get("output_name"))] = {
+            **profile,
+            "schema_info": list(profile.get("schema_info") or []),
+        }
+        for position, table in enumerate(merged["schema_info"]):
+            positions[_table_key(profile, table)] = position
+            columns[_table_key(profile, table)] = {column.get("column_name") for column in table.get("columns") or []}
+
+    changed = False
+    for profile in delta["schema_info"]:
+        merged = profiles.get((profile.get("profile_name"), profile.get("output_name")))
+        if merged is None:
+            profiles[(profile.get("profile_name"), profile.get("output_name"))] = profile
+            changed = True
+            continue
+        for table in profile.get("schema_info") or []:
+            key = _table_key(profile, table)
+            if key not in positions:
+                merged["schema_info"].append(table)
+                changed = True
+                continue
+            added = [column for column in table.get("columns") or [] if column.get("column_name") not in columns[key]]
+            if added:
+                existing = merged["schema_info"][positions[key]]
+                merged["schema_info"][positions[key]] = {**existing, "columns": [*existing["columns"], *added]}
+                changed = True
+
+    table_scores = {table: score * score_decay for table, score in previous["table_scores"].items()}
+    for table, score in delta["table_scores"].items():
+        table_scores[table] = max(score, table_scores.get(table, score))
+    column_scores = {
+        table: {column: score * score_decay for column, score in scores.items()}
+        for table, scores in previous["column_scores"].items()
+    }
+    for table, scores in delta["column_scores"].items():
+        merged_scores = column_scores.setdefault(table, {})
+        for column, score in scores.items():
+            merged_scores[column] = max(score, merged_scores.get(column, score))
+    payload = {"schema_info": list(profiles.values()), "table_scores": table_scores, "column_scores": column_scores}
+    return payload, changed
+
+
+def trim_schema_payload(payload: Dict[str, Any], max_tables: int) -> Tuple[Dict[str, Any], bool]:
+    """Keep the ``max_tables`` best scored tables of a payload, in their original order.
+
+    Args:
+        payload: Schema RAG payload to trim.
+        max_tables: Maximum number of tables kept; 0 keeps all of them.
+
+    Returns:
+        The trimmed payload, and whether any table was dropped.
+    """
+    scores = payload["table_scores"]
+    tables = [(profile, table) for profile in payload["schema_info"] for table in profile.get("schema_info") or []]
+    if max_tables <= 0 or len(tables) <= max_tables:
+        return payload, False
+    ranked = sorted(range(len(tables)), key=lambda i: -scores.get(tables[i][1].get("table_name"), 0.0))
+    kept = {_table_key(*tables[i]) for i in ranked[:max_tables]}
+    schema_info = []
+    for profile in payload["schema_info"]:
+        profile_tables = [table for table in profile.get("schema_info") or [] if _table_key(profile, table) in kept]
+        if profile_tables:
+            schema_info.append({**profile, "schema_info": profile_tables})
+    names = {table.get("table_name") for profile in schema_info for table in profile["schema_info"]}
+    trimmed = {
+        "schema_info": schema_info,
+        "table_scores": {table: score for table, score in scores.items() if table in names},
+        "column_scores": {table: cols for table, cols in payload["column_scores"].items() if table in names},
+    }
+    return trimmed, True
+
+
+class SessionSchemaContext:
+    """Schema context selected for one chat session.
+
+    Attributes:
+        payload (dict): Merged schema RAG payload of the session.
+        rag_version (int): Version of the schema RAG the context was retrieved from.
+        target (Hashable): Target the context was retrieved for, e.g. the (profile, output) shard key.
+        rendered (str | None): Rendered schema context of ``payload``; None until it is rendered.
+        turns (int): Number of turns merged into the context since it was last rebuilt.
+        updated_at (float): Monotonic time of the last update.
+    """
+
+    def __init__(self, payload: Dict[str, Any], rag_version: int = 0, target: Hashable = None):
+        self.payload = payload
+        self.rag_version = rag_version
+        self.target = target
+        self.rendered: str | None = None
+        self.turns = 1
+        self.updated_at = time.monotonic()
+
+
+class SessionContextStore:
+    """Thread-safe bounded store of session schema contexts with relevance-based rebuilds.
+
+    Args:
+        max_sessions (int): Maximum number of sessions kept; the least recently used are evicted.
+        ttl_seconds (float): Sessions not updated for this long are discarded; 0 keeps them until evicted.
+        min_overlap (float): Minimum fraction of a turn's top tables that must already be in the session
+            context for the turn to be merged into it; below it the context is rebuilt.
+        score_decay (float): Factor applied to the scores of the existing context on every merged turn.
+        shift_top_k (int): Number of best scored tables of a turn compared with the session context.
+        max_tables (int): Maximum number of tables kept in a session context; the lowest scored are dropped
+            first. 0 keeps all of them.
+
+    Attributes:
+        reused (int): Turns that added nothing to the context, served with the previous rendering.
+        merged (int): Turns whose new tables or columns were merged into the context.
+        rebuilt (int): Turns that started a new context, including the first turn of a session.
+    """
+
+    def __init__(
+        self,
+        max_sessions: int = 1024,
+        ttl_seconds: float = 3600,
+        min_overlap: float = 0.5,
+        score_decay: float = 0.8,
+        shift_top_k: int = 3,
+        max_tables: int = 50,
+    ):
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self.min_overlap = min_overlap
+        self.score_decay = score_decay
+        self.shift_top_k = shift_top_k
+        self.max_tables = max_tables
+        self.reused = 0
+        self.merged = 0
+        self.rebuilt = 0
+        self._sessions: OrderedDict[str, SessionSchemaContext] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def get(self, session_id: str) -> SessionSchemaContext | None:
+        """Return the context of a session, or None if it is unknown or expired."""
+        with self._lock:
+            return self._get(session_id)
+
+    def _get(self, session_id: str) -> SessionSchemaContext | None:
+        """Return the live context of a session; callers hold ``_lock``."""
+        context = self._sessions.get(session_id)
+        if context is None:
+            return None
+        if self.ttl_seconds > 0 and time.monotonic() - context.updated_at > self.ttl_seconds:
+            del self._sessions[session_id]
+            return None
+        self._sessions.move_to_end(session_id)
+        return context
+
+    def relevance_shifted(self, context: SessionSchemaContext, payload: Dict[str, Any]) -> bool:
+        """Whether too few of the best scored tables of ``payload`` are in the session context."""
+        scores = payload["table_scores"]
+        top = sorted(scores, key=lambda table: -scores[table])[: self.shift_top_k]
+        if not top:
+            return False
+        known = sum(table in context.payload["table_scores"] for table in top)
+        return known / len(top) < self.min_overlap
+
+    def update(
+        self, session_id: str, payload: Dict[str, Any], rag_version: int = 0, target: Hashable = None
+    ) -> SessionSchemaContext:
+        """Merge a turn's retrieval payload into the session context, or rebuild the context from it.
+
+        The context is rebuilt when the relevance shifted or when the schema RAG version or the target
+        changed since the previous turn. The returned context keeps the ``rendered`` text of the previous
+        turn when the turn added nothing to it; otherwise ``rendered`` is None and the caller renders
+        ``payload`` and stores the result with :meth:`set_rendered`. The previous context is replaced, never modified.
+
+        Args:
+            session_id: Identifier of the chat session.
+            payload: Schema RAG payload of the new turn.
+            rag_version: Version of the schema RAG the payload was retrieved from.
+            target: Target the payload was retrieved for.
+
+        Returns:
+            SessionSchemaContext: The context to use for the turn.
+        """
+        with self._lock:
+            previous = self._get(session_id)
+            if (
+                previous is None
+                or previous.rag_version != rag_version
+                or previous.target != target
+                or self.relevance_shifted(previous, payload)
+            ):
+                context = SessionSchemaContext(trim_schema_payload(payload, self.max_tables)[0], rag_version, target)
+                self.rebuilt += 1
+            else:
+                merged, changed = merge_schema_payloads(previous.payload, payload, self.score_decay)
+                merged, trimmed = trim_schema_payload(merged, self.max_tables)
+                context = SessionSchemaContext(merged, rag_version, target)
+                context.turns = previous.turns + 1
+                if changed or trimmed:
+                    self.merged += 1
+                else:
+                    context.payload = {**merged, "schema_info": previous.payload["schema_info"]}
+                    context.rendered = previous.rendered
+                    self.reused += 1
+            self._sessions[session_id] = context
+            self._sessions.move_to_end(session_id)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+        return context
+
+    def set_rendered(self, session_id: str, context: SessionSchemaContext, rendered: str) -> bool:
+        """Store the rendering of ``context`` if it is still the context of the session.
+
+        The rendering is discarded when a concurrent turn replaced the context while it was rendered.
+
+        Returns:
+            bool: Whether the rendering was stored.
+        """
+        with self._lock:
+            if self._sessions.get(session_id) is not context:
+                return False
+            context.rendered = rendered
+            return True
+
+    def drop(self, session_id: str) -> None:
+        """Forget the context of a session."""
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def stats(self) -> Dict[str, int]:
+        """Return the number of sessions and the reused, merged and rebuilt turn counters."""
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "reused": self.reused,
+                "merged": self.merged,
+                "rebuilt": self.rebuilt,
+            }
@@ -0,0 +1,148 @@
+"""Table card index for coarse-to-fine schema retrieval.
+
+Schema triples are numerous and individually weak: ``amount has data type numeric`` says little about which
+table a question is about. This module summarizes every table as one "card" text, with its name, table-level
+attributes and key columns first, so a query can be matched against one vector per table. Only the triples
+of the best matching tables are then scored, which cuts the vectors searched per query from the number of
+triples to the number of tables plus a few tables' worth of triples.
+"""
+
+import os
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from datu.services.lexical_index import BM25Index
+from datu.services.schema_graph import is_key_column
+
+
+def assign_triple_tables(triples: Sequence[Tuple[str, str, Any]]) -> Tuple[List[str], np.ndarray]:
+    """Return the table names and, for each triple, the index of the table it describes.
+
+    Triples are extracted table by table: first the triples of the table itself, then for every column a
+    ``has_column`` triple followed by the triples of that column. Column triples have the bare column name
+    as subject, so they are attributed to the table whose ``has_column`` triples precede them.
+
+    Args:
+        triples: Schema triples in extraction order.
+
+    Returns:
+        The table names in order of first appearance and an int32 array of table indices aligned with
+        ``triples``.
+    """
+    table_ids: Dict[str, int] = {}
+    owners = np.empty(len(triples), dtype=np.int32)
+    current: str | None = None
+    columns: set = set()
+    for row, (subj, pred, obj) in enumerate(triples):
+        if pred == "has_column":
+            if subj != current:
+                current, columns = subj, set()
+            columns.add(obj)
+        elif subj != current and subj not in columns:
+            current, columns = subj, set()
+        owners[row] = table_ids.setdefault(current, len(table_ids))  # type: ignore[arg-type]
+    return list(table_ids), owners
+
+
+def card_text(table_name: str, triples: Sequence[Tuple[str, str, Any]], max_columns: int = 30) -> str:
+    """Summarize a table as one text: its name, table attributes, and column names with key columns first.
+
+    Args:
+        table_name: Name of the table.
+        triples: The triples of the table, as attributed by :func:`assign_triple_tables`.
+        max_columns: Maximum number of column names listed.
+
+    Returns:
+        str: The card text, for example ``orders table, schema name sales. Columns: order_id, amount``.
+    """
+    attributes = [
+        f"{pred.removeprefix('has_').replace('_', ' ')} {obj}"
+        for subj, pred, obj in triples
+        if subj == table_name and pred != "has_column"
+    ]
+    columns = [str(obj) for subj, pred, obj in triples if subj == table_name and pred == "has_column"]
+    columns.sort(key=lambda column: not is_key_column(column))
+    listed = ", ".join(columns[:max_columns])
+    if len(columns) > max_columns:
+        listed += f" and {len(columns) - max_columns} more"
+    header = ", ".join([f"{table_name} table", *attributes])
+    return f"{header}. Columns: {listed}" if columns else header
+
+
+class TableCardIndex:
+    """One normalized embedding per table card, with the triple rows owned by each table.
+
+    Args:
+        table_names (list[str]): Table name of each card.
+        owners (np.ndarray): Table index of each triple row.
+        texts (list[str]): Card text of each table.
+        embeddings (np.ndarray): Normalized float32 card embeddings, one row per table.
+        lexical (bool): Also build a BM25 index over the card texts, for hybrid table selection.
+
+    Attributes:
+        indptr (np.ndarray): Offsets into ``rows`` of the triple rows of each table.
+        rows (np.ndarray): Triple row ids grouped by table, ascending within a table.
+        lexical_index (BM25Index | None): Inverted index over the card texts.
+    """
+
+    def __init__(
+        self,
+        table_names: List[str],
+        owners: np.ndarray,
+        texts: List[str],
+        embeddings: np.ndarray,
+        lexical: bool = False,
+    ):
+        self.table_names = table_names
+        self.texts = texts
+        self.embeddings = embeddings
+        self.rows = np.argsort(owners, kind="stable").astype(np.int64)
+        self.indptr = np.zeros(len(table_names) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(owners, minlength=len(table_names)), out=self.indptr[1:])
+        self.lexical_index = BM25Index(texts) if lexical else None
+
+    def __len__(self) -> int:
+        return len(self.table_names)
+
+    def top_tables(self, query_vec: np.ndarray, query: str, k: int, lexical_weight: float = 0.0) -> np.ndarray:
+        """Return the indices of the ``k`` best matching tables, best first.
+
+        Cards are scored by cosine similarity, plus ``lexical_weight`` times the normalized BM25 score of
+        the query against the card texts when the lexical index is built.
+        """
+        sims = self.embeddings @ query_vec
+        if self.lexical_index is not None and lexical_weight:
+            ids, scores = self.lexical_index.search(query)
+            sims[ids] += lexical_weight * scores
+        k = min(k, len(sims))
+        top = np.argpartition(-sims, k - 1)[:k] if k < len(sims) else np.arange(len(sims))
+        return top[np.argsort(-sims[top], kind="stable")]
+
+    def table_rows(self, tables: np.ndarray) -> np.ndarray:
+        """Return the sorted triple row ids owned by ``tables``."""
+        if not len(tables):
+            return np.empty(0, dtype=np.int64)
+        return np.sort(np.concatenate([self.rows[self.indptr[t] : self.indptr[t + 1]] for t in tables.tolist()]))
+
+    @staticmethod
+    def save_embeddings(path: str, model_name: str, hashes: List[str], embeddings: np.ndarray) -> None:
+        """Persist card embeddings with their text hashes and model, replacing any previous file atomically."""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(f, model=np.array(model_name), hashes=np.array(hashes), embeddings=embeddings)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def load_embeddings(path: str, model_name: str) -> Dict[str, np.ndarray]:
+        """Load the card embeddings saved with :meth:`save_embeddings` as a map of text hash to vector.
+
+        Returns an empty map when the file is missing or was built with another model.
+        """
+        if not os.path.exists(path):
+            return {}
+        with np.load(path) as data:
+            if str(data["model"]) != model_name:
+                return {}
+            return dict(zip(data["hashes"].tolist(), data["embeddings"], strict=True))
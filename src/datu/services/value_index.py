@@ -0,0 +1,126 @@
+"""Categorical value index for resolving entity mentions to filter columns.
+
+Schema extraction stores the distinct values of low-cardinality columns, but in the triple store they only
+appear as one stringified tuple per column, which embeds poorly. This module indexes every value on its own:
+an exact map from the normalized value to the (table, column) pairs holding it, and a character trigram index
+for misspelled or inflected mentions ("Laptops" for "Laptop"). A query is matched phrase by phrase with
+dictionary lookups, so resolving "Finland" to ``customers.country`` costs microseconds.
+"""
+
+import re
+import unicodedata
+from collections import Counter, defaultdict
+from typing import Any, Dict, Iterable, List, Set, Tuple
+
+from datu.schema_extractor.schema_cache import SchemaGlossary
+
+_WORD = re.compile(r"\w+")
+# Values that occur in almost any boolean or flag column and would match ordinary words of a question.
+_GENERIC_VALUES = {"true", "false", "yes", "no", "none", "null", "nan", "n a", "unknown", "other"}
+
+ValueMatch = Tuple[str, str, str, float]
+
+
+def normalize_value(value: Any) -> str:
+    """Lowercase a value, strip accents and reduce it to its words, so "  Île-de-France" matches "ile de france"."""
+    text = unicodedata.normalize("NFKD", str(value))
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    return " ".join(_WORD.findall(text.lower()))
+
+
+def _trigrams(text: str) -> Set[str]:
+    padded = f" {text} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+class CategoricalValueIndex:
+    """Exact and trigram index from categorical values to the columns holding them.
+
+    Args:
+        entries (Iterable[tuple[str, str, Any]]): (table name, column name, value) for every categorical value.
+        max_phrase_words (int): Longest value, in words, matched as one phrase of the query.
+
+    Attributes:
+        exact (dict): Normalized value -> list of (table, column, original value).
+        trigram_postings (dict): Trigram -> ids of the normalized values containing it.
+    """
+
+    def __init__(self, entries: Iterable[Tuple[str, str, Any]], max_phrase_words: int = 4):
+        self.exact: Dict[str, List[Tuple[str, str, str]]] = defaultdict(list)
+        for table, column, value in entries:
+            normalized = normalize_value(value)
+            if len(normalized) < 3 or normalized in _GENERIC_VALUES or not any(c.isalpha() for c in normalized):
+                continue
+            self.exact[normalized].append((table, column, str(value)))
+        self.exact = dict(self.exact)
+        self.values = list(self.exact)
+        self.value_trigrams = [len(_trigrams(value)) for value in self.values]
+        self.trigram_postings: Dict[str, List[int]] = defaultdict(list)
+        for value_id, value in enumerate(self.values):
+            for gram in _trigrams(value):
+                self.trigram_postings[gram].append(value_id)
+        self.max_phrase_words = min(max_phrase_words, max((len(value.split()) for value in self.values), default=1))
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    @classmethod
+    def from_profiles(cls, schema_profiles: Iterable[SchemaGlossary]) -> "CategoricalValueIndex":
+        """Index the values of every column that has them, in every table of the profiles."""
+        return cls(
+            (table.table_name, column.column_name, value)
+            for profile in schema_profiles
+            for table in profile.schema_info
+            for column in table.columns or []
+            for value in column.values or []
+        )
+
+    def fuzzy_lookup(self, phrase: str, threshold: float) -> List[Tuple[str, float]]:
+        """Return the indexed values whose trigram Dice similarity with ``phrase`` is at least ``threshold``."""
+        grams = _trigrams(phrase)
+        shared = Counter(value_id for gram in grams for value_id in self.trigram_postings.get(gram, ()))
+        matches = []
+        for value_id, count in shared.items():
+            score = 2.0 * count / (len(grams) + self.value_trigrams[value_id])
+            if score >= threshold:
+                matches.append((self.values[value_id], score))
+        return matches
+
+    def match(self, query: str, fuzzy_threshold: float = 0.75, limit: int = 10) -> List[ValueMatch]:
+        """Resolve value mentions in a query to (table, column, value, score) tuples.
+
+        Every phrase of one to ``max_phrase_words`` consecutive words is looked up exactly, with score 1.0.
+        Phrases of at least four characters without an exact match are looked up by trigram similarity,
+        scored by their Dice coefficient. Words already covered by an exact match are not matched again.
+
+        Args:
+            query: Natural language query.
+            fuzzy_threshold: Minimum trigram Dice similarity of a fuzzy match; 1.0 or more disables them.
+            limit: Maximum number of matches returned, best first.
+
+        Returns:
+            list[tuple[str, str, str, float]]: The matched table, column, original value and score.
+        """
+        if not self.values:
+            return []
+        words = [normalize_value(word) for word in _WORD.findall(query)]
+        best: Dict[Tuple[str, str, str], float] = {}
+        covered: Set[int] = set()
+        for size in range(self.max_phrase_words, 0, -1):
+            for start in range(len(words) - size + 1):
+                span = set(range(start, start + size))
+                if span & covered:
+                    continue
+                phrase = " ".join(words[start : start + size])
+                if phrase in self.exact:
+                    matches = [(phrase, 1.0)]
+                    covered |= span
+                elif len(phrase) >= 4 and fuzzy_threshold < 1.0:
+                    matches = self.fuzzy_lookup(phrase, fuzzy_threshold)
+                else:
+                    continue
+                for value, score in matches:
+                    for key in self.exact[value]:
+                        best[key] = max(score, best.get(key, score))
+        ranked = sorted(best.items(), key=lambda item: -item[1])[:limit]
+        return [(table, column, value, score) for (table, column, value), score in ranked]
@@ -76,6 +76,11 @@ def test_fetch_schema(mock_connector):
     assert schema_info[0].columns[0].column_name == "id"
 
 
+def test_iter_schema_defaults_to_fetch_schema(mock_connector):
+    """Test the default iter_schema yields the tables returned by fetch_schema."""
+    assert list(mock_connector.iter_schema("public")) == mock_connector.fetch_schema("public")
+
+
 def test_run_transformation(mock_connector):
     """Test the run_transformation method of the mock connector."""
     result = mock_connector.run_transformation("SELECT * FROM test_table")
@@ -0,0 +1,180 @@
+"""Schema RAG scaling benchmark.
+
+Builds the schema RAG for synthetic schemas of increasing size and reports, for each retrieval mode:
+triple extraction, embedding build, remaining index build and cold load times, ``run_query`` latency
+percentiles, peak traced memory of a cold load, and table/column recall@k on labelled questions.
+
+The hashing embedding backend is used by default, so the benchmark runs offline. Run it directly::
+
+    PYTHONPATH=src python -m tests.benchmarks.schema_rag_benchmark --tables 100 1000 10000
+
+or through pytest with ``--run-benchmarks`` (sizes from ``DATU_BENCHMARK_TABLES``).
+"""
+
+import argparse
+import contextlib
+import json
+import resource
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Dict, Iterator, List
+
+import numpy as np
+
+from datu.services import schema_rag
+from datu.services.schema_rag import SchemaRAG, SchemaTripleExtractor, SchemaVectorizer
+
+from tests.benchmarks.synthetic_schema import LabelledQuestion, generate_questions, generate_schema
+
+RETRIEVAL_MODES: Dict[str, Dict[str, Any]] = {
+    "vector": {"rag_retrieval_mode": "vector"},
+    "hybrid": {"rag_retrieval_mode": "hybrid"},
+    "hybrid_ivf_int8": {"rag_retrieval_mode": "hybrid", "rag_index_type": "ivf", "rag_embedding_quantization": "int8"},
+    "hybrid_table_cards": {"rag_retrieval_mode": "hybrid", "rag_search_granularity": "table"},
+}
+BASE_SETTINGS: Dict[str, Any] = {
+    "rag_embedding_backend": "hashing",
+    "rag_debugging": False,
+    "rag_result_cache_size": 0,
+}
+RECALL_KS = (1, 5, 10)
+
+
+@contextlib.contextmanager
+def rag_settings(**values: Any) -> Iterator[None]:
+    """Temporarily override schema RAG settings."""
+    previous = {name: getattr(schema_rag.config, name) for name in values}
+    try:
+        for name, value in values.items():
+            setattr(schema_rag.config, name, value)
+        yield
+    finally:
+        for name, value in previous.items():
+            setattr(schema_rag.config, name, value)
+
+
+def _timed(func, *args, **kwargs) -> tuple[Any, float]:
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def recall_at_k(payloads: List[Dict[str, Any]], questions: List[LabelledQuestion]) -> Dict[str, float]:
+    """Compute table and column recall@k, ranking tables by their retrieval score.
+
+    Column recall@k counts a question as answered when its table is in the top k and its column was
+    retrieved for that table.
+    """
+    hits = {f"table@{k}": 0 for k in RECALL_KS} | {f"column@{k}": 0 for k in RECALL_KS}
+    for payload, question in zip(payloads, questions, strict=True):
+        table_scores = payload["table_scores"]
+        ranked = sorted(table_scores, key=lambda table: -table_scores[table])
+        column_found = question.column_name in payload["column_scores"].get(question.table_name, {})
+        for k in RECALL_KS:
+            if question.table_name in ranked[:k]:
+                hits[f"table@{k}"] += 1
+                hits[f"column@{k}"] += column_found
+    return {name: count / len(questions) for name, count in hits.items()}
+
+
+def benchmark_mode(schema, questions: List[LabelledQuestion], mode: str, rag_dir: str) -> Dict[str, Any]:
+    """Build, load and query the schema RAG in one retrieval mode and return the measurements."""
+    with rag_settings(rag_dir=rag_dir, **BASE_SETTINGS, **RETRIEVAL_MODES[mode]):
+        extractor = SchemaTripleExtractor(schema, rag_dir=rag_dir)
+        _, extract_s = _timed(extractor.create_schema_triples)
+        vectorizer = SchemaVectorizer(extractor.triples, rag_dir=rag_dir)
+        _, embed_s = _timed(vectorizer.initialize_embeddings, force_rebuild=True)
+        _, index_build_s = _timed(SchemaRAG, schema, rag_dir=rag_dir)
+        rag, cold_load_s = _timed(SchemaRAG, schema, rag_dir=rag_dir)
+
+        tracemalloc.start()
+        SchemaRAG(schema, rag_dir=rag_dir)
+        _, cold_load_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        payloads = []
+        latencies = []
+        for question in questions:
+            payload, elapsed = _timed(rag.run_query, [question.question])
+            payloads.append(payload)
+            latencies.append(elapsed * 1000)
+
+    return {
+        "mode": mode,
+        "triples": len(extractor.triples),
+        "extract_s": extract_s,
+        "embed_s": embed_s,
+        "index_build_s": index_build_s,
+        "cold_load_s": cold_load_s,
+        "cold_load_peak_mb": cold_load_peak / 2**20,
+        "query_p50_ms": float(np.percentile(latencies, 50)),
+        "query_p95_ms": float(np.percentile(latencies, 95)),
+        "query_p99_ms": float(np.percentile(latencies, 99)),
+        **recall_at_k(payloads, questions),
+    }
+
+
+def run_benchmark(
+    table_counts: List[int],
+    modes: List[str] | None = None,
+    columns_per_table: int = 12,
+    question_count: int = 100,
+    seed: int = 0,
+) -> List[Dict[str, Any]]:
+    """Run :func:`benchmark_mode` for every schema size and retrieval mode.
+
+    Args:
+        table_counts: Numbers of tables of the generated schemas.
+        modes: Names of :data:`RETRIEVAL_MODES` to run; None runs all of them.
+        columns_per_table: Columns per generated table.
+        question_count: Number of labelled questions per schema size.
+        seed: Random seed of the schema and question generators.
+
+    Returns:
+        list[dict]: One result row per schema size and mode, including ``tables`` and ``max_rss_mb``.
+    """
+    results = []
+    for tables in table_counts:
+        schema = generate_schema(tables=tables, columns_per_table=columns_per_table, seed=seed)
+        questions = generate_questions(schema, count=question_count, seed=seed)
+        for mode in modes or list(RETRIEVAL_MODES):
+            with tempfile.TemporaryDirectory(prefix="datu-rag-bench-") as rag_dir:
+                result = benchmark_mode(schema, questions, mode, rag_dir)
+            result["tables"] = tables
+            result["max_rss_mb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+            results.append(result)
+    return results
+
+
+def format_results(results: List[Dict[str, Any]]) -> str:
+    """Format benchmark results as a fixed-width text table."""
+    columns = ["tables", "mode", "triples", "extract_s", "embed_s", "index_build_s", "cold_load_s"]
+    columns += ["cold_load_peak_mb", "query_p50_ms", "query_p95_ms", "query_p99_ms", "max_rss_mb"]
+    columns += [f"table@{k}" for k in RECALL_KS] + [f"column@{k}" for k in RECALL_KS]
+    cells = [[f"{row[c]:.3f}" if isinstance(row[c], float) else str(row[c]) for c in columns] for row in results]
+    widths = [max(len(c), *(len(r[i]) for r in cells)) for i, c in enumerate(columns)]
+    lines = ["  ".join(c.rjust(w) for c, w in zip(columns, widths, strict=True))]
+    lines += ["  ".join(v.rjust(w) for v, w in zip(row, widths, strict=True)) for row in cells]
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tables", type=int, nargs="+", default=[100, 1000], help="Schema sizes in tables.")
+    parser.add_argument("--modes", nargs="+", choices=list(RETRIEVAL_MODES), help="Retrieval modes to run.")
+    parser.add_argument("--columns", type=int, default=12, help="Columns per table.")
+    parser.add_argument("--questions", type=int, default=100, help="Labelled questions per schema size.")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed.")
+    parser.add_argument("--json", help="Also write the results to this JSON file.")
+    args = parser.parse_args()
+
+    results = run_benchmark(args.tables, args.modes, args.columns, args.questions, args.seed)
+    print(format_results(results))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""Synthetic schemas and labelled questions for schema RAG benchmarks."""
+
+import random
+from typing import List
+
+from pydantic import BaseModel
+
+from datu.base.base_connector import SchemaInfo, TableInfo
+from datu.schema_extractor.schema_cache import SchemaGlossary
+
+DOMAINS = ["sales", "finance", "hr", "inventory", "marketing", "support", "logistics", "billing"]
+ENTITIES = [
+    "order",
+    "customer",
+    "invoice",
+    "payment",
+    "shipment",
+    "product",
+    "employee",
+    "ticket",
+    "campaign",
+    "supplier",
+    "warehouse",
+    "contract",
+]
+QUALIFIERS = ["daily", "history", "summary", "detail", "staging", "archive", "snapshot", "line"]
+ATTRIBUTES = [
+    "amount",
+    "status",
+    "created_date",
+    "region",
+    "category",
+    "quantity",
+    "unit_price",
+    "discount",
+    "channel",
+    "priority",
+    "rating",
+    "currency",
+    "country",
+    "due_date",
+    "owner",
+    "segment",
+]
+SHARED_COLUMNS = [("id", "int"), ("created_at", "timestamp"), ("updated_at", "timestamp")]
+DATA_TYPES = ["int", "numeric", "text", "date", "varchar", "boolean"]
+QUESTION_TEMPLATES = [
+    "What is the {column} of each {table}?",
+    "Show the {column} for {table} records",
+    "List {table} grouped by {column}",
+    "Total {column} per {table}",
+]
+
+
+class LabelledQuestion(BaseModel):
+    """A benchmark question and the table and column that answer it."""
+
+    question: str
+    table_name: str
+    column_name: str
+
+
+def _words(identifier: str) -> str:
+    return identifier.replace("_", " ")
+
+
+def generate_schema(
+    tables: int = 100,
+    columns_per_table: int = 12,
+    categorical_ratio: float = 0.2,
+    values_per_column: int = 8,
+    seed: int = 0,
+) -> List[SchemaGlossary]:
+    """Generate a single-profile schema with realistic naming overlap between tables.
+
+    Every table has the shared ``id``/``created_at``/``updated_at`` columns plus entity-prefixed attribute
+    columns, so similar tables compete for the same query terms.
+
+    Args:
+        tables: Number of tables; table names stay unique up to any size.
+        columns_per_table: Number of columns per table, including the shared ones.
+        categorical_ratio: Fraction of attribute columns that are categorical with sample values.
+        values_per_column: Number of distinct values of each categorical column.
+        seed: Random seed; the same arguments always produce the same schema.
+
+    Returns:
+        list[SchemaGlossary]: The generated schema profile.
+    """
+    rng = random.Random(seed)
+    schema_info = []
+    for t in range(tables):
+        domain = DOMAINS[t % len(DOMAINS)]
+        entity = ENTITIES[(t // len(DOMAINS)) % len(ENTITIES)]
+        qualifier = QUALIFIERS[(t // (len(DOMAINS) * len(ENTITIES))) % len(QUALIFIERS)]
+        table_name = f"{entity}_{qualifier}_{t}"
+        columns = [TableInfo(column_name=name, data_type=data_type) for name, data_type in SHARED_COLUMNS]
+        attributes = rng.sample(ATTRIBUTES, k=min(len(ATTRIBUTES), max(0, columns_per_table - len(columns))))
+        for attribute in attributes:
+            column_name = f"{entity}_{attribute}"
+            if rng.random() < categorical_ratio:
+                values = [f"{attribute}_{v}" for v in range(values_per_column)]
+                columns.append(TableInfo(column_name=column_name, data_type="text", categorical=True, values=values))
+            else:
+                columns.append(TableInfo(column_name=column_name, data_type=rng.choice(DATA_TYPES)))
+        schema_info.append(SchemaInfo(table_name=table_name, schema_name=domain, columns=columns))
+    return [
+        SchemaGlossary(
+            profile_name="benchmark",
+            output_name="dev",
+            db_type="postgres",
+            timestamp=float(seed),
+            schema_info=schema_info,
+        )
+    ]
+
+
+def generate_questions(schema: List[SchemaGlossary], count: int = 100, seed: int = 0) -> List[LabelledQuestion]:
+    """Generate questions that each name one table and one of its attribute columns.
+
+    Args:
+        schema: Schema produced by :func:`generate_schema`.
+        count: Number of questions.
+        seed: Random seed.
+
+    Returns:
+        list[LabelledQuestion]: Questions with the expected table and column.
+    """
+    rng = random.Random(seed)
+    tables = [table for profile in schema for table in profile.schema_info]
+    questions = []
+    for _ in range(count):
+        table = rng.choice(tables)
+        column = rng.choice(table.columns[len(SHARED_COLUMNS) :] or table.columns)
+        template = rng.choice(QUESTION_TEMPLATES)
+        questions.append(
+            LabelledQuestion(
+                question=template.format(column=_words(column.column_name), table=_words(table.table_name)),
+                table_name=table.table_name,
+                column_name=column.column_name,
+            )
+        )
+    return questions
@@ -0,0 +1,36 @@
+"""Schema RAG scaling benchmark and tests for its synthetic schema generator."""
+
+import os
+
+import pytest
+
+from tests.benchmarks.schema_rag_benchmark import RETRIEVAL_MODES, format_results, run_benchmark
+from tests.benchmarks.synthetic_schema import generate_questions, generate_schema
+
+
+def test_synthetic_schema_is_deterministic_and_labelled():
+    """Test the generator is reproducible and every question names an existing table and column."""
+    schema = generate_schema(tables=50, columns_per_table=8, seed=3)
+    assert schema == generate_schema(tables=50, columns_per_table=8, seed=3)
+
+    tables = {table.table_name: table for table in schema[0].schema_info}
+    assert len(tables) == 50
+    assert all(len(table.columns) == 8 for table in tables.values())
+
+    for question in generate_questions(schema, count=20, seed=3):
+        assert question.column_name in {column.column_name for column in tables[question.table_name].columns}
+
+
+@pytest.mark.benchmark
+def test_schema_rag_benchmark():
+    """Benchmark schema RAG build, load, latency and recall for each retrieval mode.
+
+    Schema sizes come from ``DATU_BENCHMARK_TABLES``, a comma-separated list of table counts.
+    """
+    table_counts = [int(count) for count in os.environ.get("DATU_BENCHMARK_TABLES", "100,1000").split(",")]
+    results = run_benchmark(table_counts, question_count=50)
+    print("\n" + format_results(results))
+
+    assert len(results) == len(table_counts) * len(RETRIEVAL_MODES)
+    for result in results:
+        assert result["table@10"] >= 0.8
@@ -8,6 +8,20 @@ from fastapi.testclient import TestClient
 from responses import RequestsMock
 
 
+def pytest_addoption(parser: pytest.Parser):
+    parser.addoption("--run-benchmarks", action="store_true", default=False, help="Run tests marked as benchmark.")
+
+
+def pytest_collection_modifyitems(config: pytest.Config, items: list[pytest.Item]):
+    """Skip benchmark tests unless --run-benchmarks is given."""
+    if config.getoption("--run-benchmarks"):
+        return
+    skip_benchmark = pytest.mark.skip(reason="Benchmarks only run with --run-benchmarks.")
+    for item in items:
+        if "benchmark" in item.keywords:
+            item.add_marker(skip_benchmark)
+
+
 @pytest.fixture(name="datu_environment", autouse=True, scope="session")
 def load_environment(request: pytest.FixtureRequest):
     """Fixture to load environment variables from .env.test file for testing.
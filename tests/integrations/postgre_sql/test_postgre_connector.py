@@ -49,6 +49,30 @@ def test_fetch_schema(mock_connect, connector):
     assert schema_info[1].table_name == "table2"
 
 
+@patch("psycopg2.connect")
+def test_iter_schema_pages_tables_and_ends_transaction_before_yielding(mock_connect, connector):
+    """Test iter_schema reads one page of tables at a time and ends the read transaction before yielding it."""
+    mock_conn = MagicMock()
+    mock_cursor = mock_conn.cursor.return_value.__enter__.return_value
+    mock_connect.return_value = mock_conn
+    mock_cursor.fetchall.side_effect = [
+        [("table1",), ("table2",)],
+        [("table1", "col1", "text"), ("table1", "col2", "integer"), ("table2", "col1", "boolean")],
+        [("table3",)],
+        [("table3", "col1", "date")],
+    ]
+
+    tables = connector.iter_schema("public", batch_size=2)
+    first = next(tables)
+    mock_conn.rollback.assert_called_once()
+    assert mock_cursor.fetchall.call_count == 2
+    assert first.table_name == "table1"
+    assert [column.column_name for column in first.columns] == ["col1", "col2"]
+    assert [table.table_name for table in tables] == ["table2", "table3"]
+    assert mock_cursor.execute.call_args_list[2].args[1] == ("public", "table2", 2)
+    mock_conn.close.assert_called_once()
+
+
 @patch("psycopg2.connect")
 def test_run_transformation_success(mock_connect, connector):
     """Test successful execution of a transformation in PostgreSQL database."""
@@ -66,3 +66,13 @@ def test_get_schema_not_found(client: TestClient) -> None:
 
     assert response.status_code == 404
     assert response.json() == {"detail": "Schema not found"}
+
+
+def test_schema_rag_status_reports_executor_metrics() -> None:
+    """Test the /schema-rag status includes the CPU-bound executor metrics."""
+    from datu.routers import metadata
+
+    status = metadata.get_schema_rag_status()
+
+    assert "version" in status
+    assert {"kind", "running", "queue_depth", "max_queue_depth"} <= set(status["executor"])
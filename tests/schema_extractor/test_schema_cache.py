@@ -6,7 +6,7 @@ import pytest
 
 from datu import app_config as config
 from datu.base.base_connector import SchemaInfo, TableInfo
-from datu.schema_extractor.schema_cache import SchemaExtractor, load_schema_cache
+from datu.schema_extractor.schema_cache import SchemaExtractor, SchemaGlossary, load_schema_cache, write_schema_cache
 
 
 @patch("datu.factory.db_connector.DBConnectorFactory.get_connector")
@@ -27,13 +27,15 @@ def test_categorical_detection_disabled(mock_get_connector):
         {"status": "active"},
         {"status": "inactive"},
     ]
-    mock_connector.fetch_schema.return_value = [
-        SchemaInfo(
-            table_name="test_table",
-            schema_name="public",
-            columns=[TableInfo(column_name="status", data_type="varchar", description=None)],
-        )
-    ]
+    mock_connector.iter_schema.return_value = iter(
+        [
+            SchemaInfo(
+                table_name="test_table",
+                schema_name="public",
+                columns=[TableInfo(column_name="status", data_type="varchar", description=None)],
+            )
+        ]
+    )
 
     mock_get_connector.return_value = mock_connector
     schemas = SchemaExtractor.extract_all_schemas()
@@ -64,13 +66,15 @@ def test_categorical_detection_logic(mock_get_connector):
     ]
 
     # Schema with one table and one column
-    mock_connector.fetch_schema.return_value = [
-        SchemaInfo(
-            table_name="test_table",
-            schema_name="public",
-            columns=[TableInfo(column_name="status", data_type="varchar", description=None)],
-        )
-    ]
+    mock_connector.iter_schema.return_value = iter(
+        [
+            SchemaInfo(
+                table_name="test_table",
+                schema_name="public",
+                columns=[TableInfo(column_name="status", data_type="varchar", description=None)],
+            )
+        ]
+    )
 
     mock_get_connector.return_value = mock_connector
     schemas = SchemaExtractor.extract_all_schemas()
@@ -117,7 +121,7 @@ def test_load_schema_cache_old_timestamp_triggers_refresh(cache_file, monkeypatc
     monkeypatch.setattr(config.settings, "schema_refresh_threshold_days", 0)
 
     with patch(
-        "datu.schema_extractor.schema_cache.SchemaExtractor.extract_all_schemas", return_value=[]
+        "datu.schema_extractor.schema_cache.SchemaExtractor.iter_all_schemas", return_value=iter([])
     ) as mock_extract:
         load_schema_cache()
         assert mock_extract.called
@@ -129,3 +133,68 @@ def test_load_schema_cache_legacy_list_format(cache_file, monkeypatch):
 
     result = load_schema_cache()
     assert result == legacy_list
+
+
+def test_write_schema_cache_streams_valid_json(cache_file, monkeypatch):
+    """Test the incrementally written cache holds every profile and table and is read back as fresh."""
+    profiles = [
+        SchemaGlossary(
+            profile_name=f"demo{p}",
+            output_name="dev",
+            db_type="postgres",
+            schema_info=[
+                SchemaInfo(
+                    table_name=f"table{t}",
+                    schema_name="public",
+                    columns=[TableInfo(column_name="status", data_type="varchar", categorical=True, values=["a"])],
+                )
+                for t in range(3)
+            ],
+        )
+        for p in range(2)
+    ]
+    monkeypatch.setattr(config.settings, "schema_refresh_threshold_days", 999)
+
+    write_schema_cache(str(cache_file), iter(profiles))
+
+    result = load_schema_cache()
+    assert result == [profile.model_dump(exclude_none=True) for profile in profiles]
+    assert not cache_file.with_name(cache_file.name + ".tmp").exists()
+
+
+def test_load_schema_cache_streams_extracted_tables_into_cache(cache_file, monkeypatch):
+    """Test a refresh writes each table to the cache as it is extracted instead of collecting the schema first."""
+    written = []
+
+    def tables():
+        for t in range(3):
+            written.append(cache_file.with_name(cache_file.name + ".tmp").exists())
+            yield SchemaInfo(table_name=f"table{t}", schema_name="public", columns=[])
+
+    header = {"timestamp": 1.0, "profile_name": 'demo "quoted"', "output_name": "dev", "db_type": "postgres"}
+    monkeypatch.setattr(config.settings, "schema_refresh_threshold_days", 0)
+    with patch(
+        "datu.schema_extractor.schema_cache.SchemaExtractor.iter_all_schemas", return_value=iter([(header, tables())])
+    ):
+        result = load_schema_cache()
+
+    assert written == [True, True, True]
+    assert result == [
+        {
+            **header,
+            "schema_info": [{"table_name": f"table{t}", "schema_name": "public", "columns": []} for t in range(3)],
+        }
+    ]
+
+
+def test_load_schema_cache_write_error_does_not_extract_again(cache_file, monkeypatch):
+    """Test a failed cache write is raised instead of running a second, in-memory extraction."""
+    monkeypatch.setattr(config.settings, "schema_refresh_threshold_days", 0)
+    with (
+        patch("datu.schema_extractor.schema_cache.SchemaExtractor.iter_all_schemas", return_value=iter([])),
+        patch("datu.schema_extractor.schema_cache.write_schema_cache", side_effect=OSError("disk full")),
+        patch("datu.schema_extractor.schema_cache.SchemaExtractor.extract_all_schemas") as mock_extract,
+        pytest.raises(OSError),
+    ):
+        load_schema_cache()
+    assert not mock_extract.called
@@ -0,0 +1,70 @@
+"""Tests for the IVF-flat approximate nearest-neighbour index."""
+
+import numpy as np
+import pytest
+
+from datu.services.ann_index import IVFFlatIndex
+
+
+def _clustered_vectors(count: int, dim: int = 32, clusters: int = 100, seed: int = 7) -> np.ndarray:
+    """Create normalized vectors grouped around random cluster centres."""
+    rng = np.random.default_rng(seed)
+    centres = rng.standard_normal((clusters, dim))
+    vectors = centres[rng.integers(0, clusters, count)] + 0.35 * rng.standard_normal((count, dim))
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors.astype(np.float32)
+
+
+def _top_k(vectors: np.ndarray, rows: np.ndarray, query: np.ndarray, k: int) -> set[int]:
+    sims = vectors[rows] @ query
+    return set(rows[np.argsort(-sims)[:k]].tolist())
+
+
+def test_ivf_recall_against_exact_search():
+    """Test IVF search recovers the exact top-k neighbours for most queries."""
+    vectors = _clustered_vectors(6000)
+    queries = _clustered_vectors(50, seed=11)
+    index = IVFFlatIndex.build(vectors)
+    all_rows = np.arange(len(vectors))
+
+    k = 10
+    hits = 0
+    scored = 0
+    for query in queries:
+        exact = _top_k(vectors, all_rows, query, k)
+        candidates = index.search(query, nprobe=8)
+        scored += len(candidates)
+        hits += len(exact & _top_k(vectors, candidates, query, k))
+    recall = hits / (k * len(queries))
+    assert recall >= 0.9
+    assert scored / len(queries) < len(vectors) / 2
+
+
+def test_ivf_lists_partition_all_rows():
+    """Test every row is stored in exactly one inverted list."""
+    vectors = _clustered_vectors(500)
+    index = IVFFlatIndex.build(vectors, nlist=16)
+    assert index.nlist == 16
+    assert index.offsets[-1] == len(vectors)
+    assert sorted(index.ids.tolist()) == list(range(len(vectors)))
+    assert index.search(vectors[0], nprobe=16).tolist() == list(range(len(vectors)))
+
+
+def test_ivf_save_and_load_round_trip(tmp_path):
+    """Test the persisted index returns the same candidates after loading."""
+    vectors = _clustered_vectors(1000)
+    index = IVFFlatIndex.build(vectors)
+    path = str(tmp_path / "ann.npz")
+    index.save(path)
+    loaded = IVFFlatIndex.load(path)
+    assert loaded.count == index.count
+    np.testing.assert_array_equal(loaded.search(vectors[3], nprobe=4), index.search(vectors[3], nprobe=4))
+
+
+@pytest.mark.parametrize("count", [0, 1, 3])
+def test_ivf_handles_tiny_matrices(count):
+    """Test building over empty or tiny matrices does not fail."""
+    vectors = _clustered_vectors(count) if count else np.empty((0, 32), dtype=np.float32)
+    index = IVFFlatIndex.build(vectors)
+    assert index.count == count
+    assert len(index.search(np.ones(32, dtype=np.float32) / np.sqrt(32), nprobe=2)) == count
@@ -0,0 +1,62 @@
+"""Tests for the background RAG debug writer."""
+
+import json
+import os
+import threading
+
+from datu.services.debug_writer import DebugOutputWriter
+
+
+def test_captures_are_written_per_request_in_background(tmp_path):
+    """Test each capture gets its own directory and files are serialized on the writer thread."""
+    writer = DebugOutputWriter()
+    caller = threading.current_thread()
+    threads = []
+
+    def build_files():
+        threads.append(threading.current_thread())
+        return {"relevant_tables": ["orders"]}
+
+    first = writer.submit(str(tmp_path), "retriever", build_files)
+    second = writer.submit(str(tmp_path), "retriever", build_files)
+    writer.flush()
+
+    assert first != second
+    for request_dir in (first, second):
+        with open(os.path.join(request_dir, "relevant_tables.json"), encoding="utf-8") as f:
+            assert json.load(f) == ["orders"]
+    assert threads and caller not in threads
+    assert writer.written == 2
+
+
+def test_sampling_and_retention(tmp_path):
+    """Test unsampled captures are skipped and only the most recent directories are kept."""
+    assert DebugOutputWriter(sample_rate=0.0).submit(str(tmp_path), "retriever", dict) is None
+
+    writer = DebugOutputWriter(keep_last=2)
+    request_dirs = [writer.submit(str(tmp_path), "subgraph", lambda: {"subgraph": {}}) for _ in range(4)]
+    writer.flush()
+
+    assert sorted(os.listdir(tmp_path)) == sorted(os.path.basename(d) for d in request_dirs[-2:])
+
+
+def test_full_queue_drops_captures(tmp_path):
+    """Test captures are dropped instead of blocking when the writer falls behind."""
+    writer = DebugOutputWriter(queue_size=1)
+    release = threading.Event()
+    started = threading.Event()
+
+    def slow_files():
+        started.set()
+        release.wait(timeout=5)
+        return {}
+
+    assert writer.submit(str(tmp_path), "retriever", slow_files) is not None
+    started.wait(timeout=5)
+    assert writer.submit(str(tmp_path), "retriever", dict) is not None
+    assert writer.submit(str(tmp_path), "retriever", dict) is None
+    release.set()
+    writer.flush()
+
+    assert writer.dropped == 1
+    assert writer.written == 2
@@ -0,0 +1,127 @@
+"""Tests for the process-wide embedding model registry."""
+
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from datu.services.embeddings import (
+    EmbeddingModelRegistry,
+    HashingEmbeddingBackend,
+    OnnxEmbeddingBackend,
+    QueryEmbeddingCache,
+    embedding_model_key,
+    load_embedding_backend,
+    normalize_query_text,
+)
+
+
+def test_registry_loads_lazily_and_caches():
+    """Test a model is loaded on first access only and reused afterwards."""
+    loaded = []
+
+    def loader(name):
+        loaded.append(name)
+        return object()
+
+    registry = EmbeddingModelRegistry(loader=loader)
+    assert not loaded
+    first = registry.get("model-a")
+    assert registry.get("model-a") is first
+    assert registry.get("model-b") is not first
+    assert loaded == ["model-a", "model-b"]
+
+    registry.clear()
+    assert not registry.is_loaded("model-a")
+
+
+def test_registry_loads_once_under_concurrency():
+    """Test concurrent first access loads the model a single time."""
+    calls = []
+
+    def slow_loader(name):
+        calls.append(name)
+        time.sleep(0.05)
+        return object()
+
+    registry = EmbeddingModelRegistry(loader=slow_loader)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(registry.get("model"))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+
+
+def test_query_cache_evicts_least_recently_used():
+    """Test the query cache is bounded and tracks hits and misses."""
+    cache = QueryEmbeddingCache(maxsize=2)
+    cache.put("a", np.array([1.0]))
+    cache.put("b", np.array([2.0]))
+    assert cache.get("a") is not None
+    cache.put("c", np.array([3.0]))
+    assert cache.get("b") is None
+    assert cache.get("c") is not None
+    assert cache.stats() == {"size": 2, "maxsize": 2, "hits": 2, "misses": 1}
+
+
+def test_normalize_query_text_collapses_whitespace():
+    """Test queries differing only in whitespace share a cache key."""
+    assert normalize_query_text("  total  sales\nby region ") == "total sales by region"
+
+
+def test_hashing_backend_is_deterministic_and_matches_identifier_spellings():
+    """Test the hashing encoder needs no model, is stable and relates identifiers to their spelled-out words."""
+    backend = load_embedding_backend(embedding_model_key("hashing", "256"))
+    assert isinstance(backend, HashingEmbeddingBackend)
+
+    vectors = backend.encode(["SalesOrderID", "sales order id", "customer_email"], normalize_embeddings=True)
+    assert vectors.shape == (3, 256) and vectors.dtype == np.float32
+    np.testing.assert_allclose(np.linalg.norm(vectors, axis=1), 1.0, rtol=1e-5)
+    np.testing.assert_array_equal(
+        vectors, HashingEmbeddingBackend(dim=256).encode(["SalesOrderID", "sales order id", "customer_email"])
+    )
+    assert vectors[0] @ vectors[1] > vectors[0] @ vectors[2]
+
+
+def test_load_embedding_backend_rejects_unknown_backend():
+    """Test an unknown backend prefix raises instead of silently loading a default model."""
+    with pytest.raises(ValueError):
+        load_embedding_backend("word2vec:model")
+
+
+def test_onnx_backend_mean_pools_token_embeddings(tmp_path):
+    """Test the ONNX backend tokenizes, runs the graph on CPU and mean-pools over the attention mask."""
+    onnx = pytest.importorskip("onnx")
+    pytest.importorskip("onnxruntime")
+    from onnx import TensorProto, helper
+    from tokenizers import Tokenizer
+    from tokenizers.models import WordLevel
+    from tokenizers.pre_tokenizers import Whitespace
+
+    vocab = {"[PAD]": 0, "[UNK]": 1, "orders": 2, "amount": 3}
+    tokenizer = Tokenizer(WordLevel(vocab, unk_token="[UNK]"))
+    tokenizer.pre_tokenizer = Whitespace()
+    tokenizer.save(str(tmp_path / "tokenizer.json"))
+
+    table = np.random.default_rng(0).standard_normal((len(vocab), 8)).astype(np.float32)
+    graph = helper.make_graph(
+        [helper.make_node("Gather", ["table", "input_ids"], ["last_hidden_state"])],
+        "embed",
+        [
+            helper.make_tensor_value_info("input_ids", TensorProto.INT64, ["batch", "tokens"]),
+            helper.make_tensor_value_info("attention_mask", TensorProto.INT64, ["batch", "tokens"]),
+        ],
+        [helper.make_tensor_value_info("last_hidden_state", TensorProto.FLOAT, ["batch", "tokens", 8])],
+        [helper.make_tensor("table", TensorProto.FLOAT, table.shape, table.flatten().tolist())],
+    )
+    onnx.save(helper.make_model(graph, opset_imports=[helper.make_opsetid("", 13)]), str(tmp_path / "model.onnx"))
+
+    backend = load_embedding_backend(embedding_model_key("onnx", f"{tmp_path}#model.onnx"))
+    assert isinstance(backend, OnnxEmbeddingBackend)
+    vectors = backend.encode(["orders amount", "orders"], normalize_embeddings=False)
+    np.testing.assert_allclose(vectors[0], table[[2, 3]].mean(axis=0), rtol=1e-5)
+    np.testing.assert_allclose(vectors[1], table[2], rtol=1e-5)
@@ -0,0 +1,102 @@
+"""Tests for the executor that runs CPU-bound request stages off the event loop."""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from datu.services.executor import CPUBoundExecutor
+from datu.services.sql_generator.core import estimate_query_complexity
+
+
+@pytest.mark.asyncio
+async def test_run_returns_result_from_worker_thread():
+    """Test callables run on a pool thread and their result is returned."""
+    executor = CPUBoundExecutor(max_workers=2)
+    try:
+        name = await executor.run(lambda: threading.current_thread().name)
+        assert name.startswith("datu-cpu")
+        assert await executor.run(sum, [1, 2, 3]) == 6
+    finally:
+        executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_blocking_work_does_not_stall_event_loop():
+    """Test other coroutines keep running while a blocking task executes."""
+    executor = CPUBoundExecutor(max_workers=1)
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.01)
+
+    ticker_task = asyncio.create_task(ticker())
+    try:
+        await executor.run(time.sleep, 0.2)
+        assert ticks >= 5
+    finally:
+        ticker_task.cancel()
+        executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_metrics_report_queue_depth_and_failures():
+    """Test queued tasks beyond the pool size are reported as queue depth."""
+    executor = CPUBoundExecutor(max_workers=1)
+    release = threading.Event()
+    try:
+        tasks = [asyncio.create_task(executor.run(release.wait, 5)) for _ in range(3)]
+        await asyncio.sleep(0.05)
+        snapshot = executor.metrics()
+        assert snapshot["running"] == 1
+        assert snapshot["queue_depth"] == 2
+        release.set()
+        await asyncio.gather(*tasks)
+
+        with pytest.raises(ZeroDivisionError):
+            await executor.run(lambda: 1 / 0)
+        snapshot = executor.metrics()
+        assert snapshot["queue_depth"] == 0
+        assert snapshot["max_queue_depth"] == 2
+        assert snapshot["submitted"] == snapshot["completed"] == 4
+        assert snapshot["failed"] == 1
+    finally:
+        executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_process_mode_keeps_stateful_stages_in_process():
+    """Test process mode runs stateless stages in worker processes and stateful ones on local threads."""
+    executor = CPUBoundExecutor(max_workers=1, kind="process")
+    try:
+        assert await executor.run(estimate_query_complexity, 'SELECT "id" FROM "orders" ORDER BY "id"') >= 1
+        name = await executor.run(lambda: threading.current_thread().name, stateful=True)
+        assert name.startswith("datu-cpu")
+        assert executor.metrics()["completed"] == 2
+    finally:
+        executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_metrics_track_each_pool_separately():
+    """Test concurrent process and thread tasks are counted against their own pool and not reported as queued."""
+    executor = CPUBoundExecutor(max_workers=1, kind="process")
+    release = threading.Event()
+    try:
+        tasks = [
+            asyncio.create_task(executor.run(time.sleep, 0.5)),
+            asyncio.create_task(executor.run(release.wait, 5, stateful=True)),
+        ]
+        await asyncio.sleep(0.1)
+        snapshot = executor.metrics()
+        assert snapshot["running"] == 2 and snapshot["queue_depth"] == 0
+        assert {pool: stats["running"] for pool, stats in snapshot["pools"].items()} == {"process": 1, "thread": 1}
+        release.set()
+        await asyncio.gather(*tasks)
+        assert executor.metrics()["max_queue_depth"] == 0
+    finally:
+        executor.shutdown()
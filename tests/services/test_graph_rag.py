@@ -1,13 +1,30 @@
 """Sample schema fixtures for testing schema extraction and caching."""
 # pylint: disable=protected-access
 
+import hashlib
+import json
 import os
 import shutil
+import threading
+from types import SimpleNamespace
 
 import networkx as nx
+import numpy as np
 import pytest
 
-from datu.services.schema_rag import SchemaGraphBuilder, SchemaRAG, SchemaTripleExtractor
+from datu.base.base_connector import SchemaInfo, TableInfo
+from datu.schema_extractor.schema_cache import SchemaGlossary
+from datu.services import embeddings, schema_rag
+from datu.services.embeddings import EmbeddingModelRegistry
+from datu.services.schema_graph import CompactSchemaGraph
+from datu.services.schema_rag import (
+    SchemaGraphBuilder,
+    SchemaRAG,
+    SchemaRetriever,
+    SchemaTripleExtractor,
+    SchemaVectorizer,
+)
+from datu.services.value_index import CategoricalValueIndex
 
 from tests.helpers.sample_schemas import SchemaTestFixtures
 
@@ -15,8 +32,9 @@ TEST_GRAPH_DIR = "test_graph_rag"
 
 
 @pytest.fixture(autouse=True)
-def clean_test_graph_cache():
-    """Ensure the test graph directory is cleaned up before and after each test."""
+def clean_test_graph_cache(monkeypatch):
+    """Ensure the test graph directory is cleaned up before and after each test and used as the RAG cache."""
+    monkeypatch.setattr(schema_rag.config, "rag_dir", TEST_GRAPH_DIR)
     if os.path.exists(TEST_GRAPH_DIR):
         shutil.rmtree(TEST_GRAPH_DIR)
     os.makedirs(TEST_GRAPH_DIR)
@@ -25,6 +43,38 @@ def clean_test_graph_cache():
         shutil.rmtree(TEST_GRAPH_DIR)
 
 
+class FakeEncoder:
+    """Deterministic stand-in for SentenceTransformer that avoids downloading a model."""
+
+    def __init__(self, *args, **kwargs):
+        self.calls = 0
+        self.encoded: list[str] = []
+
+    def encode(self, texts, normalize_embeddings=True):
+        self.calls += 1
+        self.encoded.extend(texts)
+        vectors = []
+        for text in texts:
+            seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:4], "little")
+            vectors.append(np.random.default_rng(seed).standard_normal(16))
+        matrix = np.asarray(vectors, dtype=np.float32)
+        if normalize_embeddings:
+            matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix
+
+
+@pytest.fixture(name="fake_encoder")
+def fake_encoder_fixture(monkeypatch):
+    """Replace the shared embedding models with a deterministic fake encoder."""
+    registry = EmbeddingModelRegistry(loader=FakeEncoder)
+    monkeypatch.setattr(embeddings, "embedding_models", registry)
+    return registry
+
+
+def _random_triples(count: int):
+    return [(f"table_{i % 50}", "has_column", f"column_{i}") for i in range(count)]
+
+
 def test_init_with_dict_schema():
     """Test SchemaGraphBuilder initialization with a raw schema dictionary."""
     schema_dict = SchemaTestFixtures.raw_schema_dict()
@@ -44,6 +94,39 @@ def test_extract_triples_output():
     assert ("orders", "has_column", "order_id") in extractor.triples
 
 
+def test_cached_triples_are_loaded():
+    """Test an up-to-date triple cache is loaded instead of leaving the triples empty."""
+    schema_profiles = SchemaTestFixtures.sample_schema()
+    paths = {"triples": os.path.join(TEST_GRAPH_DIR, "triples.json"), "meta": os.path.join(TEST_GRAPH_DIR, "meta.json")}
+    extractor = SchemaTripleExtractor(schema_profiles)
+    extractor.paths = dict(paths)
+    assert extractor.create_schema_triples() is True
+
+    cached = SchemaTripleExtractor(schema_profiles)
+    cached.paths = dict(paths)
+    assert cached.create_schema_triples() is False
+    assert cached.triples == extractor.triples
+
+
+def test_rag_not_outdated_when_only_timestamp_changes():
+    """Test a schema refresh with identical content keeps the cached triples."""
+    paths = {"triples": os.path.join(TEST_GRAPH_DIR, "triples.json"), "meta": os.path.join(TEST_GRAPH_DIR, "meta.json")}
+    extractor = SchemaTripleExtractor(SchemaTestFixtures.sample_schema(timestamp=1000.0))
+    extractor.paths = dict(paths)
+    extractor.create_schema_triples()
+
+    refreshed = SchemaTripleExtractor(SchemaTestFixtures.sample_schema(timestamp=2000.0))
+    refreshed.paths = dict(paths)
+    assert refreshed.content_hash == extractor.content_hash
+    assert refreshed.is_rag_outdated() is False
+
+    changed_schema = SchemaTestFixtures.sample_schema(timestamp=2000.0)
+    changed_schema[0].schema_info[0].columns[1].description = "Order total"
+    changed = SchemaTripleExtractor(changed_schema)
+    changed.paths = dict(paths)
+    assert changed.is_rag_outdated() is True
+
+
 def test_get_attr_dict_vs_object():
     """Test the helper method _get_attr for both dicts and objects."""
     extractor = SchemaTripleExtractor([])
@@ -61,12 +144,12 @@ def test_is_graph_outdated_returns_true_for_missing_files(tmp_path):
     assert extractor.is_rag_outdated() is True
 
 
-def test_initialize_graph_rebuild_and_cache():
+def test_initialize_graph_rebuild_and_cache(tmp_path):
     """Test graph initialization rebuilds and caches the graph correctly."""
     schema = SchemaTestFixtures.sample_schema(timestamp=9999.0)
-    extractor = SchemaTripleExtractor(schema)
+    extractor = SchemaTripleExtractor(schema, rag_dir=str(tmp_path))
     extractor.create_schema_triples()
-    builder = SchemaGraphBuilder(triples=extractor.triples, is_rag_outdated=True)
+    builder = SchemaGraphBuilder(triples=extractor.triples, is_rag_outdated=True, rag_dir=str(tmp_path))
     builder.graph_path = os.path.join(TEST_GRAPH_DIR, "graph.pkl")
 
     # Initial build (no cache yet)
@@ -83,6 +166,25 @@ def test_initialize_graph_rebuild_and_cache():
     assert set(builder2.graph.edges) == set(builder.graph.edges)
 
 
+def test_switching_graph_format_rebuilds_missing_artifact(fake_encoder, monkeypatch):
+    """Test switching graph_format on an up-to-date cache builds the artifact of the new format."""
+    monkeypatch.setattr(schema_rag.config, "rag_dir", TEST_GRAPH_DIR)
+    monkeypatch.setattr(schema_rag.config, "rag_debugging", False)
+    monkeypatch.setattr(schema_rag.config, "graph_enabled", True)
+    monkeypatch.setattr(schema_rag.config, "graph_format", "csr")
+    SchemaRAG(SchemaTestFixtures.sample_schema())
+    assert not os.path.exists(os.path.join(TEST_GRAPH_DIR, schema_rag.config.graph_cache_file))
+
+    monkeypatch.setattr(schema_rag.config, "graph_format", "networkx")
+    rag = SchemaRAG(SchemaTestFixtures.sample_schema())
+    assert rag.graph_builder.graph.number_of_nodes() > 0
+    assert os.path.exists(os.path.join(TEST_GRAPH_DIR, schema_rag.config.graph_cache_file))
+
+    with open(os.path.join(TEST_GRAPH_DIR, schema_rag.config.graph_cache_file), "wb") as f:
+        f.write(b"truncated")
+    assert SchemaRAG(SchemaTestFixtures.sample_schema()).graph_builder.graph.number_of_nodes() > 0
+
+
 @pytest.mark.requires_service
 def test_schema_rag_run_query_returns_filtered_schema_dict():
     """Test SchemaRAG end-to-end run_query method returns filtered schema."""
@@ -97,3 +199,605 @@ def test_schema_rag_run_query_returns_filtered_schema_dict():
     ]
     column_names = [col.get("column_name") for col in flattened_columns]
     assert isinstance(column_names, list)
+
+
+def test_vectorizer_search_matches_brute_force(fake_encoder, monkeypatch):
+    """Test the vectorized search returns the same ranking as per-triple cosine similarity."""
+    monkeypatch.setattr(schema_rag.config, "rag_retrieval_mode", "vector")
+    triples = _random_triples(500)
+    vectorizer = SchemaVectorizer(triples)
+    vectorizer.paths["vecs"] = os.path.join(TEST_GRAPH_DIR, "vecs.npy")
+    vectorizer.paths["triples"] = os.path.join(TEST_GRAPH_DIR, "vec_triples.json")
+    vectorizer.initialize_embeddings(force_rebuild=True)
+    assert vectorizer.embeddings.dtype == np.float32
+    assert vectorizer.embeddings.shape == (500, 16)
+
+    query_vec = vectorizer.model.encode(["orders by customer"])[0]
+    expected = sorted(
+        ((triple, float(np.dot(query_vec, vec))) for triple, vec in zip(triples, vectorizer.embeddings, strict=True)),
+        key=lambda x: x[1],
+        reverse=True,
+    )
+
+    above = vectorizer.search("orders by customer", score_threshold=0.2, min_results=1)
+    assert [t for t, _ in above] == [t for t, s in expected if s >= 0.2]
+
+    fallback = vectorizer.search("orders by customer", score_threshold=0.99, min_results=25)
+    assert [t for t, _ in fallback] == [t for t, _ in expected[:25]]
+    assert [s for _, s in fallback] == pytest.approx([s for _, s in expected[:25]], abs=1e-5)
+
+
+def test_vectorizer_embedding_store_is_memory_mapped(fake_encoder):
+    """Test embeddings round-trip through the .npy store and are memory-mapped on load."""
+    triples = [("orders", "has_column", "order_id"), ("status", "has_values", ("open", "closed"))]
+    vectorizer = SchemaVectorizer(triples)
+    vectorizer.paths["vecs"] = os.path.join(TEST_GRAPH_DIR, "vecs.npy")
+    vectorizer.paths["triples"] = os.path.join(TEST_GRAPH_DIR, "vec_triples.json")
+    vectorizer.initialize_embeddings(force_rebuild=True)
+
+    loaded = SchemaVectorizer([])
+    loaded.paths = dict(vectorizer.paths)
+    loaded.initialize_embeddings()
+    assert isinstance(loaded.embeddings, np.memmap)
+    assert not loaded.embeddings.flags.writeable
+    assert loaded.triples == triples
+    np.testing.assert_array_equal(loaded.embeddings, vectorizer.embeddings)
+    assert loaded.search("order id", score_threshold=-1.0, min_results=1)
+
+
+def test_vectorizer_rebuilds_on_mismatched_store(fake_encoder):
+    """Test a triple table that does not match the embedding matrix triggers a rebuild."""
+    triples = _random_triples(10)
+    vectorizer = SchemaVectorizer(triples)
+    vectorizer.paths["vecs"] = os.path.join(TEST_GRAPH_DIR, "vecs.npy")
+    vectorizer.paths["triples"] = os.path.join(TEST_GRAPH_DIR, "vec_triples.json")
+    vectorizer.initialize_embeddings(force_rebuild=True)
+    np.save(vectorizer.paths["vecs"], np.zeros((3, 16), dtype=np.float32))
+
+    rebuilt = SchemaVectorizer(triples)
+    rebuilt.paths = dict(vectorizer.paths)
+    rebuilt.initialize_embeddings()
+    assert rebuilt.embeddings.shape == (10, 16)
+
+
+def test_vectorizer_ivf_index_is_persisted(fake_encoder, monkeypatch):
+    """Test the IVF index is built with the embeddings and reloaded from rag_dir."""
+    monkeypatch.setattr(schema_rag.config, "rag_index_type", "ivf")
+    monkeypatch.setattr(schema_rag.config, "rag_ivf_nprobe", 4)
+    triples = _random_triples(400)
+    vectorizer = SchemaVectorizer(triples)
+    vectorizer.paths["vecs"] = os.path.join(TEST_GRAPH_DIR, "vecs.npy")
+    vectorizer.paths["triples"] = os.path.join(TEST_GRAPH_DIR, "vec_triples.json")
+    vectorizer.paths["ann"] = os.path.join(TEST_GRAPH_DIR, "ann.npz")
+    vectorizer.initialize_embeddings(force_rebuild=True)
+    assert vectorizer.ann_index is not None
+    assert os.path.exists(vectorizer.paths["ann"])
+
+    loaded = SchemaVectorizer([])
+    loaded.paths = dict(vectorizer.paths)
+    loaded.initialize_embeddings()
+    assert loaded.ann_index is not None and loaded.ann_index.count == 400
+    results = loaded.search("orders by customer", score_threshold=-1.0, min_results=5)
+    assert 0 < len(results) < 400
+    assert [s for _, s in results] == sorted((s for _, s in results), reverse=True)
+
+
+def test_vectorizer_rebuild_only_encodes_changed_triples(fake_encoder):
+    """Test a rebuild reuses cached embeddings by text hash and drops deleted triples."""
+    triples = _random_triples(20)
+    vectorizer = SchemaVectorizer(triples)
+    vectorizer.paths["vecs"] = os.path.join(TEST_GRAPH_DIR, "vecs.npy")
+    vectorizer.paths["triples"] = os.path.join(TEST_GRAPH_DIR, "vec_triples.json")
+    vectorizer.initialize_embeddings(force_rebuild=True)
+    original = {triple: np.array(row) for triple, row in zip(triples, vectorizer.embeddings, strict=True)}
+
+    updated = triples[2:] + [("table_new", "has_column", "column_new")]
+    rebuilt = SchemaVectorizer(updated)
+    rebuilt.paths = dict(vectorizer.paths)
+    already_encoded = len(rebuilt.model.encoded)
+    rebuilt.initialize_embeddings(force_rebuild=True)
+
+    assert rebuilt.model.encoded[already_encoded:] == ["table_new has column column_new"]
+    assert rebuilt.embeddings.shape == (len(updated), 16)
+    for triple, row in zip(updated[:-1], rebuilt.embeddings, strict=False):
+        np.testing.assert_array_equal(row, original[triple])
+
+    reloaded = SchemaVectorizer([])
+    reloaded.paths = dict(vectorizer.paths)
+    reloaded.load_embeddings()
+    assert reloaded.triples == updated
+
+
+def test_vectorizer_encodes_triples_in_batches(fake_encoder, monkeypatch):
+    """Test embeddings are built in batches of rag_embedding_batch_size with the same result as one batch."""
+    triples = _random_triples(50)
+    whole = SchemaVectorizer(triples, rag_dir=TEST_GRAPH_DIR)
+    whole.build_embeddings()
+
+    monkeypatch.setattr(schema_rag.config, "rag_embedding_batch_size", 16)
+    batched = SchemaVectorizer(triples, rag_dir=TEST_GRAPH_DIR)
+    calls = batched.model.calls
+    batched.build_embeddings()
+
+    assert batched.model.calls == calls + 4
+    np.testing.assert_allclose(batched.embeddings, whole.embeddings, atol=1e-6)
+
+
+def test_vectorizers_share_lazily_loaded_model(fake_encoder):
+    """Test vectorizers and retrievers do not load a model until the first encode, then share it."""
+    vectorizer = SchemaVectorizer(_random_triples(5))
+    retriever = schema_rag.SubGraphRetriever(nx.DiGraph())
+    assert not fake_encoder.is_loaded(vectorizer.model_name)
+
+    vectorizer.paths["vecs"] = os.path.join(TEST_GRAPH_DIR, "vecs.npy")
+    vectorizer.paths["triples"] = os.path.join(TEST_GRAPH_DIR, "vec_triples.json")
+    vectorizer.initialize_embeddings(force_rebuild=True)
+    assert fake_encoder.is_loaded(vectorizer.model_name)
+    assert retriever.vectorizer.model is vectorizer.model
+
+
+def test_vectorizer_rebuilds_when_model_changes(fake_encoder):
+    """Test embeddings cached for a different model are not reused."""
+    triples = _random_triples(5)
+    vectorizer = SchemaVectorizer(triples)
+    vectorizer.paths["vecs"] = os.path.join(TEST_GRAPH_DIR, "vecs.npy")
+    vectorizer.paths["triples"] = os.path.join(TEST_GRAPH_DIR, "vec_triples.json")
+    vectorizer.initialize_embeddings(force_rebuild=True)
+
+    other = SchemaVectorizer(triples)
+    other.paths = dict(vectorizer.paths)
+    other.model_name = "other-model"
+    other.initialize_embeddings()
+    assert other.model.encoded == [other.format_triple(t) for t in triples]
+
+
+def test_vectorizer_caches_query_embeddings(fake_encoder):
+    """Test repeated queries are served from the query embedding cache."""
+    vectorizer = SchemaVectorizer(_random_triples(50))
+    vectorizer.paths["vecs"] = os.path.join(TEST_GRAPH_DIR, "vecs.npy")
+    vectorizer.paths["triples"] = os.path.join(TEST_GRAPH_DIR, "vec_triples.json")
+    vectorizer.initialize_embeddings(force_rebuild=True)
+    calls = vectorizer.model.calls
+
+    first = vectorizer.search("orders by customer", score_threshold=-1.0, min_results=5)
+    second = vectorizer.search("  orders by   customer ", score_threshold=-1.0, min_results=5)
+    assert first == second
+    assert vectorizer.model.calls == calls + 1
+    assert vectorizer.query_cache.stats()["hits"] == 1
+
+
+def test_conversation_embedding_encodes_each_message_once(fake_encoder, monkeypatch):
+    """Test conversation embeddings weight recent messages higher and reuse the embeddings of earlier turns."""
+    monkeypatch.setattr(schema_rag.config, "rag_conversation_decay", 0.5)
+    vectorizer = SchemaVectorizer(_random_triples(50))
+    vectorizer.paths["vecs"] = os.path.join(TEST_GRAPH_DIR, "vecs.npy")
+    vectorizer.paths["triples"] = os.path.join(TEST_GRAPH_DIR, "vec_triples.json")
+    vectorizer.initialize_embeddings(force_rebuild=True)
+    encoded = len(vectorizer.model.encoded)
+
+    first, second = vectorizer.encode_conversations([["Show orders"], ["Show orders", "only from 2024"]])
+    assert vectorizer.model.encoded[encoded:] == ["Show orders", "only from 2024"]
+    messages = vectorizer.encode_queries(["Show orders", "only from 2024"])
+    expected = 0.5 * messages[0] + messages[1]
+    assert first == pytest.approx(messages[0], abs=1e-6)
+    assert second == pytest.approx(expected / np.linalg.norm(expected), abs=1e-6)
+
+    vectorizer.encode_conversations([["Show orders", "only from 2024", "by customer"]])
+    assert vectorizer.model.encoded[encoded + 2 :] == ["by customer"]
+
+
+def test_schema_rag_conversation_window(monkeypatch):
+    """Test only the most recent non-empty messages form the query, and a window of 0 concatenates them all."""
+    monkeypatch.setattr(schema_rag.config, "rag_conversation_window", 2)
+    assert SchemaRAG.conversation_window(["a", "", "b", "c"]) == ["b", "c"]
+    assert SchemaRAG.conversation_window([]) == [""]
+    monkeypatch.setattr(schema_rag.config, "rag_conversation_window", 0)
+    assert SchemaRAG.conversation_window(["a", "b"]) == ["a b"]
+
+
+def test_vectorizer_search_many_matches_single_searches(fake_encoder):
+    """Test batched search encodes once and returns the same results as individual searches."""
+    vectorizer = SchemaVectorizer(_random_triples(300))
+    vectorizer.paths["vecs"] = os.path.join(TEST_GRAPH_DIR, "vecs.npy")
+    vectorizer.paths["triples"] = os.path.join(TEST_GRAPH_DIR, "vec_triples.json")
+    vectorizer.initialize_embeddings(force_rebuild=True)
+    queries = [f"question {i}" for i in range(40)] + ["question 3"]
+    calls = vectorizer.model.calls
+
+    batched = vectorizer.search_many(queries, score_threshold=0.3, min_results=5, batch_size=16)
+    assert vectorizer.model.calls == calls + 1
+    for query, results in zip(queries, batched, strict=True):
+        single = vectorizer.search(query, score_threshold=0.3, min_results=5)
+        assert [t for t, _ in results] == [t for t, _ in single]
+        assert [s for _, s in results] == pytest.approx([s for _, s in single], abs=1e-5)
+
+
+def test_schema_rag_run_queries_matches_run_query(fake_encoder, monkeypatch):
+    """Test the bulk API returns one payload per message list, equal to run_query."""
+    monkeypatch.setattr(schema_rag.config, "rag_dir", TEST_GRAPH_DIR)
+    monkeypatch.setattr(schema_rag.config, "rag_debugging", False)
+    monkeypatch.setattr(schema_rag.config, "rag_schema_query_min_results", 3)
+    rag = SchemaRAG(SchemaTestFixtures.sample_schema())
+    message_lists = [["List all orders"], ["Order amounts", "by id"]]
+    assert rag.run_queries(message_lists) == [rag.run_query(messages) for messages in message_lists]
+
+
+def test_extract_subgraph_uses_adjacency_view():
+    """Test the extracted subgraph holds exactly the edges touching relevant nodes, as a read-only view."""
+    graph = nx.DiGraph()
+    graph.add_edge("orders", "order_id", label="has_column")
+    graph.add_edge("orders", "amount", label="has_column")
+    graph.add_edge("order_id", "int", label="has_data_type")
+    graph.add_edge("customers", "customer_id", label="has_column")
+    graph.add_edge("customer_id", "int", label="has_data_type")
+
+    retriever = schema_rag.SubGraphRetriever(graph)
+    subgraph = retriever.extract_subgraph({"orders", "missing_table"}, {"orders": {"order_id"}})
+
+    assert set(subgraph.edges) == {("orders", "order_id"), ("orders", "amount"), ("order_id", "int")}
+    assert subgraph.edges["order_id", "int"]["label"] == "has_data_type"
+    assert nx.is_frozen(subgraph)
+    assert "customers" not in subgraph
+
+
+def test_schema_fragment_index_matches_model_dump():
+    """Test filtered schemas are assembled from shared fragments and match a filtered model dump."""
+    profiles = SchemaTestFixtures.sample_schema()
+    index = schema_rag.SchemaFragmentIndex(profiles)
+
+    filtered = index.filtered_schema({"orders", "missing"}, {"orders": {"amount"}})
+
+    expected = profiles[0].model_dump(exclude_none=True)
+    expected["schema_info"][0]["columns"] = [expected["schema_info"][0]["columns"][1]]
+    assert filtered == [expected]
+    assert filtered[0]["schema_info"][0]["columns"][0] is index.tables[(0, "orders")][0][2][1][1]
+    assert index.filtered_schema({"orders"}, {}) == []
+    assert profiles[0].schema_info[0].columns[0].column_name == "order_id"
+
+
+def test_hybrid_search_ranks_exact_identifier_mentions_first(fake_encoder, monkeypatch):
+    """Test lexical matches on identifiers are fused into the vector scores in hybrid mode."""
+    triples = _random_triples(300) + [("SalesOrderHeader", "has_column", "SalesOrderID")]
+    target = triples[-1]
+
+    monkeypatch.setattr(schema_rag.config, "rag_retrieval_mode", "vector")
+    vector_only = SchemaVectorizer(triples)
+    vector_only.paths["vecs"] = os.path.join(TEST_GRAPH_DIR, "vecs.npy")
+    vector_only.paths["triples"] = os.path.join(TEST_GRAPH_DIR, "vec_triples.json")
+    vector_only.initialize_embeddings(force_rebuild=True)
+    assert vector_only.lexical_index is None
+    vector_scores = dict(vector_only.search("total for SALESORDERID", score_threshold=-1.0, min_results=301))
+
+    monkeypatch.setattr(schema_rag.config, "rag_retrieval_mode", "hybrid")
+    monkeypatch.setattr(schema_rag.config, "rag_lexical_weight", 2.0)
+    hybrid = SchemaVectorizer(triples)
+    hybrid.paths = dict(vector_only.paths)
+    hybrid.initialize_embeddings()
+    results = hybrid.search("total for SALESORDERID", score_threshold=0.99, min_results=5)
+    assert results[0][0] == target
+    assert results[0][1] == pytest.approx(vector_scores[target] + 2.0, abs=1e-5)
+    assert hybrid.search_many(["total for SALESORDERID"], score_threshold=0.99, min_results=5)[0][0][0] == target
+
+
+def test_hybrid_prefilter_scores_only_lexical_candidates(fake_encoder, monkeypatch):
+    """Test large matrices are only scored on the lexical candidates of a query that has any."""
+    monkeypatch.setattr(schema_rag.config, "rag_retrieval_mode", "hybrid")
+    monkeypatch.setattr(schema_rag.config, "rag_lexical_prefilter_min_rows", 100)
+    vectorizer = SchemaVectorizer(_random_triples(300))
+    vectorizer.paths["vecs"] = os.path.join(TEST_GRAPH_DIR, "vecs.npy")
+    vectorizer.paths["triples"] = os.path.join(TEST_GRAPH_DIR, "vec_triples.json")
+    vectorizer.initialize_embeddings(force_rebuild=True)
+
+    candidates, _ = vectorizer.lexical_index.search("column_7 and column_42")
+    assert 0 < len(candidates) < 100
+    results = vectorizer.search("column_7 and column_42", score_threshold=-1.0, min_results=10)
+    assert {triple for triple, _ in results} == {vectorizer.triples[i] for i in candidates}
+    assert len(vectorizer.search("no lexical match", score_threshold=-1.0, min_results=10)) == 300
+
+
+def test_vectorizer_quantized_search_rescores_top_candidates(fake_encoder, monkeypatch):
+    """Test quantized candidate scoring returns the exact top results after full-precision rescoring."""
+    monkeypatch.setattr(schema_rag.config, "rag_retrieval_mode", "vector")
+    triples = _random_triples(500)
+    exact = SchemaVectorizer(triples)
+    exact.paths["vecs"] = os.path.join(TEST_GRAPH_DIR, "vecs.npy")
+    exact.paths["triples"] = os.path.join(TEST_GRAPH_DIR, "vec_triples.json")
+    exact.paths["quantized"] = os.path.join(TEST_GRAPH_DIR, "quantized.npz")
+    exact.initialize_embeddings(force_rebuild=True)
+    expected = exact.search("orders by customer", score_threshold=0.99, min_results=20)
+
+    monkeypatch.setattr(schema_rag.config, "rag_embedding_quantization", "int8")
+    monkeypatch.setattr(schema_rag.config, "rag_rescore_candidates", 50)
+    quantized = SchemaVectorizer(triples)
+    quantized.paths = dict(exact.paths)
+    quantized.initialize_embeddings()
+    assert quantized.quantized is not None and quantized.quantized.kind == "int8"
+    assert os.path.exists(quantized.paths["quantized"])
+    assert quantized.quantized.nbytes < quantized.embeddings.nbytes / 3
+
+    results = quantized.search("orders by customer", score_threshold=0.99, min_results=20)
+    assert [t for t, _ in results] == [t for t, _ in expected]
+    assert [s for _, s in results] == pytest.approx([s for _, s in expected], abs=1e-5)
+
+
+def test_sharded_schema_rag_searches_only_active_target(fake_encoder, monkeypatch):
+    """Test each (profile, target) gets its own lazily built shard and queries search the active one."""
+    monkeypatch.setattr(schema_rag.config, "rag_debugging", False)
+    monkeypatch.setattr(schema_rag.config, "rag_schema_query_min_results", 50)
+    dev = SchemaTestFixtures.sample_schema()[0]
+    prod = dev.model_copy(update={"output_name": "prod"})
+    prod.schema_info = [prod.schema_info[0].model_copy(update={"table_name": "invoices"})]
+
+    rag = schema_rag.ShardedSchemaRAG([dev, prod], rag_dir=TEST_GRAPH_DIR, active_key=("demo", "dev"))
+    assert set(rag.keys) == {("demo", "dev"), ("demo", "prod")}
+    assert rag.shards == {}
+
+    result = rag.run_query(["List all orders"])
+    assert [table["table_name"] for entry in result["schema_info"] for table in entry["schema_info"]] == ["orders"]
+    assert list(rag.shards) == [("demo", "dev")]
+    assert os.path.exists(os.path.join(TEST_GRAPH_DIR, "shards", "demo__dev", "schema_embeddings.npy"))
+
+    prod_result = rag.run_queries([["List all invoices"]], key=("demo", "prod"))[0]
+    assert [entry["output_name"] for entry in prod_result["schema_info"]] == ["prod"]
+
+    fallback = rag.run_query(["List all orders"], key=("demo", "missing"))
+    assert {entry["output_name"] for entry in fallback["schema_info"]} == {"dev", "prod"}
+
+
+def test_schema_rag_holder_swaps_rebuilt_rag_in_background():
+    """Test refreshes rebuild off the caller's thread, bump the version and leave held references intact."""
+    built = []
+    release = threading.Event()
+
+    def builder(schema_data, warm_keys, rag_dir):
+        assert rag_dir == TEST_GRAPH_DIR or rag_dir.startswith(os.path.join(TEST_GRAPH_DIR, "versions"))
+        if built:
+            release.wait(timeout=5)
+        if schema_data == "broken":
+            raise ValueError("bad schema")
+        built.append((schema_data, warm_keys))
+        return SimpleNamespace(shards={("demo", "dev"): None}, cache_stats=dict)
+
+    holder = schema_rag.SchemaRAGHolder(loader=lambda: "initial", builder=builder, rag_dir=TEST_GRAPH_DIR)
+    holder.refresh("ignored", wait=True)
+    assert holder.version == 0 and built == []
+
+    first = holder.current
+    assert holder.current is first and holder.version == 1
+
+    holder.refresh("updated")
+    assert holder.current is first
+    assert holder.status()["rebuilding"] is True
+    holder.refresh("latest")
+    release.set()
+    holder.refresh(None, wait=True)
+    assert holder.current is not first
+    assert built[0] == ("initial", None)
+    assert built[-1] == ("initial", [("demo", "dev")])
+    assert holder.version == len(built)
+
+    live = holder.current
+    holder.refresh("broken", wait=True)
+    assert holder.current is live
+    assert holder.status()["last_error"] == "bad schema"
+    assert holder.status()["rebuilding"] is False
+    assert 1 <= len(os.listdir(os.path.join(TEST_GRAPH_DIR, "versions"))) <= 2
+
+
+def test_schema_rag_holder_rebuilds_into_new_version_dir(fake_encoder, monkeypatch):
+    """Test background rebuilds publish a new version directory and never rewrite the live version's files."""
+    monkeypatch.setattr(schema_rag.config, "rag_debugging", False)
+    monkeypatch.setattr(schema_rag.config, "rag_schema_query_min_results", 50)
+    monkeypatch.setattr(schema_rag, "get_active_shard_key", lambda: ("demo", "dev"))
+    schema = SchemaTestFixtures.sample_schema()
+    holder = schema_rag.SchemaRAGHolder(loader=lambda: schema, rag_dir=TEST_GRAPH_DIR)
+    first = holder.current
+    assert first.rag_dir == TEST_GRAPH_DIR
+    live_files = {}
+    for root, _, files in os.walk(first.shard_dir(("demo", "dev"))):
+        for name in files:
+            path = os.path.join(root, name)
+            with open(path, "rb") as f:
+                live_files[path] = (os.stat(path).st_ino, f.read())
+
+    changed = schema[0].model_copy(
+        update={"schema_info": [schema[0].schema_info[0].model_copy(update={"table_name": "invoices"})]}
+    )
+    holder.refresh([changed], wait=True)
+    second = holder.current
+    assert second.rag_dir.startswith(os.path.join(TEST_GRAPH_DIR, "versions"))
+    assert schema_rag.live_rag_dir(TEST_GRAPH_DIR) == second.rag_dir
+    for path, (inode, content) in live_files.items():
+        with open(path, "rb") as f:
+            assert (os.stat(path).st_ino, f.read()) == (inode, content)
+
+    def tables(result):
+        return [table["table_name"] for entry in result["schema_info"] for table in entry["schema_info"]]
+
+    assert "orders" in tables(first.run_query(["List all orders"]))
+    assert tables(second.run_query(["List all invoices"])) == ["invoices"]
+
+    holder.refresh([changed], wait=True)
+    holder.refresh([changed], wait=True)
+    versions = os.listdir(os.path.join(TEST_GRAPH_DIR, "versions"))
+    assert len(versions) == 2 and os.path.basename(holder.current.rag_dir) in versions
+    assert os.path.basename(second.rag_dir) not in versions
+
+
+def test_vectorizer_with_hashing_backend(monkeypatch):
+    """Test retrieval runs on the dependency-free hashing backend and stores its backend-qualified key."""
+    monkeypatch.setattr(embeddings, "embedding_models", EmbeddingModelRegistry())
+    monkeypatch.setattr(schema_rag.config, "rag_embedding_backend", "hashing")
+    monkeypatch.setattr(schema_rag.config, "rag_retrieval_mode", "vector")
+    triples = _random_triples(100) + [("SalesOrderHeader", "has_column", "SalesOrderID")]
+    vectorizer = SchemaVectorizer(triples)
+    vectorizer.paths["vecs"] = os.path.join(TEST_GRAPH_DIR, "vecs.npy")
+    vectorizer.paths["triples"] = os.path.join(TEST_GRAPH_DIR, "vec_triples.json")
+    vectorizer.initialize_embeddings(force_rebuild=True)
+
+    assert vectorizer.model_name == "hashing:384"
+    with open(vectorizer.paths["triples"], encoding="utf-8") as f:
+        assert json.load(f)["model"] == "hashing:384"
+    assert vectorizer.search("sales order header", score_threshold=0.99, min_results=1)[0][0] == triples[-1]
+
+
+def test_schema_rag_caches_results_per_schema_and_settings(fake_encoder, monkeypatch):
+    """Test repeated queries are served from the result cache until the query or retrieval settings change."""
+    monkeypatch.setattr(schema_rag.config, "rag_dir", TEST_GRAPH_DIR)
+    monkeypatch.setattr(schema_rag.config, "rag_debugging", False)
+    monkeypatch.setattr(schema_rag.config, "rag_schema_query_min_results", 3)
+    rag = SchemaRAG(SchemaTestFixtures.sample_schema())
+    model = fake_encoder.get(rag.vectorizer.model_name)
+
+    first = rag.run_query(["List all orders"])
+    calls = model.calls
+    assert rag.run_query(["List   all orders"]) == first
+    assert rag.run_queries([["List all orders"]]) == [first]
+    assert model.calls == calls
+    assert rag.result_cache.stats()["hits"] == 2
+
+    monkeypatch.setattr(schema_rag.config, "rag_schema_query_min_results", 1)
+    rag.run_query(["List all orders"])
+    stats = rag.result_cache.stats()
+    assert stats["size"] == 2 and stats["misses"] == 2
+    assert stats["hit_rate"] == 0.5 and stats["approx_bytes"] > 0
+
+
+def test_score_schema_elements_keeps_best_score_per_table_and_column():
+    """Test retrieval scores are aggregated per table and per column for the schema renderer."""
+    top_triples = [
+        (("orders", "has_column", "status"), 0.4),
+        (("status", "has_type", "text"), 0.9),
+        (("orders", "has_column", "id"), 0.2),
+        (("unrelated", "has_type", "int"), 1.0),
+    ]
+
+    table_scores, column_scores = SchemaRetriever.score_schema_elements(top_triples)
+
+    assert table_scores == {"orders": 0.9}
+    assert column_scores == {"orders": {"status": 0.9, "id": 0.2}}
+
+
+def test_retriever_expands_relevant_tables_with_join_partners(monkeypatch):
+    """Test graph expansion adds join partner tables and the key columns on both sides of the join."""
+    monkeypatch.setattr(schema_rag.config, "rag_debugging", False)
+    monkeypatch.setattr(schema_rag.config, "graph_expansion_hops", 1)
+    profiles = [
+        SchemaGlossary(
+            profile_name="demo",
+            output_name="dev",
+            db_type="postgres",
+            timestamp=1.0,
+            schema_info=[
+                SchemaInfo(
+                    table_name="orders",
+                    schema_name="sales",
+                    columns=[
+                        TableInfo(column_name="customer_id", data_type="int"),
+                        TableInfo(column_name="amount", data_type="float"),
+                    ],
+                ),
+                SchemaInfo(
+                    table_name="customers",
+                    schema_name="sales",
+                    columns=[
+                        TableInfo(column_name="id", data_type="int"),
+                        TableInfo(column_name="name", data_type="text"),
+                    ],
+                ),
+            ],
+        )
+    ]
+    top_triples = [(("orders", "has_column", "amount"), 0.8)]
+    retriever = schema_rag.SchemaRetriever(rag_dir=TEST_GRAPH_DIR, graph=CompactSchemaGraph.from_profiles(profiles))
+
+    payload = retriever.filter_schema(
+        top_triples, {"orders"}, {"orders": {"amount"}}, schema_rag.SchemaFragmentIndex(profiles)
+    )
+
+    columns = {
+        table["table_name"]: [column["column_name"] for column in table["columns"]]
+        for table in payload["schema_info"][0]["schema_info"]
+    }
+    assert columns == {"orders": ["customer_id", "amount"], "customers": ["id"]}
+    assert payload["table_scores"] == {"orders": 0.8, "customers": 0.4}
+    assert payload["column_scores"]["orders"] == {"amount": 0.8, "customer_id": 0.8}
+
+    unexpanded = schema_rag.SchemaRetriever(rag_dir=TEST_GRAPH_DIR).filter_schema(
+        top_triples, {"orders"}, {"orders": {"amount"}}, schema_rag.SchemaFragmentIndex(profiles)
+    )
+    assert [table["table_name"] for table in unexpanded["schema_info"][0]["schema_info"]] == ["orders"]
+
+
+def test_table_granularity_scores_only_the_best_tables(monkeypatch):
+    """Test table card search drills into the triples of the best matching tables only."""
+    monkeypatch.setattr(embeddings, "embedding_models", EmbeddingModelRegistry())
+    monkeypatch.setattr(schema_rag.config, "rag_embedding_backend", "hashing")
+    monkeypatch.setattr(schema_rag.config, "rag_search_granularity", "table")
+    monkeypatch.setattr(schema_rag.config, "rag_table_cards_top_k", 1)
+    triples = [
+        ("orders", "has_column", "amount"),
+        ("amount", "has_data_type", "float"),
+        ("customers", "has_column", "customer_name"),
+        ("customer_name", "has_data_type", "text"),
+        ("invoices", "has_column", "invoice_total"),
+    ]
+    vectorizer = SchemaVectorizer(triples, rag_dir=TEST_GRAPH_DIR)
+    vectorizer.initialize_embeddings(force_rebuild=True)
+
+    assert vectorizer.table_cards is not None
+    assert vectorizer.table_cards.table_names == ["orders", "customers", "invoices"]
+    results = vectorizer.search("customer names", score_threshold=-1.0, min_results=1)
+    assert {triple for triple, _ in results} == set(triples[2:4])
+
+    reloaded = SchemaVectorizer(triples, rag_dir=TEST_GRAPH_DIR)
+    reloaded.initialize_embeddings()
+    assert (reloaded.table_cards.embeddings == vectorizer.table_cards.embeddings).all()
+
+
+def test_retriever_adds_columns_of_mentioned_values(monkeypatch):
+    """Test a categorical value mentioned in the query pulls in the column holding it."""
+    monkeypatch.setattr(schema_rag.config, "rag_debugging", False)
+    profiles = [
+        SchemaGlossary(
+            profile_name="demo",
+            output_name="dev",
+            db_type="postgres",
+            timestamp=1.0,
+            schema_info=[
+                SchemaInfo(
+                    table_name="orders",
+                    schema_name="sales",
+                    columns=[TableInfo(column_name="amount", data_type="float")],
+                ),
+                SchemaInfo(
+                    table_name="customers",
+                    schema_name="sales",
+                    columns=[
+                        TableInfo(column_name="name", data_type="text"),
+                        TableInfo(column_name="country", data_type="text", categorical=True, values=["Finland"]),
+                    ],
+                ),
+            ],
+        )
+    ]
+    top_triples = [(("orders", "has_column", "amount"), 0.8)]
+    retriever = schema_rag.SchemaRetriever(
+        rag_dir=TEST_GRAPH_DIR, value_index=CategoricalValueIndex.from_profiles(profiles)
+    )
+
+    payload = retriever.filter_schema(
+        top_triples,
+        {"orders"},
+        {"orders": {"amount"}},
+        schema_rag.SchemaFragmentIndex(profiles),
+        query="Total amount for customers in Finland",
+    )
+
+    columns = {
+        table["table_name"]: [column["column_name"] for column in table["columns"]]
+        for table in payload["schema_info"][0]["schema_info"]
+    }
+    assert columns == {"orders": ["amount"], "customers": ["country"]}
+    assert payload["table_scores"] == {"orders": 0.8, "customers": 1.0}
+    assert payload["column_scores"]["customers"] == {"country": 1.0}
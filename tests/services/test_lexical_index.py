@@ -0,0 +1,32 @@
+"""Tests for the lexical BM25 index."""
+
+from datu.services.lexical_index import BM25Index, tokenize_identifier
+
+
+def test_tokenize_identifier_keeps_whole_identifiers_and_parts():
+    """Test identifiers are indexed whole and split on underscores and camelCase."""
+    assert tokenize_identifier("SalesOrderID") == ["salesorderid", "sales", "order", "id"]
+    assert tokenize_identifier("sales.order_line qty") == ["sales", "order_line", "order", "line", "qty"]
+    assert tokenize_identifier("HTTPStatus2") == ["httpstatus2", "http", "status", "2"]
+
+
+def test_bm25_scores_rare_tokens_higher_and_prunes_common_ones():
+    """Test ranking follows BM25 and tokens present in most documents are not indexed."""
+    documents = [
+        "orders order_id",
+        "orders customer_id",
+        "orders amount",
+        "customers customer_id",
+        "products product_name",
+    ]
+    index = BM25Index(documents)
+    assert "orders" not in index.postings
+
+    doc_ids, scores = index.search("customer amount")
+    ranked = dict(zip(doc_ids.tolist(), scores.tolist(), strict=True))
+    assert set(ranked) == {1, 2, 3}
+    assert max(ranked, key=ranked.get) == 2
+    assert ranked[2] == 1.0
+
+    doc_ids, scores = index.search("orders")
+    assert len(doc_ids) == 0 and len(scores) == 0
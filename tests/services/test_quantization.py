@@ -0,0 +1,46 @@
+"""Tests for quantized embedding storage."""
+
+import os
+
+import numpy as np
+import pytest
+
+from datu.services.quantization import QuantizedMatrix
+
+
+def _normalized(count: int, dim: int, seed: int = 0) -> np.ndarray:
+    matrix = np.random.default_rng(seed).standard_normal((count, dim)).astype(np.float32)
+    return matrix / np.linalg.norm(matrix, axis=1, keepdims=True)
+
+
+@pytest.mark.parametrize(("kind", "min_ratio"), [("float16", 2.0), ("int8", 3.5)])
+def test_quantized_footprint_and_ranking(kind, min_ratio):
+    """Test the quantized matrix is 2-4x smaller than float32 (4-8x than float64) and keeps the ranking."""
+    matrix = _normalized(5000, 384)
+    queries = _normalized(20, 384, seed=1)
+    quantized = QuantizedMatrix.quantize(matrix, kind)
+
+    assert matrix.nbytes / quantized.nbytes >= min_ratio
+    assert matrix.astype(np.float64).nbytes / quantized.nbytes >= 2 * min_ratio
+
+    overlaps = []
+    for query in queries:
+        exact = set(np.argsort(-(matrix @ query))[:10].tolist())
+        approx = set(np.argsort(-quantized.dot(query))[:10].tolist())
+        overlaps.append(len(exact & approx) / 10)
+    assert np.mean(overlaps) >= 0.95
+
+    rows = np.array([3, 17, 4096])
+    np.testing.assert_allclose(quantized.dot(queries[0], rows), matrix[rows] @ queries[0], atol=0.02)
+
+
+def test_quantized_round_trip(tmp_path):
+    """Test codes and scales persist to npz."""
+    quantized = QuantizedMatrix.quantize(_normalized(50, 8), "int8")
+    path = os.path.join(tmp_path, "quantized.npz")
+    quantized.save(path)
+
+    loaded = QuantizedMatrix.load(path)
+    assert loaded.kind == "int8"
+    np.testing.assert_array_equal(loaded.codes, quantized.codes)
+    np.testing.assert_array_equal(loaded.scales, quantized.scales)
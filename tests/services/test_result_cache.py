@@ -0,0 +1,55 @@
+"""Tests for the schema retrieval result cache."""
+
+from datu.services.result_cache import SchemaResultCache, estimate_payload_size
+
+
+def test_result_cache_evicts_least_recently_used_and_tracks_memory():
+    """Test LRU eviction, hit rate and the approximate memory of the cached payloads."""
+    cache = SchemaResultCache(maxsize=2)
+    cache.put("a", {"schema_info": [{"table_name": "orders"}]})
+    cache.put("b", {"schema_info": []})
+    assert cache.get("a") == {"schema_info": [{"table_name": "orders"}]}
+    cache.put("c", {"schema_info": []})
+    assert cache.get("b") is None
+
+    stats = cache.stats()
+    assert stats["size"] == 2
+    assert stats["hits"] == 1 and stats["misses"] == 1 and stats["hit_rate"] == 0.5
+    assert stats["approx_bytes"] == estimate_payload_size(
+        {"schema_info": [{"table_name": "orders"}]}
+    ) + estimate_payload_size({"schema_info": []})
+
+    cache.clear()
+    assert cache.stats()["approx_bytes"] == 0
+
+
+def test_result_cache_disabled_with_zero_size():
+    """Test a zero-sized cache stores nothing."""
+    cache = SchemaResultCache(maxsize=0)
+    cache.put("a", {"schema_info": []})
+    assert cache.get("a") is None
+
+
+def test_estimate_payload_size_counts_values_and_descriptions():
+    """Test the size estimate follows the content, including categorical values and descriptions."""
+    column = {"column_name": "status", "data_type": "varchar"}
+    payload = {
+        "schema_info": [{"profile_name": "demo", "schema_info": [{"table_name": "orders", "columns": [column]}]}]
+    }
+    values = [f"value_{i:04d}" for i in range(1000)]
+    heavy = {
+        "schema_info": [
+            {
+                "profile_name": "demo",
+                "schema_info": [
+                    {
+                        "table_name": "orders",
+                        "description": "Customer orders. " * 20,
+                        "columns": [{**column, "categorical": True, "values": values}],
+                    }
+                ],
+            }
+        ]
+    }
+    assert estimate_payload_size({"schema_info": []}) == len("schema_info")
+    assert estimate_payload_size(heavy) - estimate_payload_size(payload) >= sum(map(len, values)) + 340
@@ -0,0 +1,144 @@
+"""Tests for the compact CSR schema graph."""
+
+import os
+
+import networkx as nx
+
+from datu.base.base_connector import SchemaInfo, TableInfo
+from datu.schema_extractor.schema_cache import SchemaGlossary
+from datu.services.schema_graph import COLUMN_NODE, TABLE_NODE, CompactSchemaGraph
+
+
+def _two_table_schema():
+    return [
+        SchemaGlossary(
+            profile_name="demo",
+            output_name="dev",
+            db_type="postgres",
+            timestamp=1.0,
+            schema_info=[
+                SchemaInfo(
+                    table_name="orders",
+                    schema_name="sales",
+                    columns=[
+                        TableInfo(column_name="id", data_type="int"),
+                        TableInfo(column_name="status", data_type="text", categorical=True, values=["new", "paid"]),
+                    ],
+                ),
+                SchemaInfo(
+                    table_name="customers",
+                    schema_name="sales",
+                    columns=[TableInfo(column_name="id", data_type="int")],
+                ),
+            ],
+        )
+    ]
+
+
+def test_columns_are_qualified_by_table():
+    """Test same-named columns in different tables become distinct nodes."""
+    graph = CompactSchemaGraph.from_profiles(_two_table_schema())
+
+    orders_id = graph.node_id("sales.orders.id")
+    customers_id = graph.node_id("sales.customers.id")
+    assert orders_id is not None and customers_id is not None and orders_id != customers_id
+    assert graph.node_kinds[graph.node_id("sales.orders")] == TABLE_NODE
+    assert graph.node_kinds[orders_id] == COLUMN_NODE
+
+    targets, predicates = graph.successors(graph.node_id("sales.orders"))
+    columns = {
+        graph.node_names[t]
+        for t, p in zip(targets, predicates, strict=True)
+        if graph.predicate_names[p] == "has_column"
+    }
+    assert columns == {"sales.orders.id", "sales.orders.status"}
+
+    sources, _ = graph.predecessors(graph.node_id("int"))
+    assert {graph.node_names[s] for s in sources} == {"sales.orders.id", "sales.customers.id"}
+
+
+def test_save_load_round_trip_and_networkx_export(tmp_path):
+    """Test the arrays persist to npz and export to an equivalent NetworkX graph."""
+    graph = CompactSchemaGraph.from_profiles(_two_table_schema())
+    path = os.path.join(tmp_path, "graph.npz")
+    graph.save(path)
+
+    loaded = CompactSchemaGraph.load(path)
+    assert loaded.node_names == graph.node_names
+    assert loaded.predicate_names == graph.predicate_names
+    for name in ("indptr", "indices", "predicates", "rev_indptr", "rev_indices", "rev_predicates"):
+        assert (getattr(loaded, name) == getattr(graph, name)).all()
+
+    exported = loaded.to_networkx()
+    assert isinstance(exported, nx.DiGraph)
+    assert exported.number_of_nodes() == graph.number_of_nodes()
+    assert exported.number_of_edges() == graph.number_of_edges()
+    assert exported.edges["sales.orders.status", "True"]["label"] == "is_categorical"
+    assert exported.nodes["sales.customers"]["kind"] == "table"
+
+
+def _join_schema():
+    def table(name, *columns):
+        return SchemaInfo(
+            table_name=name,
+            schema_name="sales",
+            columns=[TableInfo(column_name=column, data_type="int") for column in columns],
+        )
+
+    return [
+        SchemaGlossary(
+            profile_name="demo",
+            output_name="dev",
+            db_type="postgres",
+            timestamp=1.0,
+            schema_info=[
+                table("orders", "id", "customer_id", "paid"),
+                table("customers", "id", "name"),
+                table("invoices", "id", "CustomerID", "paid"),
+                table("order_lines", "id", "order_id"),
+            ],
+        )
+    ]
+
+
+def _partners(graph, table_name):
+    return {
+        (graph.node_names[partner], graph.node_names[column], graph.node_names[partner_column])
+        for partner, column, partner_column in graph.join_partners(graph.node_id(table_name))
+    }
+
+
+def test_join_edges_are_inferred_from_key_columns():
+    """Test shared key column names and key-to-table names produce join edges, and other names do not."""
+    graph = CompactSchemaGraph.from_profiles(_join_schema())
+
+    assert _partners(graph, "sales.orders") == {
+        ("sales.customers", "sales.orders.customer_id", "sales.customers.id"),
+        ("sales.invoices", "sales.orders.customer_id", "sales.invoices.CustomerID"),
+        ("sales.order_lines", "sales.orders.id", "sales.order_lines.order_id"),
+    }
+    assert ("sales.orders", "sales.customers.id", "sales.orders.customer_id") in _partners(graph, "sales.customers")
+
+    generic = CompactSchemaGraph.from_profiles(_join_schema(), max_join_fanout=1)
+    assert ("sales.invoices", "sales.orders.customer_id", "sales.invoices.CustomerID") not in _partners(
+        generic, "sales.orders"
+    )
+
+
+def test_expand_joins_is_bounded_and_collects_key_columns():
+    """Test the join walk adds decayed partners up to the table limit, with the key columns on both sides."""
+    graph = CompactSchemaGraph.from_profiles(_join_schema())
+    lines = graph.node_id("sales.order_lines")
+
+    expanded = graph.expand_joins({lines: 1.0}, hops=2, max_tables=2, decay=0.5)
+
+    assert {graph.node_names[t]: score for t, (score, _) in expanded.items()} == {
+        "sales.order_lines": 1.0,
+        "sales.orders": 0.5,
+        "sales.customers": 0.25,
+    }
+    assert {graph.node_names[c] for c in expanded[graph.node_id("sales.orders")][1]} == {
+        "sales.orders.id",
+        "sales.orders.customer_id",
+    }
+    assert graph.expand_joins({lines: 1.0}, hops=0) == {lines: (1.0, set())}
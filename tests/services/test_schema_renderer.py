@@ -0,0 +1,100 @@
+"""Tests for the compact schema context renderer."""
+
+from datu.base.base_connector import SchemaInfo, TableInfo
+from datu.schema_extractor.schema_cache import SchemaGlossary
+from datu.services.sql_generator.schema_renderer import SchemaContextRenderer, estimate_tokens
+
+
+def _schema(table_count=1, column_count=2):
+    return [
+        SchemaGlossary(
+            profile_name="demo",
+            output_name="dev",
+            db_type="postgres",
+            timestamp=1.0,
+            schema_info=[
+                SchemaInfo(
+                    table_name=f"table_{t}",
+                    schema_name="sales",
+                    columns=[TableInfo(column_name=f"column_{c}", data_type="int") for c in range(column_count)],
+                )
+                for t in range(table_count)
+            ],
+        )
+    ]
+
+
+def test_render_compact_ddl():
+    """Test tables and columns render as DDL-like lines with truncated categorical values."""
+    schema = _schema()
+    schema[0].schema_info[0].columns.append(
+        TableInfo(column_name="status", data_type="text", description="Order status", values=["a", "b", "c", "d"])
+    )
+
+    rendered = SchemaContextRenderer(max_values=2).render(schema)
+
+    assert rendered.splitlines() == [
+        "-- postgres demo/dev",
+        "TABLE sales.table_0",
+        "  column_0 int",
+        "  column_1 int",
+        "  status text -- Order status; [values: a, b, +2 more]",
+    ]
+
+
+def test_render_accepts_dict_profiles():
+    """Test schema RAG payload dicts render the same as SchemaGlossary objects."""
+    schema = _schema()
+    renderer = SchemaContextRenderer()
+
+    assert renderer.render([profile.model_dump() for profile in schema]) == renderer.render(schema)
+
+
+def test_render_keeps_best_scored_tables_within_budget():
+    """Test an over-budget schema keeps the highest scored tables and columns and stays within budget."""
+    schema = _schema(table_count=50, column_count=10)
+    renderer = SchemaContextRenderer()
+    full = renderer.render(schema)
+
+    rendered = renderer.render(
+        schema,
+        token_budget=70,
+        table_scores={"table_7": 0.9, "table_3": 0.5},
+        column_scores={"table_7": {"column_4": 0.9}, "table_3": {"column_9": 0.8}},
+    )
+
+    assert estimate_tokens(rendered) <= 70 < estimate_tokens(full)
+    lines = rendered.splitlines()
+    assert "TABLE sales.table_7" in lines
+    assert lines.index("TABLE sales.table_3") < lines.index("TABLE sales.table_7")
+    assert "  column_4 int" in lines and "  column_9 int" in lines
+    assert lines[-1].endswith("less relevant tables omitted")
+
+
+def test_fragments_are_cached_per_schema_version():
+    """Test table fragments are reused for the same schema version and re-rendered for a new one."""
+    schema = _schema()
+    renderer = SchemaContextRenderer()
+    calls = []
+    render_column = renderer.render_column
+    renderer.render_column = lambda column: calls.append(column) or render_column(column)
+
+    renderer.render(schema)
+    renderer.render(schema)
+    assert len(calls) == 2
+
+    schema[0].timestamp = 2.0
+    renderer.render(schema)
+    assert len(calls) == 4
+
+
+def test_render_without_scores_ignores_budget():
+    """Test an unscored schema, such as the full schema cache, is rendered whole whatever the budget."""
+    schema = _schema(table_count=400, column_count=5)
+    renderer = SchemaContextRenderer()
+
+    rendered = renderer.render(schema, token_budget=100)
+
+    assert rendered == renderer.render(schema)
+    assert "omitted" not in rendered
+    assert rendered.count("TABLE ") == 400
@@ -0,0 +1,116 @@
+"""Tests for session-scoped schema contexts."""
+
+from datu.services.sql_generator.session_context import SessionContextStore, merge_schema_payloads
+
+
+def _payload(tables: dict, scores: dict) -> dict:
+    return {
+        "schema_info": [
+            {
+                "profile_name": "demo",
+                "output_name": "dev",
+                "schema_info": [
+                    {"table_name": table, "columns": [{"column_name": column} for column in columns]}
+                    for table, columns in tables.items()
+                ],
+            }
+        ],
+        "table_scores": scores,
+        "column_scores": {table: {column: scores[table] for column in columns} for table, columns in tables.items()},
+    }
+
+
+def _tables(payload: dict) -> dict:
+    return {
+        table["table_name"]: [column["column_name"] for column in table["columns"]]
+        for table in payload["schema_info"][0]["schema_info"]
+    }
+
+
+def test_merge_appends_only_the_delta():
+    """Test new tables and columns are appended after the existing ones and old scores decay."""
+    previous = _payload({"orders": ["amount"], "customers": ["name"]}, {"orders": 0.9, "customers": 0.6})
+    delta = _payload({"products": ["category"], "orders": ["status", "amount"]}, {"products": 0.8, "orders": 0.5})
+
+    merged, changed = merge_schema_payloads(previous, delta, score_decay=0.5)
+
+    assert changed
+    assert _tables(merged) == {"orders": ["amount", "status"], "customers": ["name"], "products": ["category"]}
+    assert list(_tables(merged)) == ["orders", "customers", "products"]
+    assert merged["table_scores"] == {"orders": 0.5, "customers": 0.3, "products": 0.8}
+    assert _tables(previous) == {"orders": ["amount"], "customers": ["name"]}
+    assert not merge_schema_payloads(previous, _payload({"orders": ["amount"]}, {"orders": 0.9}))[1]
+
+
+def test_store_reuses_merges_and_rebuilds():
+    """Test follow-up turns reuse or extend the session context and a relevance shift rebuilds it."""
+    store = SessionContextStore(min_overlap=0.5, shift_top_k=2)
+    first = store.update(
+        "s1", _payload({"orders": ["amount"], "customers": ["name"]}, {"orders": 0.9, "customers": 0.6})
+    )
+    assert store.set_rendered("s1", first, "rendered")
+
+    same = store.update("s1", _payload({"orders": ["amount"]}, {"orders": 0.8}))
+    assert same is not first and same.rendered == "rendered" and first.turns == 1
+
+    extended = store.update(
+        "s1", _payload({"orders": ["status"], "products": ["sku"]}, {"orders": 0.9, "products": 0.7})
+    )
+    assert extended.rendered is None
+    assert list(_tables(extended.payload)) == ["orders", "customers", "products"]
+
+    shifted = store.update(
+        "s1", _payload({"tickets": ["priority"], "agents": ["name"]}, {"tickets": 0.9, "agents": 0.8})
+    )
+    assert list(_tables(shifted.payload)) == ["tickets", "agents"]
+    assert store.stats() == {"sessions": 1, "reused": 1, "merged": 1, "rebuilt": 2}
+
+
+def test_store_is_bounded_and_expires_sessions(monkeypatch):
+    """Test the least recently used sessions are evicted and idle sessions expire."""
+    store = SessionContextStore(max_sessions=2, ttl_seconds=10)
+    for session_id in ("a", "b", "c"):
+        store.update(session_id, _payload({"orders": ["amount"]}, {"orders": 0.9}))
+    assert store.get("a") is None and len(store) == 2
+
+    context = store.get("b")
+    context.updated_at -= 11
+    assert store.get("b") is None
+    assert store.get("c") is not None
+
+
+def test_store_rebuilds_on_version_or_target_change():
+    """Test a new schema RAG version or target starts a new context even when the tables overlap."""
+    store = SessionContextStore()
+    payload = _payload({"orders": ["amount"]}, {"orders": 0.9})
+    first = store.update("s1", payload, rag_version=1, target=("demo", "dev"))
+    assert store.set_rendered("s1", first, "rendered")
+
+    assert store.update("s1", payload, rag_version=1, target=("demo", "dev")).rendered == "rendered"
+    assert store.update("s1", payload, rag_version=2, target=("demo", "dev")).rendered is None
+    rebuilt = store.update("s1", payload, rag_version=2, target=("demo", "prod"))
+    assert rebuilt.rendered is None and rebuilt.turns == 1 and rebuilt.target == ("demo", "prod")
+    assert store.stats()["rebuilt"] == 3
+
+
+def test_store_keeps_the_best_scored_tables():
+    """Test a session context is capped at ``max_tables``, dropping the lowest scored tables first."""
+    store = SessionContextStore(max_tables=2, min_overlap=0.0, score_decay=0.5)
+    store.update("s1", _payload({"orders": ["amount"], "customers": ["name"]}, {"orders": 0.9, "customers": 0.4}))
+
+    context = store.update("s1", _payload({"products": ["sku"]}, {"products": 0.7}))
+
+    assert list(_tables(context.payload)) == ["orders", "products"]
+    assert set(context.payload["table_scores"]) == set(context.payload["column_scores"]) == {"orders", "products"}
+
+
+def test_set_rendered_ignores_replaced_contexts():
+    """Test a rendering finished after a concurrent turn replaced the context is not stored on either context."""
+    store = SessionContextStore()
+    stale = store.update("s1", _payload({"orders": ["amount"]}, {"orders": 0.9}))
+    current = store.update("s1", _payload({"orders": ["amount"]}, {"orders": 0.9}), rag_version=2)
+
+    assert not store.set_rendered("s1", stale, "stale")
+    assert stale.rendered is None and current.rendered is None
+    assert store.set_rendered("s1", current, "current")
+    assert store.get("s1").rendered == "current"
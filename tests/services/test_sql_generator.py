@@ -170,6 +170,54 @@ async def test_generate_sql_core_failed_fix(monkeypatch):
     assert q.execution_time_estimate == "N/A"
 
 
+@pytest.mark.asyncio
+async def test_generate_sql_core_reuses_session_schema_context(monkeypatch):
+    """A follow-up turn of the same session reuses the rendered schema context of the previous turn."""
+
+    class SuccessfulConnector:
+        """Test connector that always succeeds."""
+
+        def run_transformation(self, sql: str, test_mode: bool = False):
+            return None
+
+    payload = {
+        "schema_info": [
+            {
+                "profile_name": "demo",
+                "output_name": "dev",
+                "schema_info": [{"table_name": "orders", "columns": [{"column_name": "id", "data_type": "int"}]}],
+            }
+        ],
+        "table_scores": {"orders": 1.0},
+        "column_scores": {"orders": {"id": 1.0}},
+    }
+    rendered = []
+    prompts = []
+
+    def fake_render(schema_context):
+        rendered.append(schema_context)
+        return "TABLE orders\n  id int"
+
+    async def fake_llm(messages, system_prompt):
+        prompts.append(system_prompt)
+        return "No query needed."
+
+    monkeypatch.setattr(core.DBConnectorFactory, "get_connector", lambda *a, **k: SuccessfulConnector())
+    monkeypatch.setattr(core, "retrieve_schema_context", lambda user_messages: payload)
+    monkeypatch.setattr(core, "render_schema_context", fake_render)
+    monkeypatch.setattr(core, "generate_response", fake_llm)
+    monkeypatch.setattr(core, "session_contexts", core.SessionContextStore())
+
+    messages = [ChatMessage(role="user", content="show orders")]
+    await core.generate_sql_core(ChatRequest(messages=messages, session_id="s1"), use_schema_rag=True)
+    messages.append(ChatMessage(role="user", content="only the ids"))
+    await core.generate_sql_core(ChatRequest(messages=messages, session_id="s1"), use_schema_rag=True)
+
+    assert len(rendered) == 1
+    assert prompts[0] == prompts[1]
+    assert "TABLE orders" in prompts[1]
+
+
 def test_normalize_for_preview_headers_bullets_and_spacing():
     """Normalize headings, remove bullets, and collapse blank lines."""
     content = (
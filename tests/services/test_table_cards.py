@@ -0,0 +1,49 @@
+"""Tests for the table card index."""
+
+import os
+
+import numpy as np
+
+from datu.services.table_cards import TableCardIndex, assign_triple_tables, card_text
+
+TRIPLES = [
+    ("orders", "has_schema_name", "sales"),
+    ("orders", "has_column", "amount"),
+    ("amount", "has_data_type", "float"),
+    ("orders", "has_column", "order_id"),
+    ("order_id", "has_data_type", "int"),
+    ("customers", "has_schema_name", "sales"),
+    ("customers", "has_column", "name"),
+    ("name", "has_data_type", "text"),
+]
+
+
+def test_assign_triple_tables_attributes_column_triples_to_their_table():
+    """Test column triples, whose subject is the bare column name, belong to the preceding table."""
+    table_names, owners = assign_triple_tables(TRIPLES)
+
+    assert table_names == ["orders", "customers"]
+    assert owners.tolist() == [0, 0, 0, 0, 0, 1, 1, 1]
+
+
+def test_card_text_lists_key_columns_first():
+    """Test the card names the table, its attributes and its columns with key columns first."""
+    assert card_text("orders", TRIPLES[:5]) == "orders table, schema name sales. Columns: order_id, amount"
+    assert card_text("orders", TRIPLES[:5], max_columns=1).endswith("Columns: order_id and 1 more")
+
+
+def test_top_tables_restricts_rows_to_the_best_tables(tmp_path):
+    """Test table selection by card similarity and the triple rows of the selected tables."""
+    table_names, owners = assign_triple_tables(TRIPLES)
+    embeddings = np.array([[1.0, 0.0], [0.0, 1.0]], dtype=np.float32)
+    index = TableCardIndex(table_names, owners, ["orders", "customers"], embeddings, lexical=True)
+
+    assert index.top_tables(np.array([0.1, 0.9], dtype=np.float32), "", k=1).tolist() == [1]
+    assert index.top_tables(np.array([0.1, 0.9], dtype=np.float32), "orders", k=1, lexical_weight=1.0).tolist() == [0]
+    assert index.table_rows(np.array([1])).tolist() == [5, 6, 7]
+
+    path = os.path.join(tmp_path, "cards.npz")
+    TableCardIndex.save_embeddings(path, "hashing:2", ["a", "b"], embeddings)
+    assert TableCardIndex.load_embeddings(path, "other") == {}
+    loaded = TableCardIndex.load_embeddings(path, "hashing:2")
+    assert (loaded["b"] == embeddings[1]).all()
@@ -0,0 +1,62 @@
+"""Tests for the categorical value index."""
+
+from datu.base.base_connector import SchemaInfo, TableInfo
+from datu.schema_extractor.schema_cache import SchemaGlossary
+from datu.services.value_index import CategoricalValueIndex, normalize_value
+
+PROFILES = [
+    SchemaGlossary(
+        profile_name="demo",
+        output_name="dev",
+        db_type="postgres",
+        timestamp=1.0,
+        schema_info=[
+            SchemaInfo(
+                table_name="customers",
+                schema_name="sales",
+                columns=[
+                    TableInfo(column_name="country", data_type="text", categorical=True, values=["Finland", "Sweden"]),
+                    TableInfo(column_name="region", data_type="text", categorical=True, values=["Île-de-France"]),
+                    TableInfo(column_name="is_active", data_type="text", categorical=True, values=["yes", "no"]),
+                ],
+            ),
+            SchemaInfo(
+                table_name="products",
+                schema_name="sales",
+                columns=[
+                    TableInfo(column_name="category", data_type="text", categorical=True, values=["Laptop", "Phone"]),
+                    TableInfo(column_name="name", data_type="text"),
+                ],
+            ),
+        ],
+    )
+]
+
+
+def test_exact_matches_resolve_to_columns():
+    """Test exact and accent-insensitive value mentions resolve to the columns holding them."""
+    index = CategoricalValueIndex.from_profiles(PROFILES)
+
+    assert normalize_value("  Île-de-France ") == "ile de france"
+    assert index.match("Revenue from customers in Finland") == [("customers", "country", "Finland", 1.0)]
+    assert index.match("orders shipped to ile de france") == [("customers", "region", "Île-de-France", 1.0)]
+
+
+def test_fuzzy_matches_and_generic_values():
+    """Test misspelled or inflected mentions match by trigram similarity and generic values are not indexed."""
+    index = CategoricalValueIndex.from_profiles(PROFILES)
+
+    matches = index.match("How many Laptops were sold?")
+    assert [(table, column, value) for table, column, value, _ in matches] == [("products", "category", "Laptop")]
+    assert 0.75 <= matches[0][3] < 1.0
+    assert index.match("How many Laptops were sold?", fuzzy_threshold=1.0) == []
+    assert index.match("yes or no") == []
+    assert "yes" not in index.exact
+
+
+def test_match_limit_keeps_best_matches():
+    """Test the limit keeps exact matches ahead of fuzzy ones."""
+    index = CategoricalValueIndex.from_profiles(PROFILES)
+
+    matches = index.match("Laptops sold in Sweden", limit=1)
+    assert matches == [("customers", "country", "Sweden", 1.0)]